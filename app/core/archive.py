@@ -0,0 +1,196 @@
+"""PostgreSQL archive of normalized items.
+
+:class:`ArchiveSink` buffers :class:`NormalizedItem` rows in memory and a
+background task writes them with ``COPY`` through an :mod:`asyncpg` pool.
+A flush starts when ``batch_size`` rows are pending or ``flush_interval_s``
+elapsed.  :meth:`ArchiveSink.submit` never waits on the database: while a
+slow database holds the writer, rows accumulate up to ``max_pending`` and
+the oldest ones are dropped beyond that, so publishing is never delayed.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+
+import orjson
+
+from . import metrics
+from .models import NormalizedItem
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    "external_id",
+    "source",
+    "title",
+    "summary",
+    "url",
+    "published_at",
+    "language",
+    "authors",
+    "tickers",
+    "keywords",
+    "categories",
+    "score",
+    "archived_at",
+)
+
+
+def schema(table: str = "news_items") -> list[str]:
+    """DDL statements creating ``table`` and its indexes if missing."""
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+            external_id text NOT NULL,
+            source text NOT NULL,
+            title text NOT NULL,
+            summary text,
+            url text NOT NULL,
+            published_at timestamptz NOT NULL,
+            language text,
+            authors text[] NOT NULL DEFAULT '{{}}',
+            tickers text[] NOT NULL DEFAULT '{{}}',
+            keywords jsonb NOT NULL DEFAULT '{{}}',
+            categories text[] NOT NULL DEFAULT '{{}}',
+            score double precision,
+            archived_at timestamptz NOT NULL DEFAULT now()
+        )
+        """,
+        f"CREATE INDEX IF NOT EXISTS {table}_published_at_idx ON {table} (published_at)",
+        f"CREATE INDEX IF NOT EXISTS {table}_source_idx ON {table} (source, published_at)",
+        f"CREATE INDEX IF NOT EXISTS {table}_tickers_idx ON {table} USING gin (tickers)",
+    ]
+
+
+def to_record(item: NormalizedItem, score: float | None, archived_at: datetime) -> tuple:
+    """Return ``item`` as a tuple matching :data:`COLUMNS`."""
+    return (
+        item.external_id,
+        item.source,
+        item.title,
+        item.summary,
+        str(item.url),
+        item.published_at,
+        item.language,
+        item.authors,
+        item.tickers,
+        orjson.dumps(item.keywords).decode(),
+        item.categories,
+        score,
+        archived_at,
+    )
+
+
+class ArchiveSink:
+    """Batching ``COPY`` writer in front of an :class:`asyncpg.Pool`."""
+
+    def __init__(
+        self,
+        pool,
+        table: str = "news_items",
+        batch_size: int = 500,
+        flush_interval_s: float = 5.0,
+        max_pending: int = 50_000,
+        retry_delay_s: float = 5.0,
+    ):
+        self.pool = pool
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self.retry_delay_s = retry_delay_s
+        self._pending: deque[tuple] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def ensure_schema(self) -> None:
+        async with self.pool.acquire() as conn:
+            for statement in schema(self.table):
+                await conn.execute(statement)
+
+    # ------------------------------------------------------------------
+    def submit(
+        self, items: Sequence[NormalizedItem], scores: Iterable[float | None] | None = None
+    ) -> None:
+        """Queue ``items`` for archiving; never waits on the database."""
+        if not items:
+            return
+        now = datetime.now(timezone.utc)
+        scores = scores if scores is not None else [None] * len(items)
+        self._pending.extend(to_record(i, s, now) for i, s in zip(items, scores))
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            for _ in range(overflow):
+                self._pending.popleft()
+            self.dropped += overflow
+            metrics.drop("archive_overflow", overflow)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Stop the writer and flush what is pending within ``timeout``."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                logger.warning("archive: dropped %d rows on shutdown", len(self._pending))
+            self._task = None
+
+    # ------------------------------------------------------------------
+    async def _run(self) -> None:
+        while not self._closing or self._pending:
+            if not self._closing and len(self._pending) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            while self._pending:
+                if not await self.flush():
+                    if self._closing:
+                        logger.warning("archive: dropped %d rows on shutdown", len(self._pending))
+                        return
+                    await asyncio.sleep(self.retry_delay_s)
+                    break
+                if not self._closing and len(self._pending) < self.batch_size:
+                    break
+
+    async def flush(self) -> bool:
+        """Write up to ``batch_size`` pending rows; ``False`` if the COPY failed."""
+        n = min(self.batch_size, len(self._pending))
+        batch = [self._pending.popleft() for _ in range(n)]
+        if not batch:
+            return True
+        try:
+            with metrics.STAGE_SECONDS.labels("archive").time():
+                async with self.pool.acquire() as conn:
+                    await conn.copy_records_to_table(self.table, records=batch, columns=COLUMNS)
+        except Exception:
+            logger.exception("archive: COPY of %d rows failed", len(batch))
+            # put the batch back in front; the cap still applies
+            room = max(0, self.max_pending - len(self._pending))
+            self._pending.extendleft(reversed(batch[-room:] if room else []))
+            lost = len(batch) - min(room, len(batch))
+            if lost:
+                self.dropped += lost
+                metrics.drop("archive_overflow", lost)
+            return False
+        self.written += len(batch)
+        metrics.ARCHIVED.inc(len(batch))
+        return True
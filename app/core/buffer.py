@@ -0,0 +1,130 @@
+"""Bounded, score-ordered buffer between pollers and pipeline workers.
+
+Unlike :class:`asyncio.Queue`, putting never blocks: once ``capacity``
+items are buffered, the lowest-ranked (and among equals the oldest) items
+are evicted.  Under a burst the pipeline therefore drops noise instead of
+stalling the pollers, and workers always take the best items first.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from typing import Any, Callable, Generic, Hashable, Mapping, Sequence, TypeVar
+
+from . import metrics
+
+P = TypeVar("P", bound=Hashable)
+
+
+class PriorityBuffer(Generic[P]):
+    """Buffer of raw items ranked by ``rank(raw)``, handed out per provider.
+
+    :meth:`put` takes ``(provider, raws)`` batches, :meth:`get` returns up
+    to ``batch_size`` of the best buffered items of one provider as such a
+    batch.  ``task_done``/``join``/``qsize`` follow :class:`asyncio.Queue`,
+    so the buffer can stand in for the queue of
+    :func:`app.services.ingestor.run_pipeline`.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        rank: Callable[[Mapping[str, Any]], float],
+        batch_size: int = 50,
+    ):
+        self.capacity = max(capacity, 1)
+        self.rank = rank
+        self.batch_size = max(batch_size, 1)
+        self._seq = itertools.count()
+        # (rank, seq) -> provider, raw for every buffered item
+        self._items: dict[tuple[float, int], tuple[P, Mapping[str, Any]]] = {}
+        # min-heap over all items for eviction
+        self._lowest: list[tuple[float, int]] = []
+        # per provider max-heaps for taking the best items first
+        self._best: dict[P, list[tuple[float, int]]] = {}
+        self._ready = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._unfinished = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    # ------------------------------------------------------------------
+    def put_nowait(self, batch: tuple[P, Sequence[Mapping[str, Any]]]) -> int:
+        """Buffer ``(provider, raws)``; returns how many items were evicted."""
+        provider, raws = batch
+        heap = self._best.setdefault(provider, [])
+        for raw in raws:
+            key = (self.rank(raw), next(self._seq))
+            self._items[key] = (provider, raw)
+            heapq.heappush(self._lowest, key)
+            heapq.heappush(heap, (-key[0], key[1]))
+        evicted = 0
+        while len(self._items) > self.capacity:
+            key = heapq.heappop(self._lowest)
+            if self._items.pop(key, None) is not None:
+                evicted += 1
+        if evicted:
+            self.dropped += evicted
+            metrics.drop("shed", evicted)
+        if self._items:
+            self._ready.set()
+            self._finished.clear()
+        return evicted
+
+    async def put(self, batch: tuple[P, Sequence[Mapping[str, Any]]]) -> int:
+        return self.put_nowait(batch)
+
+    async def get(self) -> tuple[P, list[Mapping[str, Any]]]:
+        """Wait for items and return the best ones of the best provider."""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        provider = None
+        best = None
+        for name, heap in self._best.items():
+            self._skip_removed(heap)
+            if heap and (best is None or heap[0] < best):
+                provider, best = name, heap[0]
+        heap = self._best[provider]
+        raws = []
+        while heap and len(raws) < self.batch_size:
+            neg_rank, seq = heapq.heappop(heap)
+            entry = self._items.pop((-neg_rank, seq), None)
+            if entry is not None:
+                raws.append(entry[1])
+        self._unfinished += 1
+        self._compact()
+        return provider, raws
+
+    def task_done(self) -> None:
+        self._unfinished -= 1
+        if self._unfinished <= 0 and not self._items:
+            self._finished.set()
+
+    async def join(self) -> None:
+        await self._finished.wait()
+
+    # ------------------------------------------------------------------
+    def _skip_removed(self, heap: list[tuple[float, int]]) -> None:
+        while heap and (-heap[0][0], heap[0][1]) not in self._items:
+            heapq.heappop(heap)
+
+    def _compact(self) -> None:
+        # evicted and taken items stay in the heaps until they surface;
+        # rebuild once they make up most of the eviction heap
+        if len(self._lowest) <= 2 * len(self._items) + 64:
+            return
+        self._lowest = list(self._items)
+        heapq.heapify(self._lowest)
+        self._best = {}
+        for (rank, seq), (provider, _) in self._items.items():
+            self._best.setdefault(provider, []).append((-rank, seq))
+        for heap in self._best.values():
+            heapq.heapify(heap)
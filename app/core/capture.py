@@ -0,0 +1,227 @@
+"""Append-only capture log of raw provider pages.
+
+Every page body a provider fetches can be handed to :meth:`CaptureLog.record`,
+which only enqueues it; a background task compresses and appends the pages
+from a worker thread, so polling never waits on disk.
+
+Layout, one directory per provider::
+
+    <root>/<provider>/<first-record-ms>.seg   zlib-compressed records, back to back
+    <root>/<provider>/<first-record-ms>.idx   fixed-size entries (time, offset, length)
+
+Each record is compressed on its own, so a reader can memory-map an index,
+binary-search it for a time range and decompress only the matching records.
+Segments rotate once they exceed ``max_segment_bytes`` or
+``max_segment_age_s``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import mmap
+import struct
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# captured_at (unix seconds), offset in the segment, compressed length
+INDEX_ENTRY = struct.Struct("<dQI")
+
+
+@dataclass
+class _Segment:
+    start: float
+    data: BinaryIO
+    index: BinaryIO
+    size: int = 0
+
+    def close(self) -> None:
+        self.data.close()
+        self.index.close()
+
+
+class CaptureLog:
+    """Segmented, compressed, append-only log of raw provider pages."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_segment_bytes: int = 64 * 2**20,
+        max_segment_age_s: float = 3600.0,
+        queue_size: int = 1000,
+        level: int = 6,
+    ):
+        self.root = Path(root)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age_s = max_segment_age_s
+        self.level = level
+        self._queue: asyncio.Queue[tuple[str, float, bytes]] = asyncio.Queue(queue_size)
+        self._segments: dict[str, _Segment] = {}
+        self._task: asyncio.Task | None = None
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    # ------------------------------------------------------------------
+    def record(self, provider: str, body: bytes, captured_at: float | None = None) -> None:
+        """Queue one raw page; drops it (and counts) if the writer is behind."""
+        if captured_at is None:
+            captured_at = time.time()
+        try:
+            self._queue.put_nowait((provider, captured_at, body))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            metrics.drop("capture_overflow")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Write what is queued, then close all segments."""
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception:
+                logger.exception("capture: failed to write %d pages", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    # ------------------------------------------------------------------
+    def _write(self, batch: list[tuple[str, float, bytes]]) -> None:
+        touched = set()
+        for provider, captured_at, body in batch:
+            segment = self._segment(provider, captured_at)
+            blob = zlib.compress(body, self.level)
+            segment.index.write(INDEX_ENTRY.pack(captured_at, segment.size, len(blob)))
+            segment.data.write(blob)
+            segment.size += len(blob)
+            touched.add(provider)
+        for provider in touched:
+            self._segments[provider].index.flush()
+
+    def _segment(self, provider: str, now: float) -> _Segment:
+        segment = self._segments.get(provider)
+        if segment is not None and (
+            segment.size >= self.max_segment_bytes
+            or now - segment.start >= self.max_segment_age_s
+        ):
+            segment.close()
+            segment = None
+        if segment is None:
+            directory = self.root / provider
+            directory.mkdir(parents=True, exist_ok=True)
+            name = f"{int(now * 1000):013d}"
+            segment = _Segment(
+                now,
+                # unbuffered, so an index entry never reaches the disk first
+                open(directory / f"{name}.seg", "ab", buffering=0),
+                open(directory / f"{name}.idx", "ab"),
+            )
+            segment.size = segment.data.tell()
+            self._segments[provider] = segment
+        return segment
+
+
+class CaptureReader:
+    """Read pages of one provider back by capture time."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def providers(self) -> list[str]:
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def _segments(self, provider: str) -> list[tuple[float, Path]]:
+        return sorted(
+            (int(p.stem) / 1000, p) for p in (self.root / provider).glob("*.seg")
+        )
+
+    def read(
+        self, provider: str, since: float | None = None, until: float | None = None
+    ) -> Iterator[tuple[float, bytes]]:
+        """Yield ``(captured_at, body)`` with ``since <= captured_at < until``."""
+        segments = self._segments(provider)
+        for i, (start, path) in enumerate(segments):
+            if until is not None and start >= until:
+                break
+            next_start = segments[i + 1][0] if i + 1 < len(segments) else None
+            if since is not None and next_start is not None and next_start <= since:
+                continue
+            yield from self._read_segment(path, since, until)
+
+    def _read_segment(
+        self, path: Path, since: float | None, until: float | None
+    ) -> Iterator[tuple[float, bytes]]:
+        index_path = path.with_suffix(".idx")
+        if not index_path.exists() or index_path.stat().st_size < INDEX_ENTRY.size:
+            return
+        with open(index_path, "rb") as ifh, open(path, "rb") as dfh:
+            with mmap.mmap(ifh.fileno(), 0, access=mmap.ACCESS_READ) as index:
+                count = len(index) // INDEX_ENTRY.size
+                pos = 0 if since is None else _lower_bound(index, count, since)
+                for n in range(pos, count):
+                    captured_at, offset, length = INDEX_ENTRY.unpack_from(
+                        index, n * INDEX_ENTRY.size
+                    )
+                    if until is not None and captured_at >= until:
+                        return
+                    dfh.seek(offset)
+                    yield captured_at, zlib.decompress(dfh.read(length))
+
+
+def _lower_bound(index: mmap.mmap, count: int, ts: float) -> int:
+    """First entry with ``captured_at >= ts``; entries are in write order."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if INDEX_ENTRY.unpack_from(index, mid * INDEX_ENTRY.size)[0] < ts:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Dump captured pages as JSON lines, e.g. as input for the replay command."""
+    import orjson
+
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("root", help="capture directory")
+    ap.add_argument("--provider", help="provider name (default: all)")
+    ap.add_argument("--since", type=float, help="unix timestamp, inclusive")
+    ap.add_argument("--until", type=float, help="unix timestamp, exclusive")
+    args = ap.parse_args(argv)
+    reader = CaptureReader(args.root)
+    out = sys.stdout.buffer
+    for provider in [args.provider] if args.provider else reader.providers():
+        for _, body in reader.read(provider, args.since, args.until):
+            # re-serialize so every page is exactly one line
+            out.write(orjson.dumps(orjson.loads(body)) + b"\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,17 @@ from __future__ import annotations
 
 import os
 import yaml
-from pydantic import BaseModel, SecretStr, field_validator
+from typing import Literal
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    PrivateAttr,
+    SecretStr,
+    field_validator,
+    model_validator,
+)
+
+from .domains import DomainFilter
 
 
 class TelegramSettings(BaseModel):
@@ -10,6 +20,12 @@ class TelegramSettings(BaseModel):
     channel_id: int | str
     parse_mode: str = "HTML"
     rate_limit_per_min: int = 10
+    burst: int = 3
+    # coalesce alerts into digests once more than this many are pending (0 = off)
+    digest_threshold: int = 5
+    digest_max_items: int = 20
+    digest_group_by: Literal["ticker", "time"] = "ticker"
+    digest_window_min: int = 15
 
     @field_validator("channel_id", mode="before")
     @classmethod
@@ -20,10 +36,42 @@ class TelegramSettings(BaseModel):
 
 
 class ProviderSettings(BaseModel):
+    # provider specific keys (``base_url``, ...) are passed through as-is
+    model_config = ConfigDict(extra="allow")
+
+    type: str | None = None
     enabled: bool = True
     api_key: str | None = None
     poll_interval_s: int = 45
+    timeout_s: int = 5
+    cycle_timeout_s: float = 60.0
+    jitter_s: float = 2.0
+    backoff_base_s: float = 1.0
+    backoff_max_s: float = 60.0
+    # incremental polling: narrow requests to the time since the last poll
+    incremental: bool = True
+    cursor_overlap_s: float = 300.0
+    cursor_retention_s: float = 10800.0
+    query: str | None = None
+    # "fixed", "adaptive" or a ``module:Class`` PollPolicy
+    poll_policy: str = "fixed"
+    # adaptive bounds (default poll_interval_s / 4 and * 4) and API budget
+    min_poll_interval_s: float | None = None
+    max_poll_interval_s: float | None = None
+    daily_request_budget: int | None = None
+
+
+class NewsdataQuery(BaseModel):
+    """One topic of a Newsdata provider, polled at its own cadence."""
+
+    name: str
+    # same ``k=v&k=v`` format as the provider level ``query``, which supplies
+    # defaults for keys missing here
     query: str | None = None
+    params: dict[str, str | int] = {}
+    endpoint: str | None = None
+    # defaults to the provider's poll_interval_s
+    poll_interval_s: int | None = None
 
 
 class NewsdataSettings(ProviderSettings):
@@ -31,15 +79,58 @@ class NewsdataSettings(ProviderSettings):
     query: str | None = (
         "language=en,ru&timeframe=90m&removeduplicate=1&size=50&q=ETF OR SEC OR hack OR listing"
     )
+    queries: list[NewsdataQuery] = []
+    # concurrent requests across all queries of one cycle
+    max_inflight: int = 4
+
+    @field_validator("queries")
+    @classmethod
+    def _unique_names(cls, v: list[NewsdataQuery]) -> list[NewsdataQuery]:
+        names = [q.name for q in v]
+        if len(set(names)) != len(names):
+            raise ValueError("query names must be unique")
+        return v
 
 
 class ProvidersSettings(BaseModel):
-    newsdata: NewsdataSettings
+    """Provider blocks keyed by name; unknown names become generic providers."""
+
+    model_config = ConfigDict(extra="allow")
+
+    newsdata: NewsdataSettings | None = None
+
+    @model_validator(mode="after")
+    def _validate_extra(self) -> "ProvidersSettings":
+        for name, value in (self.model_extra or {}).items():
+            if not isinstance(value, ProviderSettings):
+                setattr(self, name, ProviderSettings.model_validate(value))
+        return self
+
+    def enabled(self) -> dict[str, dict]:
+        """Return ``{name: settings}`` for every enabled provider."""
+        blocks: dict[str, ProviderSettings | None] = {"newsdata": self.newsdata}
+        blocks.update(self.model_extra or {})
+        return {
+            name: block.model_dump()
+            for name, block in blocks.items()
+            if block is not None and block.enabled
+        }
 
 
 class FiltersSettings(BaseModel):
     languages: list[str] = ["en", "ru"]
     exclude_domains: list[str] = []
+    near_dup_window_h: float = 6.0
+    near_dup_threshold: float = 80.0
+    _domain_filter: DomainFilter = PrivateAttr(default_factory=DomainFilter)
+
+    def model_post_init(self, __context) -> None:
+        # compile the blocklist once instead of globbing per scored item
+        self._domain_filter = DomainFilter(self.exclude_domains)
+
+    @property
+    def domain_filter(self) -> DomainFilter:
+        return self._domain_filter
 
 
 class ScoringSettings(BaseModel):
@@ -47,12 +138,98 @@ class ScoringSettings(BaseModel):
     w_recency: float = 1.5
     half_life_min: float = 120.0
     w_ticker: float = 0.4
+    w_keyword: float = 0.5
     threshold: float = 1.8
+    # YAML lexicon of tickers and keyword weights; bundled one if unset
+    lexicon_path: str | None = None
 
 
 class RuntimeSettings(BaseModel):
     tz: str = "Europe/Berlin"
     redis_url: str = "redis://localhost:6379/0"
+    dedup_window_s: int = 86400
+    dedup_cache_size: int = 20000
+    # trust local Bloom negatives; only safe when this is the sole writer
+    dedup_cache_exclusive: bool = False
+    workers: int = 4
+    queue_size: int = 100
+    # raw items buffered between pollers and workers, lowest pre-scores are
+    # shed beyond this (0 keeps a blocking queue of queue_size batches)
+    buffer_items: int = 5000
+    buffer_batch_size: int = 50
+    # normalize and score batches off the event loop ("none" keeps them on it)
+    cpu_executor: Literal["none", "thread", "process"] = "none"
+    # pool size, 0 = number of CPUs
+    cpu_workers: int = 0
+    # how often event loop lag is sampled (0 disables)
+    loop_lag_interval_s: float = 0.25
+    # rolling window of published items for latency percentiles, logged
+    # with the slowest items every latency_report_s (0 disables the log)
+    latency_window: int = 1000
+    latency_report_s: float = 300.0
+    latency_slowest: int = 5
+    drain_timeout_s: float = 30.0
+    http_connections: int = 20
+    provider_start_jitter_s: float = 1.0
+    # port for the Prometheus /metrics endpoint (0 disables it); several
+    # processes on one host need their own, see --metrics-port
+    metrics_port: int = 9108
+    # "0.0.0.0" exposes the endpoint beyond this host
+    metrics_host: str = "127.0.0.1"
+
+
+class ProfilerSettings(BaseModel):
+    """Sampling profiler of the event loop thread, dumped as folded stacks."""
+
+    dir: str = "profiles"
+    interval_ms: float = 5.0
+    # signal toggling the profiler in a running process (None disables)
+    signal: str | None = "SIGUSR2"
+    # profile from start-up, for duration_s seconds (0 = until toggled off)
+    start_on_launch: bool = False
+    duration_s: float = 0.0
+
+
+class StreamsSettings(BaseModel):
+    """Redis Streams transport between poller and worker processes."""
+
+    enabled: bool = False
+    # "poller" only fetches, "worker" only processes, "all" does both
+    role: Literal["all", "poller", "worker"] = "all"
+    key: str = "ingest:raw"
+    group: str = "ingest"
+    # consumer name inside the group; defaults to <hostname>-<pid>
+    consumer: str | None = None
+    batch_size: int = 100
+    block_ms: int = 2000
+    # pending entries idle this long are taken over from dead workers
+    claim_idle_ms: int = 60_000
+    # entries that failed this often go to dead_letter_key (0 retries forever)
+    max_deliveries: int = 5
+    # defaults to "<key>:dead"
+    dead_letter_key: str | None = None
+    maxlen: int = 100_000
+    # lifetime of cross-worker publish claims on fingerprints
+    claim_ttl_s: float = 600.0
+
+
+class ArchiveSettings(BaseModel):
+    # PostgreSQL DSN; the archive is disabled when unset
+    dsn: str | None = None
+    table: str = "news_items"
+    batch_size: int = 500
+    flush_interval_s: float = 5.0
+    max_pending: int = 50_000
+    pool_min_size: int = 1
+    pool_max_size: int = 4
+
+
+class CaptureSettings(BaseModel):
+    # directory for the raw page capture log; capturing is off when unset
+    dir: str | None = None
+    max_segment_mb: float = 64.0
+    max_segment_age_s: float = 3600.0
+    queue_size: int = 1000
 
 
 class Config(BaseModel):
@@ -61,6 +238,10 @@ class Config(BaseModel):
     filters: FiltersSettings
     scoring: ScoringSettings
     runtime: RuntimeSettings
+    streams: StreamsSettings = StreamsSettings()
+    profiler: ProfilerSettings = ProfilerSettings()
+    archive: ArchiveSettings = ArchiveSettings()
+    capture: CaptureSettings = CaptureSettings()
 
 
 def load_config(path: str = "config.yaml") -> Config:
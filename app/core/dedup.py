@@ -1,26 +1,230 @@
 from __future__ import annotations
 
 import hashlib
-from datetime import datetime
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Sequence
+
 import redis.asyncio as redis
 
+KEY = "dedup:seen"
+CLAIM_PREFIX = "dedup:claim"
+
 _client: redis.Redis | None = None
+_cache: LocalCache | None = None
+_window_s: float = 86400
+_namespace: str | None = None
+_clock: Callable[[], float] = time.time
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string fingerprints.
+
+    Bit positions are derived from one BLAKE2b digest with double hashing.
+    Over-filling only raises the false-positive rate; there are never false
+    negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fp: str) -> Iterable[int]:
+        digest = hashlib.blake2b(fp.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, fp: str) -> None:
+        for pos in self._positions(fp):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, fp: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fp))
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+
+
+class LocalCache:
+    """In-process tier in front of the Redis dedup window.
+
+    * an LRU of fingerprints confirmed as seen (with their first-seen time)
+      answers repeats without Redis;
+    * a pair of rotating Bloom filters covering at least the last window
+      answers "definitely new" without Redis, but only when
+      ``trust_negatives`` is set (this process is the only writer) and the
+      cache was warmed from Redis.
+
+    The Bloom generations rotate every ``window_s`` seconds, so the
+    filters never saturate while the window slides.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 20000,
+        trust_negatives: bool = False,
+        window_s: float = 86400,
+    ):
+        self.capacity = capacity
+        self.trust_negatives = trust_negatives
+        self.window_s = window_s
+        self.bloom = BloomFilter(capacity)
+        self._previous = BloomFilter(capacity)
+        self._generation_start: float | None = None
+        self._lru: OrderedDict[str, float] = OrderedDict()
+        self.warmed = False
+        self.hits = 0
+        self.negatives = 0
+        self.misses = 0
+
+    def rotate(self, now: float) -> None:
+        """Start a new Bloom generation once the current one spans a window."""
+        if self._generation_start is None:
+            self._generation_start = now
+            return
+        age = now - self._generation_start
+        if age < self.window_s:
+            return
+        if age >= 2 * self.window_s:
+            self._previous.clear()
+        else:
+            self._previous, self.bloom = self.bloom, self._previous
+        self.bloom.clear()
+        self._generation_start = now
 
+    def __contains__(self, fp: str) -> bool:
+        return fp in self._lru
 
-def init(redis_url: str | None = None, client: redis.Redis | None = None) -> None:
-    """Initialize the Redis client for de-duplication."""
-    global _client
+    def add(self, fp: str, seen_at: float) -> None:
+        self.bloom.add(fp)
+        self._lru[fp] = min(seen_at, self._lru.get(fp, seen_at))
+        self._lru.move_to_end(fp)
+        if len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def lookup(self, fp: str, cutoff: float) -> bool | None:
+        """Return ``True``/``False`` if known locally, ``None`` to ask Redis."""
+        seen_at = self._lru.get(fp)
+        if seen_at is not None:
+            if seen_at >= cutoff:
+                self._lru.move_to_end(fp)
+                self.hits += 1
+                return True
+            del self._lru[fp]
+        if (
+            self.warmed
+            and self.trust_negatives
+            and fp not in self.bloom
+            and fp not in self._previous
+        ):
+            self.negatives += 1
+            return False
+        self.misses += 1
+        return None
+
+    def clear(self) -> None:
+        self.bloom.clear()
+        self._previous.clear()
+        self._lru.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "negatives": self.negatives,
+            "misses": self.misses,
+            "size": len(self._lru),
+        }
+
+
+def init(
+    redis_url: str | None = None,
+    client: redis.Redis | None = None,
+    cache_size: int = 0,
+    trust_local: bool = False,
+    window_s: float = 86400,
+    namespace: str | None = None,
+    clock: Callable[[], float] | None = None,
+) -> None:
+    """Initialize the Redis client for de-duplication.
+
+    Fingerprints count as seen for ``window_s`` seconds after they were
+    first marked.  ``cache_size`` > 0 enables the in-process
+    :class:`LocalCache`.  ``namespace`` prefixes the Redis key, so e.g. a
+    replay can de-duplicate without touching the live set.  ``clock``
+    (default :func:`time.time`) supplies the current time, e.g. a replay's
+    historical one.
+    """
+    global _client, _cache, _window_s, _namespace, _clock
     if client is not None:
         _client = client
     elif redis_url:
         _client = redis.from_url(redis_url, decode_responses=True)
     else:
         raise ValueError("Provide redis_url or client")
+    _window_s = window_s
+    _namespace = namespace
+    _clock = clock or time.time
+    _cache = LocalCache(cache_size, trust_local, window_s) if cache_size > 0 else None
+
+
+def client() -> redis.Redis:
+    """Return the Redis client configured by :func:`init`."""
+    assert _client is not None, "dedup.init() must be called first"
+    return _client
 
 
 def _key() -> str:
-    today = datetime.utcnow().strftime("%Y%m%d")
-    return f"dedup:{today}"
+    return f"{_namespace}:{KEY}" if _namespace else KEY
+
+
+async def clear() -> None:
+    """Forget every fingerprint of the current namespace."""
+    if _cache is not None:
+        _cache.clear()
+    await client().delete(_key())
+
+
+def _now() -> float:
+    return _clock()
+
+
+def _local(now: float) -> LocalCache | None:
+    if _cache is not None:
+        _cache.rotate(now)
+    return _cache
+
+
+def cache_stats() -> dict[str, int]:
+    """Return hit/miss counters of the local cache (empty if disabled)."""
+    return _cache.stats() if _cache is not None else {}
+
+
+async def warm() -> int:
+    """Load the live part of the window into the local cache.
+
+    Returns the number of fingerprints loaded.
+    """
+    assert _client is not None, "dedup.init() must be called first"
+    now = _now()
+    cache = _local(now)
+    if cache is None:
+        return 0
+    cutoff = now - _window_s
+    count = 0
+    async for member, seen_at in _client.zscan_iter(_key(), count=1000):
+        if seen_at < cutoff:
+            continue
+        if isinstance(member, bytes):
+            member = member.decode()
+        cache.add(member, seen_at)
+        count += 1
+    cache.warmed = True
+    return count
 
 
 def fingerprint(url: str | None, title: str, source: str) -> str:
@@ -32,13 +236,135 @@ def fingerprint(url: str | None, title: str, source: str) -> str:
 
 
 async def is_duplicate(fp: str) -> bool:
-    assert _client is not None, "dedup.init() must be called first"
-    return await _client.sismember(_key(), fp)
+    return not (await filter_new([fp]))[0]
 
 
 async def mark_seen(fp: str) -> None:
+    await mark_seen_many([fp])
+
+
+async def filter_new(fps: Sequence[str]) -> list[bool]:
+    """Return a flag per fingerprint telling whether it has not been seen yet.
+
+    Fingerprints not answered by the local cache are checked with a single
+    ``ZMSCORE`` round trip; members older than the window count as new even
+    if they have not been pruned yet.  Repeats inside ``fps`` are reported
+    as new only on their first position.
+    """
+    assert _client is not None, "dedup.init() must be called first"
+    if not fps:
+        return []
+    now = _now()
+    cutoff = now - _window_s
+    cache = _local(now)
+    known: list[bool | None] = [
+        cache.lookup(fp, cutoff) if cache is not None else None for fp in fps
+    ]
+    pending = [fp for fp, k in zip(fps, known) if k is None]
+    if pending:
+        scores = iter(await _client.zmscore(_key(), pending))
+        for i, k in enumerate(known):
+            if k is None:
+                seen_at = next(scores)
+                known[i] = seen_at is not None and seen_at >= cutoff
+                if known[i] and cache is not None:
+                    cache.add(fps[i], seen_at)
+    flags: list[bool] = []
+    batch_seen: set[str] = set()
+    for fp, member in zip(fps, known):
+        flags.append(not member and fp not in batch_seen)
+        batch_seen.add(fp)
+    return flags
+
+
+def _queue_prune(pipe, now: float) -> None:
+    key = _key()
+    pipe.zremrangebyscore(key, "-inf", f"({now - _window_s}")
+
+
+async def mark_seen_many(fps: Iterable[str]) -> None:
+    """Mark all ``fps`` as seen in a single pipelined round trip.
+
+    The same round trip prunes members that slid out of the window, and
+    ``ZADD NX`` keeps the first-seen time of members still inside it.
+    """
+    assert _client is not None, "dedup.init() must be called first"
+    fps = list(dict.fromkeys(fps))
+    if not fps:
+        return
+    now = _now()
+    key = _key()
+    async with _client.pipeline(transaction=True) as pipe:
+        _queue_prune(pipe, now)
+        pipe.zadd(key, {fp: now for fp in fps}, nx=True)
+        pipe.expire(key, int(math.ceil(_window_s)))
+        await pipe.execute()
+    cache = _local(now)
+    if cache is not None:
+        for fp in fps:
+            cache.add(fp, now)
+
+
+def _claim_key(fp: str) -> str:
+    return f"{_namespace}:{CLAIM_PREFIX}:{fp}" if _namespace else f"{CLAIM_PREFIX}:{fp}"
+
+
+async def claim_many(fps: Sequence[str], ttl_s: float = 600) -> list[bool]:
+    """Claim ``fps`` for this process with ``SET NX``; ``True`` where won.
+
+    Processes sharing the dedup set claim fingerprints before looking them
+    up and release them only after :func:`mark_seen_many`, so a fingerprint
+    is never published by two processes.  Claims expire after ``ttl_s`` in
+    case the holder dies.
+    """
+    assert _client is not None, "dedup.init() must be called first"
+    if not fps:
+        return []
+    ttl_ms = int(ttl_s * 1000)
+    async with _client.pipeline(transaction=False) as pipe:
+        for fp in fps:
+            pipe.set(_claim_key(fp), 1, nx=True, px=ttl_ms)
+        return [bool(r) for r in await pipe.execute()]
+
+
+async def release_many(fps: Iterable[str]) -> None:
+    """Drop claims taken with :func:`claim_many`."""
+    assert _client is not None, "dedup.init() must be called first"
+    keys = [_claim_key(fp) for fp in fps]
+    if keys:
+        await _client.delete(*keys)
+
+
+async def check_and_mark(fps: Sequence[str]) -> list[bool]:
+    """Atomically mark ``fps`` as seen and report which ones were new.
+
+    After pruning, one ``ZADD NX`` per fingerprint is queued in a single
+    transaction so the reply tells, per member, whether it was added (new)
+    or already present.  Fingerprints confirmed by the local cache are not
+    sent.
+    """
     assert _client is not None, "dedup.init() must be called first"
+    if not fps:
+        return []
+    now = _now()
+    cutoff = now - _window_s
     key = _key()
-    await _client.sadd(key, fp)
-    # 24h TTL
-    await _client.expire(key, 86400)
+    cache = _local(now)
+    result = [False] * len(fps)
+    pending = [
+        (i, fp)
+        for i, fp in enumerate(fps)
+        if cache is None or cache.lookup(fp, cutoff) is not True
+    ]
+    if pending:
+        async with _client.pipeline(transaction=True) as pipe:
+            _queue_prune(pipe, now)
+            for _, fp in pending:
+                pipe.zadd(key, {fp: now}, nx=True)
+            pipe.expire(key, int(math.ceil(_window_s)))
+            replies = await pipe.execute()
+        for (i, fp), added in zip(pending, replies[1:]):
+            result[i] = bool(added)
+            if cache is not None:
+                cache.add(fp, now)
+    return result
@@ -0,0 +1,66 @@
+"""Precompiled domain blocklist.
+
+:class:`DomainFilter` answers "does this netloc match any pattern" with the
+same semantics as looping :func:`fnmatch.fnmatch` over the patterns, but in
+time proportional to the number of labels in the domain:
+
+* plain domains and ``*.suffix`` wildcards go into a trie keyed by reversed
+  labels;
+* any other glob is folded into one combined regular expression.
+"""
+from __future__ import annotations
+
+import os
+import re
+from fnmatch import translate
+from typing import Iterable
+
+_GLOB_CHARS = set("*?[")
+# trie node markers for "pattern ends here" and "``*.`` wildcard ends here";
+# objects, so they can never collide with a label
+_EXACT = object()
+_WILDCARD = object()
+
+
+class DomainFilter:
+    """Match domains against glob patterns compiled once."""
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._trie: dict = {}
+        globs: list[str] = []
+        self.size = 0
+        for pattern in patterns:
+            self.size += 1
+            # fnmatch() normalizes case the same way for name and pattern
+            pattern = os.path.normcase(pattern)
+            if not _GLOB_CHARS.intersection(pattern):
+                self._insert(pattern.split("."), _EXACT)
+            elif pattern.startswith("*.") and not _GLOB_CHARS.intersection(pattern[2:]):
+                self._insert(pattern[2:].split("."), _WILDCARD)
+            else:
+                globs.append(translate(pattern))
+        self._regex = re.compile("|".join(f"(?:{g})" for g in globs)) if globs else None
+
+    def _insert(self, labels: list[str], marker: str) -> None:
+        node = self._trie
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        node[marker] = True
+
+    def __len__(self) -> int:
+        return self.size
+
+    def matches(self, domain: str) -> bool:
+        domain = os.path.normcase(domain)
+        labels = domain.split(".")
+        node = self._trie
+        for i in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[i])
+            if node is None:
+                break
+            if i == 0:
+                if _EXACT in node:
+                    return True
+            elif _WILDCARD in node:
+                return True
+        return bool(self._regex is not None and self._regex.match(domain))
@@ -0,0 +1,127 @@
+"""Per-item stage timestamps and rolling end-to-end latency percentiles.
+
+Providers stamp every raw item with its fetch time (``FETCHED_AT``); the
+pipeline adds when its batch was normalized, de-duplicated and scored, and
+when the alert was handed to and delivered by the publisher.  Published
+items are fed to a :class:`LatencyTracker`, which keeps the most recent
+ones, exports the end-to-end spans to Prometheus and periodically logs
+percentiles together with the slowest items.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, MutableMapping
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# key of the fetch time (unix seconds) on raw provider items
+FETCHED_AT = "_fetched_at"
+
+
+def stamp_fetched(items: Iterable[MutableMapping[str, Any]], now: float | None = None) -> None:
+    """Record ``now`` as fetch time on items that have none yet."""
+    now = time.time() if now is None else now
+    for item in items:
+        item.setdefault(FETCHED_AT, now)
+
+
+@dataclass(slots=True)
+class ItemTimeline:
+    """Unix timestamps of one published item, from publication to delivery."""
+
+    url: str
+    published: float
+    fetched: float
+    normalized: float
+    deduped: float
+    scored: float
+    enqueued: float
+    sent: float
+
+    def spans(self) -> dict[str, float]:
+        return {
+            "published_to_sent": self.sent - self.published,
+            "fetched_to_sent": self.sent - self.fetched,
+            "fetched_to_normalized": self.normalized - self.fetched,
+            "dedup": self.deduped - self.normalized,
+            "score": self.scored - self.deduped,
+            "publish_wait": self.sent - self.enqueued,
+        }
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+class LatencyTracker:
+    """Rolling window over the timelines of the last ``window`` published items.
+
+    Every ``report_interval_s`` (0 disables) the p50/p90/p99 of each span
+    and the ``slowest`` items by fetch-to-delivery time are logged.
+    """
+
+    def __init__(
+        self,
+        window: int = 1000,
+        report_interval_s: float = 60.0,
+        slowest: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.timelines: deque[ItemTimeline] = deque(maxlen=window)
+        self.report_interval_s = report_interval_s
+        self.slowest_count = slowest
+        self._clock = clock
+        self._last_report = clock()
+
+    def __len__(self) -> int:
+        return len(self.timelines)
+
+    def record(self, timelines: Iterable[ItemTimeline]) -> None:
+        for timeline in timelines:
+            self.timelines.append(timeline)
+            metrics.LATENCY_PUBLISHED.observe(timeline.sent - timeline.published)
+            metrics.LATENCY_FETCHED.observe(timeline.sent - timeline.fetched)
+        now = self._clock()
+        if self.report_interval_s and now - self._last_report >= self.report_interval_s:
+            self._last_report = now
+            self.report()
+
+    def percentiles(self, qs: Iterable[float] = (0.5, 0.9, 0.99)) -> dict[str, dict[str, float]]:
+        """``{span: {"p50": seconds, ...}}`` over the current window."""
+        if not self.timelines:
+            return {}
+        spans = [t.spans() for t in self.timelines]
+        out = {}
+        for name in spans[0]:
+            values = sorted(s[name] for s in spans)
+            out[name] = {f"p{round(q * 100)}": percentile(values, q) for q in qs}
+        return out
+
+    def slowest(self, n: int | None = None) -> list[ItemTimeline]:
+        n = self.slowest_count if n is None else n
+        return sorted(self.timelines, key=lambda t: t.sent - t.fetched, reverse=True)[:n]
+
+    def report(self) -> None:
+        if not self.timelines:
+            return
+        for name, values in self.percentiles().items():
+            logger.info(
+                "latency %s over %d items: %s",
+                name,
+                len(self.timelines),
+                " ".join(f"{k}={v:.3f}s" for k, v in values.items()),
+            )
+        for timeline in self.slowest():
+            logger.info(
+                "slow item %s: %s",
+                timeline.url,
+                " ".join(f"{k}={v:.3f}s" for k, v in timeline.spans().items()),
+            )
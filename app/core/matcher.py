@@ -0,0 +1,174 @@
+"""Multi-pattern ticker and keyword matcher.
+
+:class:`KeywordMatcher` compiles a lexicon of ticker symbols, project names,
+``$CASHTAGS`` and weighted event keywords into a token-level Aho-Corasick
+automaton.  Text is split into word tokens once and the automaton walks them
+in a single pass, so the cost depends on the text length, not on the size of
+the lexicon.  Working on whole tokens also gives word-boundary semantics for
+free: ``eth`` never matches inside ``ethics``.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Mapping
+
+import yaml
+
+DEFAULT_LEXICON = Path(__file__).resolve().parent.parent / "data" / "lexicon.yaml"
+
+# ``$`` stays part of a token so cashtags survive tokenization.
+_ASCII_SEPARATORS = str.maketrans(
+    {c: " " for c in map(chr, range(128)) if not (c.isalnum() or c in "_$")}
+)
+_TOKEN_RE = re.compile(r"[\w$]+")
+
+_default: KeywordMatcher | None = None
+
+
+def tokenize(text: str) -> list[str]:
+    """Split ``text`` into word tokens (``\\w`` runs, ``$`` included)."""
+    tokens = text.translate(_ASCII_SEPARATORS).split()
+    if text.isascii():
+        return tokens
+    # non-ASCII punctuation is not covered by the translation table
+    out: list[str] = []
+    for token in tokens:
+        if token.isascii():
+            out.append(token)
+        else:
+            out.extend(_TOKEN_RE.findall(token))
+    return out
+
+
+@dataclass
+class Matches:
+    """Result of :meth:`KeywordMatcher.match`."""
+
+    tickers: list[str] = field(default_factory=list)
+    keywords: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class _Output:
+    kind: str  # "ticker" or "keyword"
+    name: str
+    weight: float = 0.0
+    # original-case tokens that must match exactly, for ambiguous symbols
+    exact: tuple[str, ...] | None = None
+
+
+class KeywordMatcher:
+    """Token-level Aho-Corasick automaton over a ticker/keyword lexicon.
+
+    ``tickers`` maps a canonical symbol to its aliases (project names,
+    alternative symbols); the symbol itself and its ``$`` cashtag are always
+    included.  Symbols listed in ``case_sensitive`` (``OP``, ``LINK``, ...)
+    only match as written in upper case or as a cashtag, so ordinary English
+    words do not count as tickers.  ``keywords`` maps event phrases to
+    weights.
+    """
+
+    def __init__(
+        self,
+        tickers: Mapping[str, Iterable[str]] | None = None,
+        keywords: Mapping[str, float] | None = None,
+        case_sensitive: Iterable[str] = (),
+    ):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[_Output]] = [[]]
+        strict = {s.upper() for s in case_sensitive}
+        for symbol, aliases in (tickers or {}).items():
+            symbol = symbol.upper()
+            exact = (symbol,) if symbol in strict else None
+            self._add(symbol, _Output("ticker", symbol, exact=exact))
+            self._add(f"${symbol}", _Output("ticker", symbol))
+            for alias in aliases or ():
+                self._add(alias, _Output("ticker", symbol))
+        for phrase, weight in (keywords or {}).items():
+            self._add(phrase, _Output("keyword", phrase.lower(), float(weight)))
+        self._build()
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> KeywordMatcher:
+        """Load a YAML lexicon with ``tickers``, ``keywords`` and ``case_sensitive``."""
+        with open(path) as fh:
+            data = yaml.safe_load(fh) or {}
+        return cls(
+            tickers=data.get("tickers"),
+            keywords=data.get("keywords"),
+            case_sensitive=data.get("case_sensitive") or (),
+        )
+
+    # ------------------------------------------------------------------
+    def _add(self, pattern: str, output: _Output) -> None:
+        tokens = tokenize(pattern.lower())
+        if not tokens:
+            return
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(output)
+
+    def _build(self) -> None:
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and token not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    # ------------------------------------------------------------------
+    def match(self, text: str) -> Matches:
+        """Return sorted tickers and ``{keyword: weight}`` found in ``text``."""
+        original = tokenize(text)
+        # lower() never introduces whitespace, so the tokens stay aligned
+        lowered = " ".join(original).lower().split()
+        goto, fail, out = self._goto, self._fail, self._out
+        tickers: set[str] = set()
+        keywords: dict[str, float] = {}
+        node = 0
+        for i, token in enumerate(lowered):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if not node:
+                continue
+            for hit in out[node]:
+                if hit.exact is not None:
+                    start = i + 1 - len(hit.exact)
+                    if tuple(original[start : i + 1]) != hit.exact:
+                        continue
+                if hit.kind == "ticker":
+                    tickers.add(hit.name)
+                else:
+                    keywords[hit.name] = hit.weight
+        return Matches(sorted(tickers), keywords)
+
+
+def default_matcher() -> KeywordMatcher:
+    """Return the process-wide matcher, loading the bundled lexicon lazily."""
+    global _default
+    if _default is None:
+        _default = KeywordMatcher.from_file(DEFAULT_LEXICON)
+    return _default
+
+
+def load_lexicon(path: str | Path | None) -> KeywordMatcher:
+    """Replace the process-wide matcher with one built from ``path``."""
+    global _default
+    _default = KeywordMatcher.from_file(path or DEFAULT_LEXICON)
+    return _default
@@ -0,0 +1,159 @@
+"""Prometheus metrics for the ingest pipeline.
+
+All collectors live in this module and are registered once at import time.
+Hot paths record per batch rather than per item and use label children bound
+ahead of time, so instrumentation costs a few attribute lookups per batch.
+Queue depths are sampled lazily at scrape time via ``set_function``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+)
+
+STAGE_SECONDS = Histogram(
+    "newsbot_stage_seconds",
+    "Time spent per pipeline stage and batch",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+ITEMS = Counter(
+    "newsbot_items_total",
+    "Items entering (in) and leaving (out) each pipeline stage",
+    ["stage", "direction"],
+)
+DROPPED = Counter(
+    "newsbot_items_dropped_total",
+    "Items dropped by the pipeline, by reason",
+    ["reason"],
+)
+QUEUE_DEPTH = Gauge(
+    "newsbot_queue_depth",
+    "Items waiting in an internal queue",
+    ["queue"],
+)
+POLL_SECONDS = Histogram(
+    "newsbot_provider_poll_seconds",
+    "Duration of a whole provider poll cycle",
+    ["provider"],
+    buckets=_LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "newsbot_provider_request_seconds",
+    "Duration of single provider HTTP requests",
+    ["provider"],
+    buckets=_LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "newsbot_provider_requests_total",
+    "Provider HTTP requests by outcome",
+    ["provider", "outcome"],
+)
+BACKOFF_ATTEMPT = Gauge(
+    "newsbot_provider_backoff_attempt",
+    "Consecutive failed polls (0 when the provider is healthy)",
+    ["provider"],
+)
+POLL_INTERVAL = Gauge(
+    "newsbot_provider_poll_interval_seconds",
+    "Delay chosen by the provider's poll policy before its next cycle",
+    ["provider"],
+)
+ITEM_LATENCY = Histogram(
+    "newsbot_item_latency_seconds",
+    "Time until a published item was delivered, from its publication or first fetch",
+    ["since"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 10800, 21600),
+)
+LOOP_LAG = Histogram(
+    "newsbot_event_loop_lag_seconds",
+    "How much later than requested the event loop resumed a sleeping task",
+    buckets=_LATENCY_BUCKETS,
+)
+PUBLISH_SECONDS = Histogram(
+    "newsbot_publish_seconds",
+    "Telegram publishing latency: queue wait and API call",
+    ["phase"],
+    buckets=_LATENCY_BUCKETS,
+)
+PUBLISH_MESSAGES = Counter(
+    "newsbot_publish_messages_total",
+    "Telegram messages by outcome",
+    ["outcome"],
+)
+
+# Pre-bound children for the per-batch hot path.
+NORMALIZE_SECONDS = STAGE_SECONDS.labels("normalize")
+# normalize + score in the CPU executor, including time queued for a worker
+PREPARE_SECONDS = STAGE_SECONDS.labels("prepare")
+DEDUP_SECONDS = STAGE_SECONDS.labels("dedup")
+SCORE_SECONDS = STAGE_SECONDS.labels("score")
+PUBLISH_STAGE_SECONDS = STAGE_SECONDS.labels("publish")
+FETCHED = ITEMS.labels("fetch", "out")
+NORMALIZED = ITEMS.labels("normalize", "out")
+DEDUP_OUT = ITEMS.labels("dedup", "out")
+SCORED = ITEMS.labels("score", "out")
+PUBLISHED = ITEMS.labels("publish", "out")
+ARCHIVED = ITEMS.labels("archive", "out")
+PUBLISH_WAIT = PUBLISH_SECONDS.labels("wait")
+PUBLISH_API = PUBLISH_SECONDS.labels("api")
+LATENCY_PUBLISHED = ITEM_LATENCY.labels("published")
+LATENCY_FETCHED = ITEM_LATENCY.labels("fetched")
+
+
+@dataclass
+class ProviderMetrics:
+    """Label children bound to one provider name."""
+
+    poll_seconds: Histogram
+    request_seconds: Histogram
+    requests_ok: Counter
+    requests_error: Counter
+    backoff: Gauge
+    interval: Gauge
+
+
+def provider(name: str) -> ProviderMetrics:
+    return ProviderMetrics(
+        poll_seconds=POLL_SECONDS.labels(name),
+        request_seconds=REQUEST_SECONDS.labels(name),
+        requests_ok=REQUESTS.labels(name, "ok"),
+        requests_error=REQUESTS.labels(name, "error"),
+        backoff=BACKOFF_ATTEMPT.labels(name),
+        interval=POLL_INTERVAL.labels(name),
+    )
+
+
+def drop(reason: str, count: int = 1) -> None:
+    if count:
+        DROPPED.labels(reason).inc(count)
+
+
+def track_queue(name: str, depth: Callable[[], float]) -> None:
+    """Report ``depth()`` as the size of queue ``name`` on every scrape."""
+    QUEUE_DEPTH.labels(name).set_function(depth)
+
+
+async def watch_loop_lag(interval: float = 0.25) -> None:
+    """Sample event loop lag every ``interval`` seconds until cancelled."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(0.0, time.perf_counter() - started - interval))
+
+
+def serve(port: int, addr: str = "127.0.0.1") -> None:
+    """Expose ``/metrics`` on ``port`` from a background thread (0 disables)."""
+    if port:
+        start_http_server(port, addr=addr)
+        logger.info("metrics listening on %s:%d", addr, port)
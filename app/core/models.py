@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from pydantic import BaseModel, AnyUrl
-from typing import List
+from typing import Dict, List
 
 
 class NormalizedItem(BaseModel):
@@ -17,4 +17,8 @@ class NormalizedItem(BaseModel):
     language: str | None = None
     authors: List[str] = []
     tickers: List[str] = []
+    # matched event keywords with their lexicon weights
+    keywords: Dict[str, float] = {}
     categories: List[str] = []
+    # unix time the provider fetched the raw item, for latency tracking
+    fetched_at: float | None = None
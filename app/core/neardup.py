@@ -0,0 +1,207 @@
+"""Near-duplicate story detection across sources and URLs.
+
+:class:`NearDuplicateIndex` keeps MinHash signatures of recently published
+titles and summaries in LSH bands, so a lookup only compares against the few
+stored items that share a band with the query.  Candidates are confirmed with
+:mod:`rapidfuzz` before an item is reported as a rewrite.
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import time
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+
+from rapidfuzz import fuzz
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_MASK = (1 << 64) - 1
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be by for from has have in is it its of on or that the
+    this to was were will with after amid over says say new
+    и в во не на что с со по за из к о от у для как это
+    """.split()
+)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, fold unicode compatibility forms and collapse punctuation."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(_TOKEN_RE.findall(text))
+
+
+def _hash64(token: str) -> int:
+    # str hashes are salted per process; signatures must not depend on that
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+
+
+def _tokens(text: str) -> set[str]:
+    return {t for t in text.split() if t not in _STOPWORDS}
+
+
+@dataclass
+class _Entry:
+    key: str
+    added_at: float
+    title: str
+    summary: str
+    bands: tuple[int, ...]
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash/LSH index of recently published stories.
+
+    Titles and summaries get separate MinHash signatures of ``bands * rows``
+    values each.  Two items become candidates when all ``rows`` values of
+    any band match, which happens with high probability above a Jaccard
+    similarity of roughly ``(1 / bands) ** (1 / rows)``.  Candidates are
+    confirmed with :func:`rapidfuzz.fuzz.token_set_ratio` on titles or
+    summaries.  Entries older than ``window_s`` are evicted lazily.
+    """
+
+    def __init__(
+        self,
+        window_s: float = 6 * 3600,
+        bands: int = 12,
+        rows: int = 4,
+        threshold: float = 80.0,
+        summary_tokens: int = 30,
+        seed: int = 1,
+    ):
+        self.window_s = window_s
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self.summary_tokens = summary_tokens
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(bands * rows)
+        ]
+        self._buckets: dict[int, set[str]] = {}
+        self._entries: dict[str, _Entry] = {}
+        self._order: deque[_Entry] = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    def prepare(self, title: str, summary: str | None = None) -> tuple[str, str, tuple[int, ...]]:
+        """Return the normalized texts and LSH band keys for a story.
+
+        The result only depends on the index parameters, so it can be
+        computed by another process and passed to :meth:`check_and_add`.
+        """
+        norm_title = normalize_text(title)
+        norm_summary = ""
+        if summary:
+            norm_summary = " ".join(normalize_text(summary).split()[: self.summary_tokens])
+        bands = self._band_keys(_tokens(norm_title), 0) + self._band_keys(
+            _tokens(norm_summary), self.bands
+        )
+        return norm_title, norm_summary, bands
+
+    def _band_keys(self, shingles: set[str], offset: int) -> tuple[int, ...]:
+        if not shingles:
+            return ()
+        hashes = [_hash64(s) for s in shingles]
+        sig = [min((a * h + b) & _MASK for h in hashes) for a, b in self._perms]
+        rows = self.rows
+        return tuple(
+            hash((offset + band, *sig[band * rows : (band + 1) * rows]))
+            for band in range(self.bands)
+        )
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.window_s
+        order = self._order
+        while order and order[0].added_at < cutoff:
+            entry = order.popleft()
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+                self._unlink(entry)
+
+    def _unlink(self, entry: _Entry) -> None:
+        for band_key in entry.bands:
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(entry.key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def _match(self, title: str, summary: str, bands: tuple[int, ...]) -> str | None:
+        candidates: set[str] = set()
+        for band_key in bands:
+            bucket = self._buckets.get(band_key)
+            if bucket:
+                candidates |= bucket
+        cutoff = self.threshold
+        for key in candidates:
+            entry = self._entries[key]
+            if fuzz.token_set_ratio(title, entry.title, score_cutoff=cutoff):
+                return key
+            if (
+                summary
+                and entry.summary
+                and fuzz.token_set_ratio(summary, entry.summary, score_cutoff=cutoff)
+            ):
+                return key
+        return None
+
+    def _insert(self, key: str, prepared: tuple[str, str, tuple[int, ...]], now: float) -> None:
+        title, summary, bands = prepared
+        old = self._entries.get(key)
+        if old is not None:
+            self._unlink(old)
+        entry = _Entry(key, now, title, summary, bands)
+        self._entries[key] = entry
+        self._order.append(entry)
+        for band_key in bands:
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    # ------------------------------------------------------------------
+    def query(
+        self, title: str, summary: str | None = None, now: float | None = None
+    ) -> str | None:
+        """Return the key of a stored story that ``title`` rewrites, if any."""
+        self._evict(time.time() if now is None else now)
+        return self._match(*self.prepare(title, summary))
+
+    def add(
+        self,
+        key: str,
+        title: str,
+        summary: str | None = None,
+        now: float | None = None,
+    ) -> None:
+        """Index a published story under ``key``."""
+        now = time.time() if now is None else now
+        self._evict(now)
+        self._insert(key, self.prepare(title, summary), now)
+
+    def discard(self, key: str) -> None:
+        """Forget ``key``, e.g. when publishing the story failed."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._unlink(entry)
+
+    def check_and_add(
+        self,
+        key: str,
+        title: str,
+        summary: str | None = None,
+        now: float | None = None,
+        prepared: tuple[str, str, tuple[int, ...]] | None = None,
+    ) -> str | None:
+        """Return the matching key, or index the story and return ``None``."""
+        now = time.time() if now is None else now
+        self._evict(now)
+        if prepared is None:
+            prepared = self.prepare(title, summary)
+        match = self._match(*prepared)
+        if match is None:
+            self._insert(key, prepared, now)
+        return match
@@ -1,44 +1,94 @@
 from __future__ import annotations
 
 import hashlib
+import logging
 import re
 from datetime import datetime, timezone
-from typing import Iterable
+from typing import Any, Callable, Iterable, Mapping
 from urllib.parse import urlparse
 
-from dateutil import parser
+from pydantic import TypeAdapter, ValidationError
 
+from . import metrics
+from .latency import FETCHED_AT
+from .matcher import default_matcher
 from .models import NormalizedItem
 
-# Simple dictionary of common tickers for extraction
-TICKER_PATTERN = re.compile(
-    r"\b(BTC|ETH|SOL|BNB|XRP|ADA|DOGE|DOT|ARB|OP|LINK|MATIC|LTC|XMR|SHIB)\b",
-    re.IGNORECASE,
-)
+logger = logging.getLogger(__name__)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_ITEMS = TypeAdapter(list[NormalizedItem])
+
+
+def parse_timestamp(value: str | datetime) -> datetime:
+    """Return ``value`` as an aware UTC datetime.
+
+    ISO-8601 and Newsdata's ``YYYY-MM-DD HH:MM:SS`` go through
+    :meth:`datetime.fromisoformat`; anything else falls back to dateutil.
+    Naive values are taken as UTC, which is what Newsdata reports.
+    """
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            dt = _dateutil_parse(value)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _dateutil_parse(value: str) -> datetime:
+    # imported on first use: feeds with ISO/RFC 2822 dates never need it
+    from dateutil import parser
+
+    return parser.parse(value)
 
 
 def _strip_html(text: str | None) -> str | None:
     if not text:
         return None
-    return re.sub(r"<[^>]+>", "", text).strip()
+    if "<" not in text:
+        return text.strip()
+    return _TAG_RE.sub("", text).strip()
 
 
-def _extract_tickers(text: str) -> list[str]:
-    return sorted({m.group(1).upper() for m in TICKER_PATTERN.finditer(text)})
+class _DateParser:
+    """Timestamp parser that remembers which strict format matched last.
 
+    Feeds use one format for every item, so a batch only pays for failed
+    attempts on its first item.  The strict formats never accept each
+    other's strings, and dateutil stays the last resort, so results equal
+    :func:`parse_timestamp`.
+    """
 
-def normalize_newsdata(raw: dict) -> NormalizedItem:
-    """Normalize a Newsdata.io payload into :class:`NormalizedItem`."""
+    def __init__(self):
+        self._formats: list[Callable[[str], datetime]] = [
+            datetime.fromisoformat,
+            lambda v: datetime.strptime(v, "%a, %d %b %Y %H:%M:%S %z"),
+        ]
 
+    def __call__(self, value: str | datetime) -> datetime:
+        if isinstance(value, datetime):
+            return parse_timestamp(value)
+        for i, fmt in enumerate(self._formats):
+            try:
+                dt = fmt(value)
+            except ValueError:
+                continue
+            if i:
+                self._formats.insert(0, self._formats.pop(i))
+            return parse_timestamp(dt)
+        return parse_timestamp(_dateutil_parse(value))
+
+
+def _fields(raw: Mapping[str, Any], parse_date: Callable[[Any], datetime]) -> dict:
     title = _strip_html(raw.get("title", "")) or ""
     summary = _strip_html(raw.get("description") or raw.get("content"))
     url = raw.get("link") or raw.get("url") or ""
-    published_str = raw.get("pubDate") or raw.get("published_at")
-    published_at = (
-        parser.parse(published_str).astimezone(timezone.utc)
-        if published_str
-        else datetime.now(timezone.utc)
-    )
+    published = raw.get("pubDate") or raw.get("published_at")
+    published_at = parse_date(published) if published else datetime.now(timezone.utc)
     language = raw.get("language")
     authors = raw.get("creator") or []
     if isinstance(authors, str):
@@ -46,11 +96,13 @@ def normalize_newsdata(raw: dict) -> NormalizedItem:
     categories = raw.get("category") or []
     if isinstance(categories, str):
         categories = [categories]
+    # one pass over the text finds tickers and weighted event keywords
+    matches = default_matcher().match(f"{title} {summary or ''}")
     tickers = raw.get("coin") or raw.get("tickers") or []
     if isinstance(tickers, str):
         tickers = [tickers]
     if not tickers:
-        tickers = _extract_tickers(f"{title} {summary or ''}")
+        tickers = matches.tickers
     external_id = raw.get("article_id") or raw.get("id")
     if not external_id:
         external_id = hashlib.sha1(url.encode()).hexdigest()
@@ -58,7 +110,7 @@ def normalize_newsdata(raw: dict) -> NormalizedItem:
     if not source:
         source = urlparse(url).netloc
 
-    return NormalizedItem(
+    return dict(
         external_id=external_id,
         source=source or "newsdata",
         title=title,
@@ -68,5 +120,48 @@ def normalize_newsdata(raw: dict) -> NormalizedItem:
         language=language,
         authors=authors,
         tickers=tickers,
+        keywords=matches.keywords,
         categories=categories,
+        fetched_at=raw.get(FETCHED_AT),
     )
+
+
+def normalize_newsdata(raw: dict) -> NormalizedItem:
+    """Normalize a Newsdata.io payload into :class:`NormalizedItem`."""
+
+    return NormalizedItem(**_fields(raw, parse_timestamp))
+
+
+def normalize_batch(raws: Iterable[Mapping[str, Any]]) -> list[NormalizedItem]:
+    """Normalize many payloads; equivalent to mapping :func:`normalize_newsdata`.
+
+    The date format is detected once per batch and all items are validated
+    in a single pydantic-core call.  Items whose fields cannot be extracted
+    (e.g. an unparseable date) or that fail validation are skipped and
+    counted as dropped ``invalid``, so one malformed article does not cost
+    the rest of the batch.
+    """
+
+    parse_date = _DateParser()
+    raws = list(raws)
+    fields = []
+    for raw in raws:
+        try:
+            fields.append(_fields(raw, parse_date))
+        except (ValueError, TypeError, AttributeError, OverflowError) as exc:
+            logger.debug("skipping malformed article %s: %s", _raw_id(raw), exc)
+    try:
+        items = _ITEMS.validate_python(fields)
+    except ValidationError:
+        items = []
+        for item in fields:
+            try:
+                items.append(NormalizedItem.model_validate(item))
+            except ValidationError as exc:
+                logger.debug("skipping malformed article %s: %s", item["external_id"], exc)
+    metrics.drop("invalid", len(raws) - len(items))
+    return items
+
+
+def _raw_id(raw: Mapping[str, Any]) -> Any:
+    return raw.get("article_id") or raw.get("id") or raw.get("link") or raw.get("url")
@@ -0,0 +1,112 @@
+"""Sampling profiler that can be switched on and off in a running process.
+
+A daemon thread samples the stack of one thread (the event loop's) every
+``interval_s`` and counts identical stacks.  :meth:`SamplingProfiler.stop`
+writes them in the "folded" format understood by flamegraph tools
+(``frame;frame;frame count`` per line, outermost frame first) and logs the
+hottest ones.  :meth:`~SamplingProfiler.toggle` is meant to be bound to a
+signal, e.g. ``kill -USR2 <pid>``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _folded(frame: FrameType | None, max_depth: int) -> str:
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Count stacks of ``thread_id`` (default: the creating thread)."""
+
+    def __init__(
+        self,
+        out_dir: str | Path = "profiles",
+        interval_s: float = 0.005,
+        thread_id: int | None = None,
+        max_depth: int = 64,
+        top: int = 10,
+    ):
+        self.out_dir = Path(out_dir)
+        self.interval_s = interval_s
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.max_depth = max_depth
+        self.top = top
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.started_at: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.stacks.clear()
+        self.samples = 0
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info("profiler started, sampling every %.1f ms", self.interval_s * 1000)
+
+    def stop(self) -> Path | None:
+        """Stop sampling and dump the stacks; returns the written file."""
+        if self._thread is None:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return self.dump()
+
+    def toggle(self) -> None:
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[_folded(frame, self.max_depth)] += 1
+            self.samples += 1
+            del frame
+
+    def dump(self) -> Path | None:
+        if not self.samples:
+            logger.info("profiler stopped without samples")
+            return None
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"profile-{int(self.started_at or time.time())}.folded"
+        with open(path, "w") as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+        logger.info("profiler wrote %d samples to %s", self.samples, path)
+        for stack, count in self.stacks.most_common(self.top):
+            # the innermost frames say where the time went
+            leaf = " <- ".join(reversed(stack.split(";")[-3:]))
+            logger.info("  %5.1f%%  %s", 100 * count / self.samples, leaf)
+        return path
@@ -2,16 +2,26 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
-from datetime import datetime
+import heapq
+import itertools
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from html import escape
-from typing import Iterable
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, Sequence
 
 from pydantic import SecretStr
 from zoneinfo import ZoneInfo
 
-from telegram import Bot
-from telegram.constants import ParseMode
+from . import metrics
+
+if TYPE_CHECKING:  # python-telegram-bot is imported on first send
+    from telegram import Bot
+
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -31,7 +41,8 @@ def format_message(item: NewsItem, tz: ZoneInfo) -> str:
     local_time = item.published_at.astimezone(tz).strftime("%Y-%m-%d %H:%M")
     tickers = ", ".join(item.tickers) if item.tickers else "-"
     title = escape(item.title)
-    summary = escape(item.summary)[:500]
+    # cut the plain text, never the markup
+    summary = escape(item.summary[:500])
     url = escape(item.url)
     source = escape(item.source)
     return (
@@ -41,25 +52,345 @@ def format_message(item: NewsItem, tz: ZoneInfo) -> str:
         f'<a href="{url}">Open source</a>'
     )
 
+
+MAX_MESSAGE_LEN = 4096
+
+
+def _digest_groups(
+    items: Sequence[NewsItem], tz: ZoneInfo, group_by: str, window_min: int
+) -> dict[str | datetime, list[NewsItem]]:
+    groups: dict[str | datetime, list[NewsItem]] = {}
+    for item in items:
+        key: str | datetime
+        if group_by == "time":
+            local = item.published_at.astimezone(tz)
+            key = local.replace(
+                minute=local.minute - local.minute % window_min, second=0, microsecond=0
+            )
+        else:
+            key = next(iter(item.tickers), None) or "Other"
+        groups.setdefault(key, []).append(item)
+    if group_by == "time":
+        return dict(sorted(groups.items()))
+    return groups
+
+
+def _render_digest(
+    items: Sequence[NewsItem],
+    tz: ZoneInfo,
+    group_by: str,
+    window_min: int,
+    title_len: int = 200,
+    links: bool = True,
+) -> str:
+    lines = [f"<b>📰 Digest: {len(items)} alerts</b>"]
+    groups = _digest_groups(items, tz, group_by, window_min)
+    # time buckets show their date only when the digest spans several days
+    days = {key.date() for key in groups if isinstance(key, datetime)}
+    bucket_format = "%H:%M" if len(days) <= 1 else "%Y-%m-%d %H:%M"
+    for key, group in groups.items():
+        label = key.strftime(bucket_format) if isinstance(key, datetime) else key
+        lines.append(f"\n<b>{escape(label)}</b>")
+        for item in group:
+            title = escape(item.title[:title_len])
+            if links:
+                title = f'<a href="{escape(item.url)}">{title}</a>'
+            local_time = item.published_at.astimezone(tz).strftime("%H:%M")
+            lines.append(f"• {title} — {escape(item.source)}, {local_time}")
+    return "\n".join(lines)
+
+
+def _cut_html(text: str, max_len: int) -> str:
+    """Cut ``text`` to ``max_len`` without leaving a broken tag, entity or ``<b>``."""
+    closing = "</b>"
+    text = text[: max_len - len(closing)]
+    text = re.sub(r"(<[^>]*|&[^;\s]*)$", "", text)
+    if text.count("<b>") > text.count("</b>"):
+        text += closing
+    return text
+
+
+def format_digest(
+    items: Sequence[NewsItem],
+    tz: ZoneInfo,
+    *,
+    group_by: str = "ticker",
+    window_min: int = 15,
+    max_len: int = MAX_MESSAGE_LEN,
+) -> tuple[str, int]:
+    """Render the longest prefix of ``items`` that fits into one message.
+
+    Items are grouped by their first ticker (``group_by="ticker"``) or by
+    ``window_min`` buckets of local publish time (``group_by="time"``).
+    Returns the HTML text and how many leading items it covers; callers
+    keep the rest for the next message.  At least one item is always
+    included; if it does not fit, its title is shortened before rendering,
+    then its link is dropped, and as a last resort the message is cut
+    without breaking the markup.
+    """
+
+    count = 0
+    text = ""
+    for n in range(1, len(items) + 1):
+        candidate = _render_digest(items[:n], tz, group_by, window_min)
+        if len(candidate) > max_len and n > 1:
+            break
+        text, count = candidate, n
+    for links in (True, False):
+        title_len = 200
+        text = _render_digest(items[:count], tz, group_by, window_min, title_len, links)
+        while len(text) > max_len and title_len > 0:
+            # escaping may lengthen the title, so shrink and re-render
+            title_len = max(0, title_len - (len(text) - max_len))
+            text = _render_digest(items[:1], tz, group_by, window_min, title_len, links)
+        if len(text) <= max_len:
+            return text, count
+    return _cut_html(text, max_len), count
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate_per_min`` with room for ``burst`` tokens."""
+
+    def __init__(self, rate_per_min: float, burst: int = 1, now: float = 0.0):
+        self.rate = rate_per_min / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = now
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.paused_until - now)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, until: float) -> None:
+        """Hold all sends until ``until``, e.g. after Telegram's ``RetryAfter``."""
+        self.paused_until = max(self.paused_until, until)
+        self.tokens = min(self.tokens, 0.0)
+
+
+@dataclass(order=True)
+class _Pending:
+    priority: float
+    seq: int
+    enqueued_at: float = field(compare=False)
+    text: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    # set for news alerts, which may be folded into a digest
+    item: NewsItem | None = field(default=None, compare=False)
+    tz: ZoneInfo | None = field(default=None, compare=False)
+
+
+class _ChatQueue:
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.heap: list[_Pending] = []
+        self.task: asyncio.Task | None = None
+
+
 class TelegramPublisher:
-    """Lightweight wrapper around :class:`telegram.Bot` with rate limiting."""
+    """Wrapper around :class:`telegram.Bot` with per-chat rate limiting.
+
+    Each chat has a token bucket allowing ``rate_limit`` messages per minute
+    (bursts up to ``burst``) and a pending queue ordered by score, so when
+    throttled the highest-scoring alerts go out first.  ``RetryAfter`` from
+    Telegram pauses the bucket and the message is retried.  The Telegram
+    client is only imported and built when the first message goes out.
+    """
 
     def __init__(
-        self, bot_token: str | SecretStr, chat_id: int | str, rate_limit: int = 10
+        self,
+        bot_token: str | SecretStr,
+        chat_id: int | str,
+        rate_limit: int = 10,
+        burst: int = 3,
+        *,
+        digest_threshold: int = 0,
+        digest_max_items: int = 20,
+        digest_group_by: str = "ticker",
+        digest_window_min: int = 15,
+        bot: Bot | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
     ):
         if isinstance(bot_token, SecretStr):
             bot_token = bot_token.get_secret_value()
         if isinstance(chat_id, str) and chat_id.startswith("-") and chat_id.lstrip("-").isdigit():
             chat_id = int(chat_id)
-        self.bot = Bot(bot_token)
+        self._token = bot_token
+        self._bot = bot
         self.chat_id = chat_id
-        self.parse_mode = ParseMode.HTML
-        # Allow up to ``rate_limit`` messages concurrently.
-        self._semaphore = asyncio.Semaphore(rate_limit)
+        self.parse_mode = "HTML"
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.digest_threshold = digest_threshold
+        self.digest_max_items = digest_max_items
+        self.digest_group_by = digest_group_by
+        self.digest_window_min = digest_window_min
+        self._clock = clock
+        self._sleep = sleep
+        self._chats: dict[int | str, _ChatQueue] = {}
+        self._seq = itertools.count()
+        self.sent = 0
+        self.retries = 0
+        self.messages = 0
+        self.digests = 0
+        self._wait_total = 0.0
+        self.wait_max = 0.0
+
+    @property
+    def bot(self) -> Bot:
+        if self._bot is None:
+            from telegram import Bot
+
+            self._bot = Bot(self._token)
+        return self._bot
+
+    # ------------------------------------------------------------------
+    def queue_depth(self) -> int:
+        return sum(len(q.heap) for q in self._chats.values())
+
+    def stats(self) -> dict[str, float]:
+        """Queue depth, sent/retry counters and publish wait times (seconds)."""
+        return {
+            "queue_depth": self.queue_depth(),
+            "sent": self.sent,
+            "messages": self.messages,
+            "digests": self.digests,
+            "retries": self.retries,
+            "wait_avg_s": self._wait_total / self.sent if self.sent else 0.0,
+            "wait_max_s": self.wait_max,
+        }
+
+    async def send(
+        self,
+        item: NewsItem,
+        tz: ZoneInfo,
+        score: float = 0.0,
+        chat_id: int | str | None = None,
+    ) -> None:
+        """Queue a news item and wait until it was delivered."""
+
+        await self._enqueue(format_message(item, tz), score, chat_id, item, tz)
+
+    async def send_text(
+        self, text: str, score: float = 0.0, chat_id: int | str | None = None
+    ) -> None:
+        """Queue a pre-rendered message; it is never folded into a digest."""
+
+        await self._enqueue(text, score, chat_id)
+
+    async def _enqueue(
+        self,
+        text: str,
+        score: float,
+        chat_id: int | str | None,
+        item: NewsItem | None = None,
+        tz: ZoneInfo | None = None,
+    ) -> None:
+        chat_id = self.chat_id if chat_id is None else chat_id
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = _ChatQueue(
+                TokenBucket(self.rate_limit, self.burst, self._clock())
+            )
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(chat.heap, _Pending(-score, next(self._seq), self._clock(), text, future, item, tz))
+        if chat.task is None or chat.task.done():
+            chat.task = asyncio.create_task(self._dispatch(chat_id, chat))
+        await future
+
+    async def _dispatch(self, chat_id: int | str, chat: _ChatQueue) -> None:
+        from telegram.error import RetryAfter
 
-    async def send(self, item: NewsItem, tz: ZoneInfo) -> None:
-        """Send a news item to the configured Telegram chat."""
+        while chat.heap:
+            delay = chat.bucket.delay(self._clock())
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+            batch = self._next_batch(chat)
+            if not batch:
+                continue
+            if len(batch) > 1:
+                text, count = format_digest(
+                    [p.item for p in batch],
+                    batch[0].tz,
+                    group_by=self.digest_group_by,
+                    window_min=self.digest_window_min,
+                )
+                for pending in batch[count:]:
+                    heapq.heappush(chat.heap, pending)
+                batch = batch[:count]
+            if len(batch) == 1:
+                text = batch[0].text
+            chat.bucket.take(self._clock())
+            started = time.perf_counter()
+            try:
+                await self.bot.send_message(chat_id, text, parse_mode=self.parse_mode)
+            except RetryAfter as exc:
+                metrics.PUBLISH_MESSAGES.labels("retry_after").inc()
+                retry_after = exc.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                logger.warning("Telegram flood control for %s; retry in %ss", chat_id, retry_after)
+                chat.bucket.pause(self._clock() + float(retry_after))
+                for pending in batch:
+                    heapq.heappush(chat.heap, pending)
+                self.retries += 1
+                continue
+            except Exception as exc:
+                metrics.PUBLISH_MESSAGES.labels("error").inc()
+                for pending in batch:
+                    # the caller may have been cancelled meanwhile
+                    if not pending.future.done():
+                        pending.future.set_exception(exc)
+                continue
+            metrics.PUBLISH_API.observe(time.perf_counter() - started)
+            metrics.PUBLISH_MESSAGES.labels("digest" if len(batch) > 1 else "single").inc()
+            now = self._clock()
+            self.messages += 1
+            if len(batch) > 1:
+                self.digests += 1
+            for pending in batch:
+                waited = now - pending.enqueued_at
+                self.sent += 1
+                self._wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+                metrics.PUBLISH_WAIT.observe(waited)
+                if not pending.future.done():
+                    pending.future.set_result(None)
 
-        text = format_message(item, tz)
-        async with self._semaphore:
-            await self.bot.send_message(self.chat_id, text, parse_mode=self.parse_mode)
+    def _next_batch(self, chat: _ChatQueue) -> list[_Pending]:
+        """Pop the next message, or a digest's worth of alerts under backlog."""
+        pending = heapq.heappop(chat.heap)
+        if pending.future.done():
+            return []
+        if (
+            not self.digest_threshold
+            or pending.item is None
+            or len(chat.heap) + 1 <= self.digest_threshold
+        ):
+            return [pending]
+        batch = [pending]
+        skipped: list[_Pending] = []
+        while chat.heap and len(batch) < self.digest_max_items:
+            other = heapq.heappop(chat.heap)
+            if other.future.done():
+                continue
+            if other.item is None or other.tz != pending.tz:
+                skipped.append(other)
+            else:
+                batch.append(other)
+        for other in skipped:
+            heapq.heappush(chat.heap, other)
+        return batch
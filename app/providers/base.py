@@ -10,14 +10,24 @@ from __future__ import annotations
 
 import abc
 import asyncio
-import json
 import logging
 import random
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Iterable, Mapping
+from typing import Any, Iterable, Mapping, Sequence
 
 import aiohttp
+import orjson
 
+from app.core import metrics
+from app.core.capture import CaptureLog
+from app.core.latency import stamp_fetched
+from app.core.models import NormalizedItem
+from app.core.normalize import normalize_batch, normalize_newsdata
+
+from .cursor import Cursor
+from .policy import PollPolicy, build_policy
 
 logger = logging.getLogger(__name__)
 
@@ -51,10 +61,32 @@ class BaseProvider(abc.ABC):
 
     name: str = "base"
 
-    def __init__(self, session: aiohttp.ClientSession, config: Mapping[str, Any]):
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        config: Mapping[str, Any],
+        name: str | None = None,
+        cursor: Cursor | None = None,
+        capture: CaptureLog | None = None,
+    ):
         self.session = session
         self.config = config
-        self._backoff = Backoff()
+        if name:
+            self.name = name
+        # Optional high-water mark used by providers that poll incrementally.
+        self.cursor = cursor
+        # Optional sink receiving every raw page body that was fetched.
+        self.capture = capture
+        # Requests/bytes/items of the most recent poll cycle.
+        self.cycle_stats: dict[str, int] = {}
+        self._backoff = Backoff(
+            base=float(config.get("backoff_base_s", 1.0)),
+            max_delay=float(config.get("backoff_max_s", 60.0)),
+        )
+        self._metrics = metrics.provider(self.name)
+        self._policy: PollPolicy | None = None
+        # ids of recent items, to tell the policy how many were new
+        self._recent_ids: OrderedDict[str, None] = OrderedDict()
 
     # ------------------------------------------------------------------
     # Configuration helpers
@@ -66,6 +98,38 @@ class BaseProvider(abc.ABC):
     def timeout(self) -> int:
         return int(self.config.get("timeout_s", 5))
 
+    @property
+    def cycle_timeout(self) -> float:
+        """Upper bound for one whole poll cycle, pagination included."""
+        return float(self.config.get("cycle_timeout_s", 60))
+
+    @property
+    def jitter(self) -> float:
+        return float(self.config.get("jitter_s", 0))
+
+    @property
+    def policy(self) -> PollPolicy:
+        """Poll interval policy from ``poll_policy``, built on first use."""
+        if self._policy is None:
+            self._policy = build_policy(self.config, self.poll_interval)
+        return self._policy
+
+    @policy.setter
+    def policy(self, policy: PollPolicy) -> None:
+        self._policy = policy
+
+    # ------------------------------------------------------------------
+    def _retry_delay(self) -> float:
+        """Advance the backoff after a failure and return the delay."""
+        delay = self._backoff.next()
+        self._metrics.requests_error.inc()
+        self._metrics.backoff.set(self._backoff.attempt)
+        return delay
+
+    def _reset_backoff(self) -> None:
+        self._backoff.reset()
+        self._metrics.backoff.set(0)
+
     # ------------------------------------------------------------------
     @abc.abstractmethod
     def _build_request(self) -> Mapping[str, Any]:
@@ -79,6 +143,19 @@ class BaseProvider(abc.ABC):
     async def _parse_items(self, data: Mapping[str, Any]) -> Iterable[Mapping[str, Any]]:
         """Parse raw response data into an iterable of items."""
 
+    def normalize(self, raw: Mapping[str, Any]) -> NormalizedItem:
+        """Convert a parsed item into :class:`NormalizedItem`.
+
+        The default understands Newsdata field names as well as the generic
+        ``url``/``published_at``/``id``/``source`` keys; override it for
+        providers with a different shape.
+        """
+        return normalize_newsdata(raw)
+
+    def normalize_batch(self, raws: Sequence[Mapping[str, Any]]) -> list[NormalizedItem]:
+        """Normalize a whole poll batch; override together with :meth:`normalize`."""
+        return normalize_batch(raws)
+
     # ------------------------------------------------------------------
     async def poll(self) -> Iterable[Mapping[str, Any]]:
         """Fetch a batch of items from the provider.
@@ -89,8 +166,11 @@ class BaseProvider(abc.ABC):
 
         req = self._build_request()
         try:
+            started = time.perf_counter()
             async with self.session.get(**req, timeout=self.timeout) as resp:
-                text = await resp.text()
+                body = await resp.read()
+                self._metrics.request_seconds.observe(time.perf_counter() - started)
+                self.cycle_stats = {"requests": 1, "bytes": len(body)}
                 if resp.status >= 400:
                     logger.error(
                         "%s HTTP %s %s params=%s body=%s",
@@ -98,7 +178,7 @@ class BaseProvider(abc.ABC):
                         resp.status,
                         req.get("url"),
                         req.get("params"),
-                        text,
+                        body.decode(errors="replace"),
                     )
                     if (
                         resp.status == 422
@@ -109,20 +189,74 @@ class BaseProvider(abc.ABC):
                             "Newsdata returned 422 for /news with category=cryptocurrency. Use /api/1/crypto instead."
                         )
                     resp.raise_for_status()
-                payload = json.loads(text) if text else {}
-            self._backoff.reset()
-            return await self._parse_items(payload)
+                if self.capture is not None:
+                    self.capture.record(self.name, body)
+                payload = orjson.loads(body) if body else {}
+            self._reset_backoff()
+            self._metrics.requests_ok.inc()
+            items = list(await self._parse_items(payload))
+            stamp_fetched(items)
+            self.cycle_stats["items"] = len(items)
+            return items
         except Exception:
-            delay = self._backoff.next()
+            delay = self._retry_delay()
             logger.exception("%s poll failed; retrying in %.1fs", self.name, delay)
             await asyncio.sleep(delay)
             return []
 
     # ------------------------------------------------------------------
+    async def run_batches(self, initial_delay: float = 0.0):
+        """Async generator yielding the full list of items of each poll cycle.
+
+        A cycle that exceeds :attr:`cycle_timeout` is abandoned and backed
+        off, so a hanging endpoint only delays this provider.
+        """
+        if initial_delay > 0:
+            await asyncio.sleep(initial_delay)
+        while True:
+            started = time.perf_counter()
+            try:
+                # unlike wait_for, timeout() never swallows an outer cancel
+                # that arrives as the poll completes
+                async with asyncio.timeout(self.cycle_timeout):
+                    items = list(await self.poll())
+            except TimeoutError:
+                delay = self._retry_delay()
+                logger.error(
+                    "%s poll cycle exceeded %.1fs; retrying in %.1fs",
+                    self.name,
+                    self.cycle_timeout,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+            self._metrics.poll_seconds.observe(time.perf_counter() - started)
+            metrics.FETCHED.inc(len(items))
+            interval = self._next_interval(items)
+            if items:
+                yield items
+            await asyncio.sleep(interval + random.uniform(0, self.jitter))
+
+    def _next_interval(self, items: Sequence[Mapping[str, Any]]) -> float:
+        stats = self.cycle_stats
+        new = 0
+        for item in items:
+            item_id = item.get("external_id")
+            if item_id is None or item_id not in self._recent_ids:
+                new += 1
+            if item_id is not None:
+                self._recent_ids[item_id] = None
+                self._recent_ids.move_to_end(item_id)
+        while len(self._recent_ids) > 10_000:
+            self._recent_ids.popitem(last=False)
+        interval = self.policy.next_interval(
+            stats.get("items", len(items)), new, stats.get("requests", 1)
+        )
+        self._metrics.interval.set(interval)
+        return interval
+
     async def run(self):
         """Async generator yielding items on each poll cycle."""
-        while True:
-            items = await self.poll()
-            for item in items:
+        async for batch in self.run_batches():
+            for item in batch:
                 yield item
-            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,44 @@
+"""Redis-persisted polling cursor for incremental provider polls."""
+
+from __future__ import annotations
+
+import time
+
+import redis.asyncio as redis
+
+
+class Cursor:
+    """Time watermark of one provider.
+
+    Remembers when the provider was last polled successfully.  Providers use
+    it to narrow the next request to the time since the previous poll and to
+    stop paginating once a page is older than that.  Item ids are not
+    remembered here: an item only counts as seen once the pipeline published
+    it, which :mod:`app.core.dedup` records, so items that failed downstream
+    are fetched again while they are inside the overlap.
+    """
+
+    def __init__(self, client: redis.Redis, provider: str, retention_s: float = 10800):
+        self.client = client
+        self.key = f"cursor:{provider}"
+        # a watermark older than this is forgotten and the full window polled
+        self.retention_s = retention_s
+        self.last_poll: float | None = None
+        self._loaded = False
+
+    async def load(self) -> None:
+        """Fetch the persisted state once; later calls are no-ops."""
+        if self._loaded:
+            return
+        last_poll = await self.client.hget(self.key, "last_poll")
+        self.last_poll = float(last_poll) if last_poll is not None else None
+        self._loaded = True
+
+    async def advance(self, polled_at: float | None = None) -> None:
+        """Record a successful poll started at ``polled_at``."""
+        polled_at = time.time() if polled_at is None else polled_at
+        self.last_poll = polled_at
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(self.key, "last_poll", polled_at)
+            pipe.expire(self.key, int(self.retention_s) + 1)
+            await pipe.execute()
@@ -1,39 +1,195 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import math
+import time
 from datetime import datetime, timezone
 from typing import Any, Iterable, Mapping
 
-from dateutil import parser
+import orjson
+
+from app.core import metrics
+from app.core.latency import stamp_fetched
+from app.core.normalize import parse_timestamp
 
 from .base import BaseProvider, logger
 
 
 class NewsdataProvider(BaseProvider):
-    """Provider adapter for the Newsdata.io crypto endpoint."""
+    """Provider adapter for the Newsdata.io crypto endpoint.
+
+    ``queries`` in the provider config lists query specs, each with a
+    ``name``, its own ``query`` string and/or ``params`` and optionally its
+    own ``poll_interval_s``.  The queries due in a cycle are fetched
+    concurrently, at most ``max_inflight`` requests at a time, and their
+    results are merged and de-duplicated by ``external_id``.  Without
+    ``queries`` the provider level ``query`` is the only one.
+    """
 
     name = "newsdata"
 
-    def _build_request(self) -> Mapping[str, Any]:
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.queries: list[dict[str, Any]] = [
+            dict(q) for q in self.config.get("queries") or []
+        ] or [{"name": "default"}]
+        self.max_inflight = max(1, int(self.config.get("max_inflight", 4)))
+        # per query: monotonic start of the last poll, wall time of the last success
+        self._polled_at: dict[str, float] = {}
+        self._succeeded_at: dict[str, float] = {}
+
+    @property
+    def poll_interval(self) -> int:
+        # one cycle per shortest query interval; slower queries skip cycles
+        own = [int(q["poll_interval_s"]) for q in self.queries if q.get("poll_interval_s")]
+        return min([BaseProvider.poll_interval.fget(self), *own])
+
+    def _due(self, now: float) -> list[dict[str, Any]]:
+        """Queries to poll this cycle; those without an own interval always are."""
+        due = []
+        for query in self.queries:
+            last = self._polled_at.get(query["name"])
+            interval = query.get("poll_interval_s")
+            # jitter may start a cycle slightly early
+            if not interval or last is None or now - last >= interval - self.jitter:
+                due.append(query)
+        return due
+
+    def _build_request(self, query: Mapping[str, Any] | None = None) -> Mapping[str, Any]:
         base_url = self.config.get("base_url", "https://newsdata.io/api/1")
-        endpoint = self.config.get("endpoint", "crypto")
+        endpoint = (query or {}).get("endpoint") or self.config.get("endpoint", "crypto")
         url = f"{base_url}/{endpoint}"
         params: dict[str, Any] = {"apikey": self.config.get("api_key")}
-        query = self.config.get("query")
+        # the query's own params win over the provider level query string
         if query:
-            for part in query.split("&"):
-                if "=" in part:
-                    k, v = part.split("=", 1)
-                    params.setdefault(k, v)
+            for k, v in (query.get("params") or {}).items():
+                params.setdefault(k, str(v))
+        for spec in ((query or {}).get("query"), self.config.get("query")):
+            if spec:
+                for part in spec.split("&"):
+                    if "=" in part:
+                        k, v = part.split("=", 1)
+                        params.setdefault(k, v)
         # defaults
         params.setdefault("removeduplicate", "1")
         params.setdefault("size", "50")
         if endpoint != "crypto" and params.get("category") == "cryptocurrency":
             raise ValueError("Use /api/1/crypto endpoint for cryptocurrency category")
+        self._narrow_timeframe(params, self._last_success(query))
         return {"url": url, "params": params}
 
+    def _last_success(self, query: Mapping[str, Any] | None) -> float | None:
+        name = (query or self.queries[0])["name"]
+        last = self._succeeded_at.get(name)
+        if last is None and len(self.queries) == 1 and self.cursor is not None:
+            # the persisted cursor time is per provider, so only a single
+            # query can resume from it after a restart
+            last = self.cursor.last_poll
+        return last
+
+    @property
+    def _overlap(self) -> float:
+        return float(self.config.get("cursor_overlap_s", 300))
+
+    def _narrow_timeframe(self, params: dict[str, Any], last_poll: float | None) -> None:
+        """Shrink ``timeframe`` to the time since the last successful poll.
+
+        A margin of ``cursor_overlap_s`` covers late-indexed articles; the
+        configured timeframe stays the upper bound.
+        """
+        if self.cursor is None or last_poll is None:
+            return
+        configured = _timeframe_minutes(params.get("timeframe"))
+        if configured is None:
+            return
+        since = time.time() - last_poll + self._overlap
+        params["timeframe"] = f"{max(1, min(configured, math.ceil(since / 60)))}m"
+
     async def poll(self) -> Iterable[Mapping[str, Any]]:  # type: ignore[override]
-        req = self._build_request()
+        """Fetch every page of the current window for each due query.
+
+        Queries run concurrently, so a cycle takes as long as the slowest
+        one.  With a :attr:`cursor`, pagination stops at the first page
+        published entirely before the previous poll (minus the overlap).
+        Items returned by earlier polls are not dropped here; de-duplication
+        does that once they are published.  A failing query is logged and retried next cycle; only when
+        every query failed does the provider back off.
+        """
+        cursor = self.cursor
+        started = time.time()
+        if cursor is not None:
+            try:
+                await cursor.load()
+            except Exception:
+                logger.exception("%s cursor unavailable; polling full window", self.name)
+        due = self._due(time.monotonic())
+        stats = {"requests": 0, "bytes": 0, "items": 0, "queries": len(due)}
+        self.cycle_stats = stats
+        if not due:
+            return []
+        limit = asyncio.Semaphore(self.max_inflight)
+        results = await asyncio.gather(
+            *(self._poll_query(query, limit, stats) for query in due),
+            return_exceptions=True,
+        )
+        items: list[Mapping[str, Any]] = []
+        ids: set[str] = set()
+        failed = fetched = 0
+        for query, result in zip(due, results):
+            if isinstance(result, BaseException):
+                failed += 1
+                # due again on the next cycle
+                self._polled_at.pop(query["name"], None)
+                logger.error(
+                    "%s query %r failed",
+                    self.name,
+                    query["name"],
+                    exc_info=(type(result), result, result.__traceback__),
+                )
+                continue
+            self._succeeded_at[query["name"]] = started
+            fetched += len(result)
+            for item in result:
+                external_id = item.get("external_id")
+                if external_id is not None:
+                    if external_id in ids:
+                        continue
+                    ids.add(external_id)
+                items.append(item)
+        # the same article returned by several queries
+        metrics.drop("query_overlap", fetched - len(items))
+        if failed == len(due):
+            delay = self._retry_delay()
+            logger.error("%s poll failed; retrying in %.1fs", self.name, delay)
+            await asyncio.sleep(delay)
+            return []
+        if failed:
+            self._metrics.requests_error.inc(failed)
+        if cursor is not None:
+            try:
+                await cursor.advance(started)
+            except Exception:
+                logger.exception("%s failed to persist cursor", self.name)
+        self._reset_backoff()
+        stats["new"] = len(items)
+        logger.debug("%s poll cycle %s", self.name, stats)
+        return items
+
+    async def _poll_query(
+        self,
+        query: Mapping[str, Any],
+        limit: asyncio.Semaphore,
+        stats: dict[str, int],
+    ) -> list[Mapping[str, Any]]:
+        """Walk the pages of one query; pages are requested one at a time."""
+        self._polled_at[query["name"]] = time.monotonic()
+        floor = None
+        if self.cursor is not None:
+            last = self._last_success(query)
+            if last is not None:
+                floor = datetime.fromtimestamp(last - self._overlap, timezone.utc)
+        req = self._build_request(query)
         url = req["url"]
         base_params = req.get("params", {})
         items: list[Mapping[str, Any]] = []
@@ -42,9 +198,13 @@ class NewsdataProvider(BaseProvider):
             params = dict(base_params)
             if page:
                 params["page"] = page
-            try:
+            async with limit:
+                sent_at = time.perf_counter()
                 async with self.session.get(url, params=params, timeout=self.timeout) as resp:
-                    text = await resp.text()
+                    body = await resp.read()
+                    self._metrics.request_seconds.observe(time.perf_counter() - sent_at)
+                    stats["requests"] += 1
+                    stats["bytes"] += len(body)
                     if resp.status >= 400:
                         logger.error(
                             "%s HTTP %s %s params=%s body=%s",
@@ -52,39 +212,61 @@ class NewsdataProvider(BaseProvider):
                             resp.status,
                             url,
                             params,
-                            text,
+                            body.decode(errors="replace"),
                         )
                         resp.raise_for_status()
-                    data = await resp.json()
-            except Exception:
-                delay = self._backoff.next()
-                logger.exception("%s poll failed; retrying in %.1fs", self.name, delay)
-                await asyncio.sleep(delay)
-                return []
-            items.extend(await self._parse_items(data))
+            if self.capture is not None:
+                self.capture.record(self.name, body)
+            data = orjson.loads(body)
+            self._metrics.requests_ok.inc()
+            page_items = list(await self._parse_items(data))
+            stamp_fetched(page_items)
+            stats["items"] += len(page_items)
+            items.extend(page_items)
             page = data.get("nextPage")
-            if not page:
-                self._backoff.reset()
-                break
-        return items
+            if not page or (
+                floor is not None
+                and page_items
+                and all(i["pubDate"] < floor for i in page_items)
+            ):
+                return items
 
     async def _parse_items(self, data: Mapping[str, Any]) -> Iterable[Mapping[str, Any]]:
-        results = []
-        for item in data.get("results", []):
-            url = item.get("link") or item.get("url")
-            external_id = item.get("article_id") or item.get("id")
-            if not external_id and url:
-                external_id = hashlib.sha1(url.encode()).hexdigest()
-            published = item.get("pubDate") or item.get("published_at")
-            if published:
-                try:
-                    published_dt = parser.parse(published).astimezone(timezone.utc)
-                except Exception:
-                    published_dt = datetime.now(timezone.utc)
-            else:
+        return parse_results(data)
+
+
+def parse_results(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """Return the ``results`` of a Newsdata response with ids and dates filled in."""
+    results = []
+    for item in data.get("results") or []:
+        url = item.get("link") or item.get("url")
+        external_id = item.get("article_id") or item.get("id")
+        if not external_id and url:
+            external_id = hashlib.sha1(url.encode()).hexdigest()
+        published = item.get("pubDate") or item.get("published_at")
+        if published:
+            try:
+                published_dt = parse_timestamp(published)
+            except Exception:
                 published_dt = datetime.now(timezone.utc)
-            new_item = dict(item)
-            new_item["external_id"] = external_id
-            new_item["pubDate"] = published_dt.isoformat()
-            results.append(new_item)
-        return results
+        else:
+            published_dt = datetime.now(timezone.utc)
+        new_item = dict(item)
+        new_item["external_id"] = external_id
+        # keep the parsed value so normalization does not parse it again
+        new_item["pubDate"] = published_dt
+        results.append(new_item)
+    return results
+
+
+def _timeframe_minutes(value: Any) -> int | None:
+    """Parse a Newsdata ``timeframe`` (``"90m"`` or hours like ``"6"``)."""
+    if not value:
+        return None
+    value = str(value).strip().lower()
+    try:
+        if value.endswith("m"):
+            return int(value[:-1])
+        return int(value) * 60
+    except ValueError:
+        return None
@@ -0,0 +1,140 @@
+"""Policies deciding how long a provider waits between poll cycles.
+
+A policy sees the outcome of every successful cycle (items fetched, how many
+of them were new, API requests spent) and returns the delay before the next
+one.  Failed cycles are handled by :class:`~app.providers.base.Backoff`.
+Providers select a policy with ``poll_policy`` in their config: a built-in
+name or a dotted ``module:Class`` path.
+"""
+
+from __future__ import annotations
+
+import abc
+import importlib
+import math
+import time
+from typing import Any, Callable, Mapping
+
+DAY_S = 86400.0
+
+
+class PollPolicy(abc.ABC):
+    """Decide the delay before the next poll cycle."""
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], base: float) -> "PollPolicy":
+        """Build from provider ``config``; ``base`` is the provider's interval."""
+        return cls(base)
+
+    @abc.abstractmethod
+    def next_interval(self, fetched: int, new: int, requests: int) -> float:
+        """Return seconds to wait after a cycle with the given outcome."""
+
+
+class FixedInterval(PollPolicy):
+    """Always wait ``interval`` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    def next_interval(self, fetched: int, new: int, requests: int) -> float:
+        return self.interval
+
+
+class AdaptiveInterval(PollPolicy):
+    """Poll faster while news is breaking and slower while nothing changes.
+
+    After a cycle where at least ``busy_ratio`` of the fetched items were
+    new, the interval (capped at ``base``) is multiplied by ``speedup``;
+    after a cycle without
+    new items it is multiplied by ``slowdown``; in between it moves back
+    towards ``base``.  The result stays within ``[min_s, max_s]``.
+
+    With ``daily_budget`` (API requests per UTC day), the interval never
+    falls below what spreads the remaining requests evenly over the rest of
+    the day, and once the budget is spent the provider waits for the next
+    day.  The budget wins over ``max_s``.
+    """
+
+    def __init__(
+        self,
+        base: float,
+        min_s: float | None = None,
+        max_s: float | None = None,
+        *,
+        speedup: float = 0.5,
+        slowdown: float = 1.5,
+        busy_ratio: float = 0.3,
+        daily_budget: int | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.base = base
+        self.min_s = base / 4 if min_s is None else min_s
+        self.max_s = base * 4 if max_s is None else max_s
+        self.speedup = speedup
+        self.slowdown = slowdown
+        self.busy_ratio = busy_ratio
+        self.daily_budget = daily_budget
+        self._clock = clock
+        self.interval = base
+        self._day: int | None = None
+        self.spent = 0
+        # requests per cycle, averaged
+        self._cost = 1.0
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], base: float) -> "AdaptiveInterval":
+        def opt(key: str, cast=float):
+            value = config.get(key)
+            return None if value is None else cast(value)
+
+        return cls(
+            base,
+            opt("min_poll_interval_s"),
+            opt("max_poll_interval_s"),
+            daily_budget=opt("daily_request_budget", int),
+        )
+
+    def next_interval(self, fetched: int, new: int, requests: int) -> float:
+        now = self._clock()
+        day = int(now // DAY_S)
+        if day != self._day:
+            self._day, self.spent = day, 0
+        self.spent += requests
+        if requests:
+            self._cost = 0.8 * self._cost + 0.2 * requests
+
+        if new and new >= self.busy_ratio * fetched:
+            # the first busy cycle after a quiet spell drops below base at once
+            self.interval = min(self.interval, self.base) * self.speedup
+        elif not new:
+            self.interval *= self.slowdown
+        else:
+            self.interval += (self.base - self.interval) / 2
+        self.interval = min(max(self.interval, self.min_s), self.max_s)
+
+        if self.daily_budget is None:
+            return self.interval
+        left_s = (day + 1) * DAY_S - now
+        remaining = self.daily_budget - self.spent
+        if remaining < math.ceil(self._cost):
+            return left_s
+        return max(self.interval, left_s * self._cost / remaining)
+
+
+POLICIES: dict[str, type[PollPolicy]] = {
+    "fixed": FixedInterval,
+    "adaptive": AdaptiveInterval,
+}
+
+
+def build_policy(config: Mapping[str, Any], base: float) -> PollPolicy:
+    """Instantiate the policy named by ``poll_policy`` (default ``fixed``)."""
+    name = config.get("poll_policy") or "fixed"
+    cls = POLICIES.get(name)
+    if cls is None:
+        if ":" not in name:
+            raise KeyError(f"Unknown poll policy {name!r}")
+        module_name, cls_name = name.split(":", 1)
+        cls = getattr(importlib.import_module(module_name), cls_name)
+    return cls.from_config(config, base)
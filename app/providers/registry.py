@@ -0,0 +1,73 @@
+"""Registry mapping provider type names to :class:`BaseProvider` classes.
+
+Built-in providers are referenced by dotted path and imported on first use;
+third party adapters can call :func:`register` or use a dotted
+``module:Class`` path as their ``type`` in ``config.yaml``.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any, Mapping
+
+import aiohttp
+import redis.asyncio as redis
+
+from app.core.capture import CaptureLog
+
+from .base import BaseProvider
+from .cursor import Cursor
+
+_BUILTIN: dict[str, str] = {
+    "newsdata": "app.providers.newsdata:NewsdataProvider",
+}
+_registry: dict[str, type[BaseProvider]] = {}
+
+
+def register(type_name: str):
+    """Class decorator adding a provider class under ``type_name``."""
+
+    def deco(cls: type[BaseProvider]) -> type[BaseProvider]:
+        _registry[type_name] = cls
+        return cls
+
+    return deco
+
+
+def get(type_name: str) -> type[BaseProvider]:
+    """Return the provider class registered as ``type_name``."""
+    if type_name in _registry:
+        return _registry[type_name]
+    path = _BUILTIN.get(type_name, type_name)
+    if ":" not in path:
+        raise KeyError(f"Unknown provider type {type_name!r}")
+    module_name, cls_name = path.split(":", 1)
+    cls = getattr(importlib.import_module(module_name), cls_name)
+    _registry[type_name] = cls
+    return cls
+
+
+def build_providers(
+    session: aiohttp.ClientSession,
+    providers: Mapping[str, Mapping[str, Any]],
+    redis_client: redis.Redis | None = None,
+    capture: CaptureLog | None = None,
+) -> list[BaseProvider]:
+    """Instantiate every enabled provider from ``{name: settings}``.
+
+    With ``redis_client``, providers marked ``incremental`` get a
+    :class:`Cursor` persisted in Redis.  With ``capture``, every fetched
+    page is written to that log.
+    """
+    built = []
+    for name, settings in providers.items():
+        if not settings.get("enabled", True):
+            continue
+        cls = get(settings.get("type") or name)
+        cursor = None
+        if redis_client is not None and settings.get("incremental", True):
+            cursor = Cursor(
+                redis_client, name, float(settings.get("cursor_retention_s", 10800))
+            )
+        built.append(cls(session, settings, name=name, cursor=cursor, capture=capture))
+    return built
@@ -0,0 +1,105 @@
+"""Run several providers concurrently and merge their poll batches."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+from .base import BaseProvider
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderScheduler:
+    """Poll every provider in its own task and yield ``(provider, items)``.
+
+    Each provider keeps its own interval, timeout and backoff, so a slow or
+    hanging provider never delays the others.  Start times are staggered
+    evenly across the shortest poll interval, plus up to ``jitter`` seconds of
+    random offset, to keep polls from clustering.  On shutdown, provider
+    tasks get ``shutdown_timeout`` seconds to finish cancelling.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[BaseProvider],
+        stagger: bool = True,
+        jitter: float = 1.0,
+        buffer: int = 1,
+        shutdown_timeout: float = 5.0,
+    ):
+        self.providers = list(providers)
+        self.stagger = stagger
+        self.jitter = jitter
+        self.shutdown_timeout = shutdown_timeout
+        self._queue: asyncio.Queue[tuple[BaseProvider, list[Mapping[str, Any]]]] = (
+            asyncio.Queue(maxsize=buffer)
+        )
+
+    def start_delays(self) -> list[float]:
+        if not self.stagger or not self.providers:
+            return [0.0] * len(self.providers)
+        step = min(p.poll_interval for p in self.providers) / len(self.providers)
+        return [i * step + random.uniform(0, self.jitter) for i in range(len(self.providers))]
+
+    async def _drive(self, provider: BaseProvider, delay: float) -> None:
+        try:
+            async for items in provider.run_batches(initial_delay=delay):
+                await self._queue.put((provider, items))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("%s provider task crashed", provider.name)
+
+    async def batches(self) -> AsyncIterator[tuple[BaseProvider, list[Mapping[str, Any]]]]:
+        tasks = [
+            asyncio.create_task(self._drive(p, d), name=f"{p.name} poller")
+            for p, d in zip(self.providers, self.start_delays())
+        ]
+        try:
+            while True:
+                yield await self._queue.get()
+        finally:
+            await self._cancel(tasks)
+
+    async def _cancel(self, tasks: list[asyncio.Task]) -> None:
+        for task in tasks:
+            task.cancel()
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+        for task in pending:
+            logger.warning(
+                "%s did not stop within %.1fs", task.get_name(), self.shutdown_timeout
+            )
+
+    async def poll_once(self) -> AsyncIterator[tuple[BaseProvider, list[Mapping[str, Any]]]]:
+        """Poll every provider concurrently once and yield batches as they finish.
+
+        Each poll is bounded by the provider's ``cycle_timeout``; failed or
+        timed out providers are logged and skipped.
+        """
+
+        async def poll(provider: BaseProvider):
+            try:
+                async with asyncio.timeout(provider.cycle_timeout):
+                    return provider, list(await provider.poll())
+            except TimeoutError:
+                logger.error(
+                    "%s poll exceeded %.1fs", provider.name, provider.cycle_timeout
+                )
+            except Exception:
+                logger.exception("%s poll failed", provider.name)
+            return provider, []
+
+        tasks = [asyncio.create_task(poll(p), name=f"{p.name} poll") for p in self.providers]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                provider, items = await next_done
+                if items:
+                    yield provider, items
+        finally:
+            await self._cancel(tasks)
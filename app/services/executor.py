@@ -0,0 +1,127 @@
+"""Run normalization and scoring of poll batches in a thread or process pool.
+
+:class:`CpuStage` ships a provider name and its raw items to the pool and
+gets back a :class:`Prepared` batch: normalized items, fingerprints, scores
+and near-duplicate signatures.  Only de-duplication and publishing stay on
+the event loop, so large pages no longer stall Redis and Telegram I/O.
+Process workers rebuild the providers and the lexicon from plain settings
+once, in their initializer.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Mapping, Sequence
+
+from app.core import dedup
+from app.core.config import FiltersSettings, ScoringSettings
+from app.core.matcher import load_lexicon
+from app.core.models import NormalizedItem
+from app.core.neardup import NearDuplicateIndex
+from app.core.normalize import normalize_batch
+from app.core.score import score_batch
+
+_cfg = None
+_providers: dict[str, Any] = {}
+_near_dups: NearDuplicateIndex | None = None
+
+
+@dataclass
+class Prepared:
+    """Picklable result of :func:`prepare_batch`, one entry per item."""
+
+    items: list[NormalizedItem]
+    fps: list[str]
+    scores: list[float]
+    # NearDuplicateIndex.prepare() results, None below the threshold
+    near_dup: list[tuple | None]
+
+
+def _init_worker(filters: dict, scoring: dict, providers: dict[str, dict]) -> None:
+    global _cfg, _providers, _near_dups
+    _cfg = SimpleNamespace(
+        filters=FiltersSettings.model_validate(filters),
+        scoring=ScoringSettings.model_validate(scoring),
+    )
+    if _cfg.scoring.lexicon_path:
+        load_lexicon(_cfg.scoring.lexicon_path)
+    from app.providers.registry import build_providers
+
+    # only used for normalize_batch(), so no HTTP session
+    _providers = {p.name: p for p in build_providers(None, providers)}
+    _near_dups = None
+    if _cfg.filters.near_dup_window_h > 0:
+        # only used for its MinHash signatures, the loop keeps the real index
+        _near_dups = NearDuplicateIndex(
+            window_s=_cfg.filters.near_dup_window_h * 3600,
+            threshold=_cfg.filters.near_dup_threshold,
+        )
+
+
+def prepare_batch(
+    provider: str, raws: Sequence[Mapping[str, Any]], now: datetime
+) -> Prepared:
+    """Normalize, fingerprint and score one batch (runs in a pool worker)."""
+    p = _providers.get(provider)
+    items = p.normalize_batch(raws) if p is not None else normalize_batch(raws)
+    scores = score_batch(items, now, _cfg)
+    threshold = _cfg.scoring.threshold
+    return Prepared(
+        items,
+        [dedup.fingerprint(str(i.url), i.title, i.source) for i in items],
+        scores,
+        [
+            _near_dups.prepare(i.title, i.summary)
+            if _near_dups is not None and s >= threshold
+            else None
+            for i, s in zip(items, scores)
+        ],
+    )
+
+
+class CpuStage:
+    """Pool running :func:`prepare_batch` for the ingest pipeline.
+
+    ``kind`` is ``"thread"`` or ``"process"``; ``workers`` defaults to the
+    number of CPUs.
+    """
+
+    def __init__(self, cfg, kind: str = "process", workers: int = 0):
+        workers = workers or os.cpu_count() or 1
+        initargs = (
+            cfg.filters.model_dump(),
+            cfg.scoring.model_dump(),
+            cfg.providers.enabled(),
+        )
+        self.kind = kind
+        self.executor: Executor
+        if kind == "process":
+            # forking a process that already runs threads (metrics server,
+            # profiler, to_thread workers) can deadlock; the initializer
+            # rebuilds all worker state, so nothing needs to be inherited
+            self.executor = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_init_worker,
+                initargs=initargs,
+            )
+        elif kind == "thread":
+            # threads share this module's state, so initialize it once
+            _init_worker(*initargs)
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix="cpu-stage")
+        else:
+            raise ValueError(f"Unknown executor kind {kind!r}")
+
+    async def prepare(self, provider: str, raws: Sequence[Mapping[str, Any]]) -> Prepared:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, prepare_batch, provider, list(raws), datetime.now(timezone.utc)
+        )
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -1,64 +1,598 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
+import functools
+import logging
+import signal
+import time
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Mapping, Sequence
 
 from dotenv import load_dotenv
 from zoneinfo import ZoneInfo
-import aiohttp
 
 from app.core.config import load_config
-from app.core.normalize import normalize_newsdata
-from app.core import dedup
-from app.core.score import score_item
+from app.core.matcher import load_lexicon
+from app.core.models import NormalizedItem
+from app.core.normalize import normalize_batch
+from app.core import dedup, metrics
+from app.core.archive import ArchiveSink
+from app.core.buffer import PriorityBuffer
+from app.core.capture import CaptureLog
+from app.core.latency import ItemTimeline, LatencyTracker
+from app.core.neardup import NearDuplicateIndex
+from app.core.profiler import SamplingProfiler
+from app.core.score import pre_score, score_batch
 from app.core.telegram import TelegramPublisher, NewsItem
-from app.providers.newsdata import NewsdataProvider
 
+if TYPE_CHECKING:
+    from app.services.executor import CpuStage, Prepared
 
-async def main() -> None:
-    load_dotenv()
-    cfg = load_config()
+logger = logging.getLogger(__name__)
+
+
+async def process_batch(
+    raws: Sequence[Mapping[str, Any]],
+    cfg,
+    publisher,
+    tz: ZoneInfo,
+    near_dups: NearDuplicateIndex | None = None,
+    inflight: set[str] | None = None,
+    normalize: Callable[
+        [Sequence[Mapping[str, Any]]], list[NormalizedItem]
+    ] = normalize_batch,
+    archive: ArchiveSink | None = None,
+    claim: bool = False,
+    prepare: Callable[[Sequence[Mapping[str, Any]]], Awaitable[Prepared]] | None = None,
+    latency: LatencyTracker | None = None,
+) -> int:
+    """Normalize, de-duplicate, score and publish one poll batch.
+
+    Dedup costs two Redis round trips for the whole batch: one lookup before
+    scoring and one pipelined write after publishing.  With ``near_dups``,
+    rewrites of recently published stories are skipped as well.
+
+    Concurrent workers share ``inflight``: a fingerprint is claimed before the
+    Redis lookup and released only after it was marked seen, so two workers
+    never publish the same item.  With ``claim``, fingerprints are also
+    claimed in Redis (:func:`dedup.claim_many`) so that worker processes
+    sharing the dedup set do not race each other either.  New items are
+    handed to ``archive`` together with their score.  With ``prepare``
+    (e.g. :meth:`CpuStage.prepare`), normalization and scoring of the whole
+    batch happen there instead of on the event loop.  Stage timestamps of
+    published items go to ``latency``.  Returns the number of published
+    items.
+    """
+
+    started = time.perf_counter()
+    prepared = None
+    if prepare is not None:
+        prepared = await prepare(raws)
+        items, fps = prepared.items, prepared.fps
+        metrics.PREPARE_SECONDS.observe(time.perf_counter() - started)
+    else:
+        items = normalize(raws)
+        metrics.NORMALIZE_SECONDS.observe(time.perf_counter() - started)
+        fps = [dedup.fingerprint(str(i.url), i.title, i.source) for i in items]
+    metrics.NORMALIZED.inc(len(items))
+    # items carry their fetch time, so stamps stay aligned when some are dropped
+    stamps = _Stamps([item.fetched_at for item in items])
+    claimed: list[str] = []
+    owned = [True] * len(fps)
+    if inflight is not None:
+        for i, fp in enumerate(fps):
+            if fp in inflight:
+                owned[i] = False
+            else:
+                inflight.add(fp)
+                claimed.append(fp)
+        metrics.drop("inflight", len(fps) - len(claimed))
+    shared: list[str] = []
+    try:
+        if claim:
+            mine = [fp for fp, o in zip(fps, owned) if o]
+            won = iter(await dedup.claim_many(mine, cfg.streams.claim_ttl_s))
+            owned = [o and next(won) for o in owned]
+            shared = [fp for fp, o in zip(fps, owned) if o]
+            metrics.drop("claimed_elsewhere", len(mine) - len(shared))
+        return await _publish_new(
+            items, fps, owned, cfg, publisher, tz, near_dups, archive, prepared, stamps, latency
+        )
+    finally:
+        if inflight is not None:
+            inflight.difference_update(claimed)
+        if shared:
+            await dedup.release_many(shared)
+
+
+class _Stamps:
+    """Unix times at which a batch passed each stage."""
+
+    def __init__(self, fetched: list[float | None]):
+        self.fetched = fetched
+        self.normalized = time.time()
+        self.deduped = self.scored = self.normalized
+
+
+async def _timed_send(publisher, news: NewsItem, tz: ZoneInfo, score: float) -> float:
+    await publisher.send(news, tz, score=score)
+    return time.time()
+
+
+async def _publish_new(
+    items, fps, owned, cfg, publisher, tz, near_dups, archive, prepared, stamps, latency
+) -> int:
+    started = time.perf_counter()
+    fresh = await dedup.filter_new(fps)
+    metrics.DEDUP_SECONDS.observe(time.perf_counter() - started)
+    stamps.deduped = time.time()
+    candidates = [
+        i for i, (is_new, mine) in enumerate(zip(fresh, owned)) if is_new and mine
+    ]
+    metrics.DEDUP_OUT.inc(len(candidates))
+    metrics.drop("duplicate", sum(owned) - len(candidates))
+    if prepared is not None:
+        scores = [prepared.scores[i] for i in candidates]
+        signatures = [prepared.near_dup[i] for i in candidates]
+    else:
+        started = time.perf_counter()
+        scores = score_batch([items[i] for i in candidates], datetime.now(timezone.utc), cfg)
+        metrics.SCORE_SECONDS.observe(time.perf_counter() - started)
+        signatures = [None] * len(candidates)
+    metrics.SCORED.inc(len(scores))
+    stamps.scored = time.time()
+    if archive is not None:
+        archive.submit([items[i] for i in candidates], scores)
+    seen: list[str] = []
+    publish: list[tuple[str, NewsItem, float, int]] = []
+    below = rewrites = 0
+    for i, score, signature in zip(candidates, scores, signatures):
+        item, fp = items[i], fps[i]
+        if score < cfg.scoring.threshold:
+            below += 1
+            seen.append(fp)
+        elif (
+            near_dups is not None
+            and near_dups.check_and_add(fp, item.title, item.summary, prepared=signature)
+            is not None
+        ):
+            rewrites += 1
+            seen.append(fp)
+        else:
+            news = NewsItem(
+                title=item.title,
+                summary=item.summary or "",
+                url=str(item.url),
+                source=item.source,
+                tickers=item.tickers,
+                published_at=item.published_at,
+            )
+            publish.append((fp, news, score, i))
+    metrics.drop("below_threshold", below)
+    metrics.drop("near_duplicate", rewrites)
+    # Hand the whole batch to the publisher at once so its queue can order
+    # alerts by score while throttled.
+    started = time.perf_counter()
+    enqueued = time.time()
+    results = await asyncio.gather(
+        *(_timed_send(publisher, news, tz, score) for _, news, score, _ in publish),
+        return_exceptions=True,
+    )
+    if publish:
+        metrics.PUBLISH_STAGE_SECONDS.observe(time.perf_counter() - started)
+    failure: BaseException | None = None
+    failed = 0
+    timelines: list[ItemTimeline] = []
+    for (fp, news, _, i), result in zip(publish, results):
+        if isinstance(result, BaseException):
+            failure = failure or result
+            failed += 1
+            if near_dups is not None:
+                near_dups.discard(fp)
+        else:
+            seen.append(fp)
+            if latency is not None:
+                timelines.append(
+                    ItemTimeline(
+                        news.url,
+                        news.published_at.timestamp(),
+                        stamps.fetched[i] or stamps.normalized,
+                        stamps.normalized,
+                        stamps.deduped,
+                        stamps.scored,
+                        enqueued,
+                        result,
+                    )
+                )
+    if timelines:
+        latency.record(timelines)
+    metrics.PUBLISHED.inc(len(publish) - failed)
+    metrics.drop("publish_failed", failed)
+    started = time.perf_counter()
+    await dedup.mark_seen_many(seen)
+    metrics.DEDUP_SECONDS.observe(time.perf_counter() - started)
+    if failure is not None:
+        raise failure
+    return len(publish) - failed
+
+
+async def _consume(queue: asyncio.Queue, handle: Callable[[Any], Awaitable[Any]]) -> None:
+    while True:
+        batch = await queue.get()
+        try:
+            await handle(batch)
+        except Exception:
+            logger.exception("failed to process batch")
+        finally:
+            queue.task_done()
+
+
+async def run_pipeline(
+    batches: AsyncIterator[Any],
+    handle: Callable[[Any], Awaitable[Any]],
+    *,
+    workers: int = 1,
+    queue_size: int = 100,
+    stop: asyncio.Event | None = None,
+    drain_timeout: float | None = 30.0,
+    queue: asyncio.Queue | PriorityBuffer | None = None,
+) -> None:
+    """Feed ``batches`` through a bounded queue into ``workers`` consumers.
+
+    Runs until ``batches`` is exhausted or ``stop`` is set.  The producer is
+    then stopped and the queue is drained (bounded by ``drain_timeout``,
+    ``None`` waits for every batch) before the workers are cancelled.  ``queue`` replaces the blocking
+    queue of ``queue_size`` batches, e.g. with a :class:`PriorityBuffer`
+    that sheds load instead of blocking the producer.
+    """
+
+    stop = stop or asyncio.Event()
+    if queue is None:
+        queue = asyncio.Queue(maxsize=queue_size)
+    metrics.track_queue("batches" if isinstance(queue, asyncio.Queue) else "buffer", queue.qsize)
+
+    async def producer():
+        async for batch in batches:
+            await queue.put(batch)
+
+    consumers = [asyncio.create_task(_consume(queue, handle)) for _ in range(max(workers, 1))]
+    producing = asyncio.create_task(producer())
+    stopping = asyncio.create_task(stop.wait())
+    try:
+        await asyncio.wait({producing, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        if producing.done():
+            producing.result()
+    finally:
+        for task in (producing, stopping):
+            task.cancel()
+        await asyncio.gather(producing, stopping, return_exceptions=True)
+        try:
+            await asyncio.wait_for(queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("shutdown: dropped %d undrained batches", queue.qsize())
+        for task in consumers:
+            task.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+
+
+async def run(
+    cfg,
+    *,
+    redis_client=None,
+    bot=None,
+    stop: asyncio.Event | None = None,
+    once: bool = False,
+    role: str | None = None,
+) -> None:
+    """Wire providers, dedup and the publisher from ``cfg`` and run until ``stop``.
+
+    ``redis_client`` and ``bot`` replace the Redis connection from
+    ``runtime.redis_url`` and the Telegram bot, e.g. for benchmarks.  With
+    ``once``, every provider is polled a single time and the call returns
+    after the results were processed and published, however long the
+    Telegram rate limit makes that take; nothing is shed or left undrained.
+
+    With ``streams.enabled``, pollers and workers are connected through a
+    Redis Stream instead of the in-process queue, and ``streams.role``
+    (or ``role``) selects which of the two this process runs.  ``once``
+    always runs both in-process.
+    """
+
+    streams = cfg.streams if cfg.streams.enabled and not once else None
+    role = (role or streams.role) if streams is not None else "all"
     tz = ZoneInfo(cfg.runtime.tz)
-    dedup.init(cfg.runtime.redis_url)
+    if cfg.scoring.lexicon_path:
+        load_lexicon(cfg.scoring.lexicon_path)
+    dedup.init(
+        cfg.runtime.redis_url,
+        client=redis_client,
+        cache_size=cfg.runtime.dedup_cache_size,
+        # other workers write to the dedup set too
+        trust_local=cfg.runtime.dedup_cache_exclusive and streams is None,
+        window_s=cfg.runtime.dedup_window_s,
+    )
+    await dedup.warm()
+    if not once:
+        metrics.serve(cfg.runtime.metrics_port, cfg.runtime.metrics_host)
+
+    if stop is None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):  # pragma: no cover - Windows
+                pass
+    latency = LatencyTracker(
+        cfg.runtime.latency_window, cfg.runtime.latency_report_s, cfg.runtime.latency_slowest
+    )
+
+    # everything below is released in the finally block, whatever fails
+    lag_watch = profiler = capture = archive = cpu = None
+    try:
+        if cfg.runtime.loop_lag_interval_s > 0:
+            lag_watch = asyncio.create_task(
+                metrics.watch_loop_lag(cfg.runtime.loop_lag_interval_s)
+            )
+        profiler = _start_profiler(cfg.profiler)
 
-    queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=100)
+        if cfg.capture.dir and role != "worker":
+            capture = CaptureLog(
+                cfg.capture.dir,
+                max_segment_bytes=int(cfg.capture.max_segment_mb * 2**20),
+                max_segment_age_s=cfg.capture.max_segment_age_s,
+                queue_size=cfg.capture.queue_size,
+            )
+            capture.start()
+            metrics.track_queue("capture", lambda: len(capture))
 
-    async with aiohttp.ClientSession() as session:
-        provider = NewsdataProvider(session, cfg.providers.newsdata.model_dump())
-        publisher = TelegramPublisher(
-            cfg.telegram.bot_token,
-            cfg.telegram.channel_id,
-            rate_limit=cfg.telegram.rate_limit_per_min,
+        # HTTP and provider modules load here rather than at import time
+        import aiohttp
+
+        from app.providers.registry import build_providers
+        from app.providers.scheduler import ProviderScheduler
+
+        connector = aiohttp.TCPConnector(
+            limit=cfg.runtime.http_connections, ttl_dns_cache=300
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
+            providers = build_providers(
+                session, cfg.providers.enabled(), dedup.client(), capture
+            )
+            scheduler = ProviderScheduler(providers, jitter=cfg.runtime.provider_start_jitter_s)
+            batches = scheduler.poll_once() if once else scheduler.batches()
+            publisher = None
+            if role != "poller":
+                publisher = TelegramPublisher(
+                    cfg.telegram.bot_token,
+                    cfg.telegram.channel_id,
+                    rate_limit=cfg.telegram.rate_limit_per_min,
+                    burst=cfg.telegram.burst,
+                    digest_threshold=cfg.telegram.digest_threshold,
+                    digest_max_items=cfg.telegram.digest_max_items,
+                    digest_group_by=cfg.telegram.digest_group_by,
+                    digest_window_min=cfg.telegram.digest_window_min,
+                    bot=bot,
+                )
+                metrics.track_queue("telegram", publisher.queue_depth)
+                archive = await _open_archive(cfg.archive)
+            if role != "poller" and cfg.runtime.cpu_executor != "none":
+                from app.services.executor import CpuStage
+
+                cpu = CpuStage(cfg, cfg.runtime.cpu_executor, cfg.runtime.cpu_workers)
+            worker = _Worker(
+                cfg,
+                publisher,
+                tz,
+                archive,
+                providers,
+                claim=streams is not None,
+                cpu=cpu,
+                latency=latency,
+            )
+
+            if streams is None:
+                await run_pipeline(
+                    batches,
+                    worker.handle,
+                    workers=cfg.runtime.workers,
+                    queue_size=cfg.runtime.queue_size,
+                    stop=stop,
+                    # a cron run is not polled again before the cursor
+                    # overlap ends, so it publishes everything it fetched
+                    drain_timeout=None if once else cfg.runtime.drain_timeout_s,
+                    queue=None if once else _shedding_buffer(cfg),
+                )
+            else:
+                await _run_streams(cfg, streams, role, batches, worker, stop)
+    finally:
+        if archive is not None:
+            await archive.close()
+            await archive.pool.close()
+        if capture is not None:
+            await capture.close()
+        if cpu is not None:
+            await asyncio.to_thread(cpu.close)
+        if lag_watch is not None:
+            lag_watch.cancel()
+        if profiler is not None:
+            profiler.stop()
+        latency.report()
+
+
+def _start_profiler(settings) -> SamplingProfiler | None:
+    """Bind the profiler to its signal and start it if configured to."""
+    if not settings.signal and not settings.start_on_launch:
+        return None
+    profiler = SamplingProfiler(settings.dir, settings.interval_ms / 1000)
+    loop = asyncio.get_running_loop()
+    if settings.signal:
+        try:
+            loop.add_signal_handler(getattr(signal, settings.signal), profiler.toggle)
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            logger.warning("profiler: cannot handle signal %s", settings.signal)
+    if settings.start_on_launch:
+        profiler.start()
+        if settings.duration_s > 0:
+            loop.call_later(settings.duration_s, profiler.stop)
+    return profiler
+
+
+def _shedding_buffer(cfg) -> PriorityBuffer | None:
+    if cfg.runtime.buffer_items <= 0:
+        return None
+
+    def rank(raw) -> float:
+        return pre_score(raw, datetime.now(timezone.utc), cfg)
+
+    return PriorityBuffer(cfg.runtime.buffer_items, rank, cfg.runtime.buffer_batch_size)
+
+
+class _Worker:
+    """Process ``(provider, raws)`` batches with the state shared by workers."""
+
+    def __init__(
+        self, cfg, publisher, tz, archive, providers, claim=False, cpu=None, latency=None
+    ):
+        self.cfg = cfg
+        self.cpu: CpuStage | None = cpu
+        self.latency = latency
+        self.publisher = publisher
+        self.tz = tz
+        self.archive = archive
+        self.providers = {p.name: p for p in providers}
+        self.claim = claim
+        self.inflight: set[str] = set()
+        self.near_dups = None
+        if cfg.filters.near_dup_window_h > 0:
+            self.near_dups = NearDuplicateIndex(
+                window_s=cfg.filters.near_dup_window_h * 3600,
+                threshold=cfg.filters.near_dup_threshold,
+            )
+
+    async def handle(self, batch) -> int:
+        provider, raws = batch
+        name = provider if isinstance(provider, str) else provider.name
+        provider = self.providers.get(name)
+        prepare = None
+        if self.cpu is not None:
+            prepare = functools.partial(self.cpu.prepare, name)
+        return await process_batch(
+            raws,
+            self.cfg,
+            self.publisher,
+            self.tz,
+            self.near_dups,
+            self.inflight,
+            normalize=provider.normalize_batch if provider is not None else normalize_batch,
+            archive=self.archive,
+            claim=self.claim,
+            prepare=prepare,
+            latency=self.latency,
+        )
+
+
+async def _run_streams(cfg, streams, role, batches, worker: _Worker, stop) -> None:
+    from app.services.streams import StreamConsumer, StreamWriter
+
+    client = dedup.client()
+    tasks = []
+    if role in ("all", "poller"):
+        writer = StreamWriter(client, streams.key, streams.maxlen)
+        tasks.append(
+            run_pipeline(
+                batches,
+                writer.add,
+                queue_size=cfg.runtime.queue_size,
+                stop=stop,
+                drain_timeout=cfg.runtime.drain_timeout_s,
+            )
+        )
+    if role in ("all", "worker"):
+        consumer = StreamConsumer(
+            client,
+            streams.key,
+            streams.group,
+            streams.consumer,
+            count=streams.batch_size,
+            block_ms=streams.block_ms,
+            claim_idle_ms=streams.claim_idle_ms,
+            max_deliveries=streams.max_deliveries,
+            dead_key=streams.dead_letter_key,
+            maxlen=streams.maxlen,
+        )
+
+        async def handle(batch):
+            ids, provider, raws = batch
+            await worker.handle((provider, raws))
+            # failed batches stay pending and are reclaimed later, until
+            # they are dead-lettered
+            await consumer.ack(ids)
+
+        tasks.append(
+            run_pipeline(
+                consumer.batches(stop),
+                handle,
+                workers=cfg.runtime.workers,
+                queue_size=cfg.runtime.queue_size,
+                stop=stop,
+                drain_timeout=cfg.runtime.drain_timeout_s,
+            )
         )
+    await asyncio.gather(*tasks)
+
+
+async def _open_archive(settings) -> ArchiveSink | None:
+    """Connect the PostgreSQL archive if ``archive.dsn`` is configured."""
+    if not settings.dsn:
+        return None
+    import asyncpg
 
-        async def producer():
-            async for raw in provider.run():
-                await queue.put(raw)
-
-        async def consumer():
-            while True:
-                raw = await queue.get()
-                try:
-                    item = normalize_newsdata(raw)
-                    fp = dedup.fingerprint(str(item.url), item.title, item.source)
-                    if await dedup.is_duplicate(fp):
-                        continue
-                    score = score_item(item, datetime.now(timezone.utc), cfg)
-                    if score >= cfg.scoring.threshold:
-                        news = NewsItem(
-                            title=item.title,
-                            summary=item.summary or "",
-                            url=str(item.url),
-                            source=item.source,
-                            tickers=item.tickers,
-                            published_at=item.published_at,
-                        )
-                        await publisher.send(news, tz)
-                    await dedup.mark_seen(fp)
-                finally:
-                    queue.task_done()
-
-        await asyncio.gather(producer(), consumer())
+    pool = await asyncpg.create_pool(
+        settings.dsn, min_size=settings.pool_min_size, max_size=settings.pool_max_size
+    )
+    archive = ArchiveSink(
+        pool,
+        table=settings.table,
+        batch_size=settings.batch_size,
+        flush_interval_s=settings.flush_interval_s,
+        max_pending=settings.max_pending,
+    )
+    try:
+        await archive.ensure_schema()
+    except BaseException:
+        await pool.close()
+        raise
+    archive.start()
+    metrics.track_queue("archive", lambda: len(archive))
+    return archive
+
+
+async def main(argv: Sequence[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Poll news providers and publish alerts.")
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument(
+        "--once",
+        action="store_true",
+        help="poll every provider once, publish the results and exit (for cron jobs)",
+    )
+    ap.add_argument(
+        "--role",
+        choices=("all", "poller", "worker"),
+        help="with streams enabled, run only pollers or workers (default: streams.role)",
+    )
+    ap.add_argument(
+        "--metrics-port",
+        type=int,
+        help="override runtime.metrics_port, e.g. per worker on one host (0 disables)",
+    )
+    args = ap.parse_args(argv)
+    load_dotenv()
+    cfg = load_config(args.config)
+    if args.metrics_port is not None:
+        cfg.runtime.metrics_port = args.metrics_port
+    await run(cfg, once=args.once, role=args.role)
 
 
 if __name__ == "__main__":
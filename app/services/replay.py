@@ -0,0 +1,346 @@
+"""Replay raw Newsdata payload dumps through the scoring pipeline.
+
+Reads ``.json``/``.jsonl`` files (optionally ``.gz``) holding whole API
+responses or single articles, and runs them through
+:func:`~app.providers.newsdata.parse_results`, normalization and scoring in
+a process pool.  De-duplication runs in the parent against a scratch Redis
+namespace, so the live dedup set is never touched::
+
+    python -m app.services.replay dumps/*.jsonl --dry-run --out decisions.jsonl
+
+Without ``--dry-run`` the items that would be published are sent to
+Telegram.  Items are scored as of ``published_at + --lag-s`` (roughly when
+the live ingestor would have seen them) unless ``--as-of`` fixes one
+instant for all of them.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Sequence
+
+import orjson
+
+from app.core import dedup
+from app.core.config import FiltersSettings, ScoringSettings, load_config
+from app.core.matcher import load_lexicon
+from app.core.neardup import NearDuplicateIndex
+from app.core.normalize import normalize_batch
+from app.core.score import score_batch, score_item
+from app.providers.newsdata import parse_results
+
+logger = logging.getLogger(__name__)
+
+_worker_cfg = None
+_worker_near_dups: NearDuplicateIndex | None = None
+
+
+@dataclass
+class Scored:
+    """Compact, picklable result of scoring one item in a worker."""
+
+    fp: str
+    external_id: str
+    title: str
+    summary: str | None
+    url: str
+    source: str
+    tickers: list[str]
+    published_at: datetime
+    score: float
+    # NearDuplicateIndex.prepare() result, computed in the worker
+    near_dup: tuple | None = None
+
+
+# ----------------------------------------------------------------------
+# input
+def _open(path: Path) -> IO[bytes]:
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def iter_chunks(paths: Iterable[Path], lines_per_chunk: int) -> Iterator[list[bytes]]:
+    """Yield lists of undecoded documents; decoding happens in the workers.
+
+    A ``.jsonl`` line and a whole ``.json`` file each count as one document.
+    """
+    chunk: list[bytes] = []
+    for path in paths:
+        stem = path.name[:-3] if path.suffix == ".gz" else path.name
+        with _open(path) as fh:
+            if stem.endswith(".jsonl"):
+                docs: Iterable[bytes] = (line for line in fh if line.strip())
+            else:
+                docs = [fh.read()]
+            for doc in docs:
+                chunk.append(doc)
+                if len(chunk) >= lines_per_chunk:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def _articles(doc: bytes) -> list[dict]:
+    data = orjson.loads(doc)
+    if isinstance(data, list):
+        data = {"results": data}
+    elif "results" not in data:
+        data = {"results": [data]}
+    return parse_results(data)
+
+
+# ----------------------------------------------------------------------
+# worker side
+def _init_worker(filters: dict, scoring: dict) -> None:
+    global _worker_cfg, _worker_near_dups
+    _worker_cfg = argparse.Namespace(
+        filters=FiltersSettings.model_validate(filters),
+        scoring=ScoringSettings.model_validate(scoring),
+    )
+    if _worker_cfg.scoring.lexicon_path:
+        load_lexicon(_worker_cfg.scoring.lexicon_path)
+    # only used for its MinHash signatures, the parent keeps the real index
+    _worker_near_dups = _near_dup_index(_worker_cfg.filters)
+
+
+def _near_dup_index(filters: FiltersSettings) -> NearDuplicateIndex | None:
+    if filters.near_dup_window_h <= 0:
+        return None
+    return NearDuplicateIndex(
+        window_s=filters.near_dup_window_h * 3600, threshold=filters.near_dup_threshold
+    )
+
+
+def score_chunk(docs: list[bytes], lag_s: float, as_of: datetime | None) -> list[Scored]:
+    """Parse, normalize and score one chunk of documents (runs in a worker)."""
+    cfg = _worker_cfg
+    raws: list[dict] = []
+    for doc in docs:
+        try:
+            raws.extend(_articles(doc))
+        except (orjson.JSONDecodeError, AttributeError):
+            logger.warning("skipping undecodable document (%d bytes)", len(doc))
+    items = normalize_batch(raws)
+    if as_of is not None:
+        scores = score_batch(items, as_of, cfg)
+    else:
+        lag = timedelta(seconds=lag_s)
+        scores = [score_item(item, item.published_at + lag, cfg) for item in items]
+    threshold = cfg.scoring.threshold
+    near_dups = _worker_near_dups
+    return [
+        Scored(
+            dedup.fingerprint(str(i.url), i.title, i.source),
+            i.external_id,
+            i.title,
+            i.summary,
+            str(i.url),
+            i.source,
+            i.tickers,
+            i.published_at,
+            s,
+            # signatures are only needed for items that can be published
+            (
+                near_dups.prepare(i.title, i.summary)
+                if near_dups is not None and s >= threshold
+                else None
+            ),
+        )
+        for i, s in zip(items, scores)
+    ]
+
+
+# ----------------------------------------------------------------------
+# parent side
+class Replay:
+    """Dedup and publish decisions over scored chunks, in input order."""
+
+    def __init__(
+        self,
+        threshold: float,
+        near_dups: NearDuplicateIndex | None = None,
+        out: IO[bytes] | None = None,
+        publish=None,
+    ):
+        self.threshold = threshold
+        self.near_dups = near_dups
+        self.out = out
+        # coroutine function called with every item that passes
+        self.publish = publish
+        self.counts: Counter[str] = Counter()
+        # replayed time, driving the dedup window like near-dup's
+        self.now: float | None = None
+
+    def clock(self) -> float:
+        return time.time() if self.now is None else self.now
+
+    async def consume(self, scored: Sequence[Scored]) -> None:
+        if scored:
+            # one dedup round trip per chunk, as of its newest item
+            self.now = max(s.published_at.timestamp() for s in scored)
+        fresh = await dedup.filter_new([s.fp for s in scored])
+        batch_seen: set[str] = set()
+        for item, is_new in zip(scored, fresh):
+            decision = self._decide(item, is_new and item.fp not in batch_seen)
+            batch_seen.add(item.fp)
+            self.counts[decision] += 1
+            if self.out is not None:
+                self.out.write(_decision_line(item, decision))
+            if decision == "publish" and self.publish is not None:
+                await self.publish(item)
+        await dedup.mark_seen_many(batch_seen)
+
+    def _decide(self, item: Scored, is_new: bool) -> str:
+        if not is_new:
+            return "duplicate"
+        if item.score < self.threshold:
+            return "below_threshold"
+        if (
+            self.near_dups is not None
+            and self.near_dups.check_and_add(
+                item.fp,
+                item.title,
+                item.summary,
+                now=item.published_at.timestamp(),
+                prepared=item.near_dup,
+            )
+            is not None
+        ):
+            return "near_duplicate"
+        return "publish"
+
+
+def _decision_line(item: Scored, decision: str) -> bytes:
+    return (
+        orjson.dumps(
+            {
+                "external_id": item.external_id,
+                "fp": item.fp,
+                "published_at": item.published_at,
+                "source": item.source,
+                "title": item.title,
+                "url": item.url,
+                "score": item.score,
+                "decision": decision,
+            }
+        )
+        + b"\n"
+    )
+
+
+def _telegram_sink(cfg):
+    # imported lazily: dry runs never need the Telegram client
+    from zoneinfo import ZoneInfo
+
+    from app.core.telegram import NewsItem, TelegramPublisher
+
+    tz = ZoneInfo(cfg.runtime.tz)
+    publisher = TelegramPublisher(
+        cfg.telegram.bot_token,
+        cfg.telegram.channel_id,
+        rate_limit=cfg.telegram.rate_limit_per_min,
+        burst=cfg.telegram.burst,
+    )
+
+    async def publish(item: Scored) -> None:
+        news = NewsItem(
+            title=item.title,
+            summary=item.summary or "",
+            url=item.url,
+            source=item.source,
+            tickers=item.tickers,
+            published_at=item.published_at,
+        )
+        await publisher.send(news, tz, score=item.score)
+
+    return publish
+
+
+async def replay(args: argparse.Namespace, redis_client=None) -> dict[str, int]:
+    """Run a replay described by parsed command line ``args``; return counts."""
+    cfg = load_config(args.config)
+    namespace = args.namespace or f"replay:{int(time.time())}"
+    near_dups = _near_dup_index(cfg.filters)
+    as_of = datetime.fromisoformat(args.as_of) if args.as_of else None
+    if as_of is not None and as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=timezone.utc)
+    workers = args.workers or os.cpu_count() or 1
+    state = Replay(
+        cfg.scoring.threshold,
+        near_dups,
+        publish=None if args.dry_run else _telegram_sink(cfg),
+    )
+    dedup.init(
+        args.redis_url or cfg.runtime.redis_url,
+        client=redis_client,
+        cache_size=max(cfg.runtime.dedup_cache_size, 100_000),
+        window_s=cfg.runtime.dedup_window_s,
+        namespace=namespace,
+        clock=state.clock,
+    )
+    # the scratch namespace is ours alone, so the local cache can answer misses
+    await dedup.warm()
+    out = state.out = open(args.out, "wb") if args.out else None
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            workers,
+            initializer=_init_worker,
+            initargs=(cfg.filters.model_dump(), cfg.scoring.model_dump()),
+        ) as pool:
+            pending: deque[asyncio.Future] = deque()
+            for chunk in iter_chunks(args.paths, args.chunk_lines):
+                pending.append(loop.run_in_executor(pool, score_chunk, chunk, args.lag_s, as_of))
+                # keep every worker busy while results are consumed in order
+                if len(pending) >= workers * 2:
+                    await state.consume(await pending.popleft())
+            while pending:
+                await state.consume(await pending.popleft())
+    finally:
+        if out is not None:
+            out.close()
+        if not args.keep_namespace:
+            await dedup.clear()
+    elapsed = time.perf_counter() - started
+    counts = dict(state.counts)
+    counts["items"] = sum(state.counts.values())
+    counts["items_per_min"] = int(counts["items"] / elapsed * 60) if elapsed else 0
+    return counts
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("paths", nargs="+", type=Path, help=".json/.jsonl dumps, optionally .gz")
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--dry-run", action="store_true", help="only compute decisions")
+    ap.add_argument("--out", help="write one JSON decision per item to this file")
+    ap.add_argument("--workers", type=int, default=0, help="worker processes (default: CPUs)")
+    ap.add_argument("--chunk-lines", type=int, default=20, help="documents per worker task")
+    ap.add_argument(
+        "--lag-s", type=float, default=300.0, help="score items this long after publication"
+    )
+    ap.add_argument("--as-of", help="score every item as of this ISO timestamp instead")
+    ap.add_argument("--redis-url", help="Redis for the scratch dedup set (default: runtime)")
+    ap.add_argument("--namespace", help="scratch dedup namespace (default: replay:<unix time>)")
+    ap.add_argument("--keep-namespace", action="store_true", help="keep the scratch dedup set")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    counts = asyncio.run(replay(args))
+    print(orjson.dumps(dict(counts), option=orjson.OPT_INDENT_2).decode(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Redis Streams transport between poller and worker processes.
+
+Pollers append every raw item of a batch to one stream with ``XADD``; any
+number of worker processes read it through a consumer group, so each entry
+is delivered to one worker.  Entries are acknowledged only after their
+batch was processed; entries left pending by a worker that died are taken
+over by the others once they have been idle for ``claim_idle_ms``.  Entries
+that keep failing are moved to a dead-letter stream after ``max_deliveries``
+attempts instead of cycling forever.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+import orjson
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def default_consumer() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class StreamWriter:
+    """Append poll batches to a stream, one entry per raw item."""
+
+    def __init__(self, client: redis.Redis, key: str, maxlen: int | None = 100_000):
+        self.client = client
+        self.key = key
+        self.maxlen = maxlen
+
+    async def add(self, batch: tuple[Any, Sequence[Mapping[str, Any]]]) -> None:
+        """Write ``(provider, raws)`` in one pipelined round trip."""
+        provider, raws = batch
+        name = getattr(provider, "name", provider)
+        if not raws:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for raw in raws:
+                pipe.xadd(
+                    self.key,
+                    {"provider": name, "raw": orjson.dumps(raw)},
+                    maxlen=self.maxlen,
+                    approximate=True,
+                )
+            await pipe.execute()
+
+
+class StreamConsumer:
+    """Read raw items of one consumer group, grouped by provider.
+
+    :meth:`batches` yields ``(ids, provider, raws)``; pass ``ids`` to
+    :meth:`ack` once the items were processed.  Unacknowledged entries stay
+    pending and are re-delivered to some consumer after ``claim_idle_ms``.
+    An entry already delivered ``max_deliveries`` times is copied to
+    ``dead_key`` (with its ``id`` and ``deliveries``) and acknowledged
+    instead; ``max_deliveries=0`` retries forever.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        key: str,
+        group: str,
+        consumer: str | None = None,
+        count: int = 100,
+        block_ms: int = 2000,
+        claim_idle_ms: int = 60_000,
+        max_deliveries: int = 5,
+        dead_key: str | None = None,
+        maxlen: int | None = 100_000,
+    ):
+        self.client = client
+        self.key = key
+        self.group = group
+        self.consumer = consumer or default_consumer()
+        self.count = count
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max_deliveries
+        self.dead_key = dead_key or f"{key}:dead"
+        self.maxlen = maxlen
+        self.reclaimed = 0
+        self.dead = 0
+
+    async def ensure_group(self) -> None:
+        """Create the group (and the stream) unless it already exists."""
+        try:
+            await self.client.xgroup_create(self.key, self.group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def claim_stale(self) -> list[tuple[bytes | str, dict]]:
+        """Take over entries other consumers left pending for too long."""
+        entries: list[tuple[bytes | str, dict]] = []
+        start = "0-0"
+        while True:
+            reply = await self.client.xautoclaim(
+                self.key,
+                self.group,
+                self.consumer,
+                min_idle_time=self.claim_idle_ms,
+                start_id=start,
+                count=self.count,
+            )
+            start, claimed = reply[0], reply[1]
+            # entries deleted by MAXLEN trimming come back as None
+            entries.extend(e for e in claimed if e and e[1])
+            if start in ("0-0", b"0-0") or len(entries) >= self.count:
+                break
+        if entries and self.max_deliveries:
+            entries = await self._dead_letter(entries)
+        self.reclaimed += len(entries)
+        return entries
+
+    async def _dead_letter(self, entries: list[tuple[bytes | str, dict]]) -> list:
+        """Move entries delivered too often to :attr:`dead_key`; return the rest."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            for entry_id, _ in entries:
+                pipe.xpending_range(
+                    self.key, self.group, min=entry_id, max=entry_id, count=1
+                )
+            pending = await pipe.execute()
+        keep, dead = [], []
+        for entry, info in zip(entries, pending):
+            # the claim itself counted as a delivery
+            deliveries = info[0]["times_delivered"] if info else 1
+            if deliveries > self.max_deliveries:
+                dead.append((entry, deliveries))
+            else:
+                keep.append(entry)
+        if dead:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for (entry_id, fields), deliveries in dead:
+                    pipe.xadd(
+                        self.dead_key,
+                        {**fields, "id": entry_id, "deliveries": deliveries - 1},
+                        maxlen=self.maxlen,
+                        approximate=True,
+                    )
+                pipe.xack(self.key, self.group, *(entry_id for (entry_id, _), _ in dead))
+                await pipe.execute()
+            logger.error(
+                "moved %d stream entries that failed %d times to %s",
+                len(dead),
+                self.max_deliveries,
+                self.dead_key,
+            )
+            self.dead += len(dead)
+            metrics.drop("dead_letter", len(dead))
+        return keep
+
+    async def read(self, block_ms: int | None = None) -> list[tuple[bytes | str, dict]]:
+        reply = await self.client.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.key: ">"},
+            count=self.count,
+            block=self.block_ms if block_ms is None else block_ms,
+        )
+        return [entry for _, entries in reply or [] for entry in entries]
+
+    async def ack(self, ids: Sequence[bytes | str]) -> None:
+        if ids:
+            await self.client.xack(self.key, self.group, *ids)
+
+    async def batches(
+        self, stop: asyncio.Event | None = None
+    ) -> AsyncIterator[tuple[list, str, list[dict]]]:
+        """Yield reclaimed, then new entries until ``stop`` is set."""
+        await self.ensure_group()
+        while stop is None or not stop.is_set():
+            entries = await self.claim_stale()
+            if entries:
+                logger.info("reclaimed %d stale stream entries", len(entries))
+            else:
+                entries = await self.read()
+            for batch in group_entries(entries):
+                yield batch
+
+
+def group_entries(entries) -> list[tuple[list, str, list[dict]]]:
+    """Split stream entries into ``(ids, provider, raws)`` per provider."""
+    groups: dict[str, tuple[list, list[dict]]] = {}
+    for entry_id, fields in entries:
+        provider = fields.get("provider", fields.get(b"provider"))
+        raw = fields.get("raw", fields.get(b"raw"))
+        if isinstance(provider, bytes):
+            provider = provider.decode()
+        ids, raws = groups.setdefault(provider, ([], []))
+        ids.append(entry_id)
+        raws.append(orjson.loads(raw))
+    return [(ids, provider, raws) for provider, (ids, raws) in groups.items()]
@@ -0,0 +1,67 @@
+"""Benchmark the Aho-Corasick matcher against a regex alternation.
+
+Builds a lexicon of synthetic symbols and names of the given size and times
+both approaches over news-sized texts::
+
+    python -m benchmarks.bench_matcher --patterns 5000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import string
+import time
+
+from app.core.matcher import KeywordMatcher
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--patterns", type=int, default=5000)
+    ap.add_argument("--texts", type=int, default=2000)
+    args = ap.parse_args()
+
+    rng = random.Random(3)
+    symbols = {
+        "".join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 5)))
+        for _ in range(args.patterns)
+    }
+    tickers = {s: [f"{s.lower()} network"] for s in symbols}
+    keywords = {w: 1.0 for w in ("etf", "hack", "listing", "sec", "exploit")}
+    start = time.perf_counter()
+    matcher = KeywordMatcher(tickers, keywords)
+    build_s = time.perf_counter() - start
+
+    alternation = sorted(
+        [re.escape(s) for s in symbols]
+        + [re.escape(f"{s.lower()} network") for s in symbols]
+        + list(keywords),
+        key=len,
+        reverse=True,
+    )
+    regex = re.compile(r"\b(" + "|".join(alternation) + r")\b", re.IGNORECASE)
+
+    words = "the market saw price exchange traders after a report on whales".split()
+    pool = list(symbols)
+    texts = [
+        " ".join(rng.choice(words + pool[:50] + list(keywords)) for _ in range(70))
+        for _ in range(args.texts)
+    ]
+
+    start = time.perf_counter()
+    for text in texts:
+        matcher.match(text)
+    ac_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in texts:
+        regex.findall(text)
+    re_s = time.perf_counter() - start
+
+    print(f"lexicon patterns:  {2 * len(symbols) + len(keywords)} (build {build_s * 1e3:.0f} ms)")
+    print(f"aho-corasick:      {ac_s / args.texts * 1e6:8.1f} us/text")
+    print(f"regex alternation: {re_s / args.texts * 1e6:8.1f} us/text")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark :class:`app.core.neardup.NearDuplicateIndex` lookups.
+
+Fills the index with synthetic headlines and measures query latency for
+rewrites of stored stories and for unrelated ones::
+
+    python -m benchmarks.bench_neardup --items 100000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.core.neardup import NearDuplicateIndex
+
+_VOCAB = (
+    "bitcoin ethereum solana etf sec approves rejects delays hack exploit listing "
+    "binance coinbase kraken exchange token airdrop mainnet upgrade fork whale "
+    "price rally crash surge drop record high low fund inflows outflows court "
+    "lawsuit regulator stablecoin tether circle defi protocol bridge validator "
+    "staking yield treasury mining halving miners hashrate wallet custody bank"
+).split()
+
+
+_letters = random.Random(0)
+# a large filler vocabulary so unrelated synthetic headlines rarely overlap
+_WORDS = [
+    "".join(_letters.choices("abcdefghijklmnopqrstuvwxyz", k=_letters.randint(3, 9)))
+    for _ in range(20_000)
+]
+
+
+def _headline(rng: random.Random) -> str:
+    words = rng.sample(_VOCAB, 2) + rng.sample(_WORDS, rng.randint(5, 9))
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def _rewrite(rng: random.Random, title: str) -> str:
+    words = title.split()
+    words.pop(rng.randrange(len(words) - 1))
+    words.insert(rng.randrange(len(words)), rng.choice(("report", "breaking", "update")))
+    return " ".join(words).title()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--items", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=2_000)
+    args = ap.parse_args()
+
+    rng = random.Random(42)
+    index = NearDuplicateIndex(window_s=float("inf"))
+    titles = [_headline(rng) for _ in range(args.items)]
+    start = time.perf_counter()
+    for i, title in enumerate(titles):
+        index.add(str(i), title, now=0.0)
+    fill_s = time.perf_counter() - start
+
+    rewrites = [(i, _rewrite(rng, titles[i])) for i in rng.sample(range(args.items), args.queries)]
+    start = time.perf_counter()
+    hits = sum(index.query(t, now=0.0) == str(i) for i, t in rewrites)
+    rewrite_s = time.perf_counter() - start
+
+    novel = [_headline(rng) for _ in range(args.queries)]
+    start = time.perf_counter()
+    false_hits = sum(index.query(t, now=0.0) is not None for t in novel)
+    novel_s = time.perf_counter() - start
+
+    print(f"stored items:      {len(index)} (insert {fill_s / args.items * 1e6:.1f} us/item)")
+    print(
+        f"rewrite queries:   {rewrite_s / args.queries * 1e6:.1f} us/query, "
+        f"recall {hits / args.queries:.3f}"
+    )
+    print(
+        f"novel queries:     {novel_s / args.queries * 1e6:.1f} us/query, "
+        f"false positives {false_hits / args.queries:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark Newsdata normalization throughput.
+
+Compares the original per-item implementation (kept here as a reference),
+the current :func:`normalize_newsdata` and :func:`normalize_batch`::
+
+    python -m benchmarks.bench_normalize --items 20000
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import re
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from dateutil import parser
+
+from app.core.models import NormalizedItem
+from app.core.normalize import normalize_batch, normalize_newsdata
+
+TICKER_PATTERN = re.compile(
+    r"\b(BTC|ETH|SOL|BNB|XRP|ADA|DOGE|DOT|ARB|OP|LINK|MATIC|LTC|XMR|SHIB)\b",
+    re.IGNORECASE,
+)
+
+
+def baseline_normalize(raw: dict) -> NormalizedItem:
+    """The per-item normalizer before the batch fast path, for comparison."""
+
+    def strip(text):
+        if not text:
+            return None
+        return re.sub(r"<[^>]+>", "", text).strip()
+
+    title = strip(raw.get("title", "")) or ""
+    summary = strip(raw.get("description") or raw.get("content"))
+    url = raw.get("link") or raw.get("url") or ""
+    published = raw.get("pubDate") or raw.get("published_at")
+    published_at = (
+        parser.parse(published).astimezone(timezone.utc)
+        if published
+        else datetime.now(timezone.utc)
+    )
+    authors = raw.get("creator") or []
+    if isinstance(authors, str):
+        authors = [authors]
+    categories = raw.get("category") or []
+    if isinstance(categories, str):
+        categories = [categories]
+    tickers = raw.get("coin") or raw.get("tickers") or []
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    if not tickers:
+        text = f"{title} {summary or ''}"
+        tickers = sorted({m.group(1).upper() for m in TICKER_PATTERN.finditer(text)})
+    external_id = raw.get("article_id") or raw.get("id")
+    if not external_id:
+        external_id = hashlib.sha1(url.encode()).hexdigest()
+    source = raw.get("source_id") or raw.get("source") or urlparse(url).netloc
+    return NormalizedItem(
+        external_id=external_id,
+        source=source or "newsdata",
+        title=title,
+        summary=summary,
+        url=url,
+        published_at=published_at,
+        language=raw.get("language"),
+        authors=authors,
+        tickers=tickers,
+        categories=categories,
+    )
+
+
+def synthetic_raws(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    words = "bitcoin price market ETF SEC approval traders whales exchange listing".split()
+    tickers = "BTC ETH SOL XRP DOGE LINK".split()
+    raws = []
+    for i in range(n):
+        body = " ".join(rng.choice(words + tickers) for _ in range(60))
+        raws.append(
+            {
+                "article_id": f"a{i}",
+                "title": f"<b>{rng.choice(tickers)}</b> " + " ".join(rng.sample(words, 6)),
+                "description": f"<p>{body}</p>",
+                "link": f"https://news{i % 50}.example.com/story/{i}",
+                "pubDate": f"2024-05-01 {i % 24:02d}:{i % 60:02d}:00",
+                "language": "en",
+                "creator": ["Reporter"],
+                "category": ["business"],
+                "source_id": f"news{i % 50}",
+            }
+        )
+    return raws
+
+
+def _rate(fn, raws) -> float:
+    start = time.perf_counter()
+    fn(raws)
+    return len(raws) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--items", type=int, default=20_000)
+    args = ap.parse_args()
+    raws = synthetic_raws(args.items)
+    assert normalize_batch(raws[:100]) == [normalize_newsdata(r) for r in raws[:100]]
+
+    for label, fn in [
+        ("baseline per-item", lambda rs: [baseline_normalize(r) for r in rs]),
+        ("normalize_newsdata", lambda rs: [normalize_newsdata(r) for r in rs]),
+        ("normalize_batch", normalize_batch),
+    ]:
+        print(f"{label:20s} {_rate(fn, raws):>10,.0f} items/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""End-to-end pipeline throughput benchmark.
+
+Serves synthetic Newsdata pages from a local aiohttp server (paginated with
+``nextPage``), runs the real :func:`app.services.ingestor.run` wiring against
+fakeredis (or ``--redis-url``) and a fake Telegram bot, and reports items/s,
+per-stage p50/p99 latency and memory.  Results are written as JSON so runs
+can be compared across commits::
+
+    python -m benchmarks.bench_pipeline --cycles 20 --pages 5 --dup-ratio 0.3
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aiohttp import web
+from prometheus_client import REGISTRY
+
+from app.core.config import Config
+from app.services.ingestor import run
+
+_TICKERS = ["BTC", "ETH", "SOL", "XRP", "DOGE", "ADA", "LINK", "AVAX"]
+_EVENTS = ["ETF approval", "exchange hack", "SEC lawsuit", "listing", "partnership", "upgrade"]
+_RU_WORDS = "биткоин рынок биржа рост падение регулятор токен сеть".split()
+
+
+class SyntheticNewsdata:
+    """Generate Newsdata ``/crypto`` pages for a number of poll cycles.
+
+    Each cycle is ``pages`` pages of ``page_size`` articles; a
+    ``dup_ratio`` share of them repeat an article from an earlier page
+    (same link and title, as syndicated copies arrive).  ``languages`` maps
+    language codes to sampling weights.
+    """
+
+    def __init__(
+        self,
+        cycles: int,
+        pages: int,
+        page_size: int,
+        dup_ratio: float,
+        languages: dict[str, float],
+        seed: int = 7,
+    ):
+        self.rng = random.Random(seed)
+        self.languages = languages
+        self._vocab = ["".join(self.rng.choices("abcdefghijklmnop", k=7)) for _ in range(5000)]
+        self._history: list[dict] = []
+        self._serial = 0
+        self.cycles = [
+            [self._page(page_size, dup_ratio) for _ in range(pages)] for _ in range(cycles)
+        ]
+        self.total_items = cycles * pages * page_size
+
+    def _article(self) -> dict:
+        rng = self.rng
+        self._serial += 1
+        lang = rng.choices(list(self.languages), weights=list(self.languages.values()))[0]
+        words = _RU_WORDS if lang == "ru" else self._vocab
+        title = (
+            f"{rng.choice(_TICKERS)} {rng.choice(_EVENTS)} "
+            + " ".join(rng.choices(words, k=rng.randint(5, 10)))
+        )
+        return {
+            "article_id": f"a{self._serial}",
+            "title": title,
+            "description": " ".join(rng.choices(words, k=40)),
+            "link": f"https://news{self._serial % 50}.example.com/{self._serial}",
+            "source_id": f"src{self._serial % 50}",
+            "pubDate": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "language": lang,
+            "category": ["cryptocurrency"],
+        }
+
+    def _page(self, size: int, dup_ratio: float) -> list[dict]:
+        page = []
+        for _ in range(size):
+            if self._history and self.rng.random() < dup_ratio:
+                page.append(dict(self.rng.choice(self._history), article_id=f"d{self._serial}"))
+                self._serial += 1
+            else:
+                article = self._article()
+                self._history.append(article)
+                page.append(article)
+        return page
+
+
+class StandInServer:
+    """Serve one cycle per request chain; ``exhausted`` is set after the last."""
+
+    def __init__(self, data: SyntheticNewsdata):
+        self.data = data
+        self.cycle = -1
+        self.served = 0
+        self.exhausted = asyncio.Event()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        page = request.query.get("page")
+        if page is None:
+            self.cycle += 1
+        if self.cycle >= len(self.data.cycles):
+            self.exhausted.set()
+            return web.json_response({"status": "success", "results": [], "nextPage": None})
+        pages = self.data.cycles[self.cycle]
+        index = int(page or 0)
+        self.served += len(pages[index])
+        next_page = str(index + 1) if index + 1 < len(pages) else None
+        return web.json_response(
+            {"status": "success", "results": pages[index], "nextPage": next_page}
+        )
+
+    async def start(self) -> tuple[web.AppRunner, int]:
+        app = web.Application()
+        app.router.add_get("/api/1/crypto", self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+
+class FakeBot:
+    """Telegram stand-in that only counts messages after ``latency`` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.messages = 0
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.messages += 1
+
+
+def _config(args, port: int) -> Config:
+    return Config.model_validate(
+        {
+            "telegram": {
+                "bot_token": "bench",
+                "channel_id": "-1001",
+                "rate_limit_per_min": args.telegram_rate,
+                "burst": args.telegram_rate,
+                "digest_threshold": args.digest_threshold,
+            },
+            "providers": {
+                "newsdata": {
+                    "api_key": "bench",
+                    "base_url": f"http://127.0.0.1:{port}/api/1",
+                    "poll_interval_s": 0,
+                    "jitter_s": 0,
+                    "incremental": False,
+                    "query": "language=en,ru&size=50",
+                }
+            },
+            "filters": {"languages": ["en", "ru"], "exclude_domains": ["spam.example.com"]},
+            "scoring": {},
+            "runtime": {
+                "tz": "UTC",
+                "redis_url": args.redis_url or "redis://localhost:6379/0",
+                "workers": args.workers,
+                "queue_size": args.queue_size,
+                "buffer_items": args.buffer_items,
+                "dedup_cache_size": args.cache_size,
+                "provider_start_jitter_s": 0,
+                "metrics_port": 0,
+                "cpu_executor": args.cpu_executor,
+                "cpu_workers": args.cpu_workers,
+                "loop_lag_interval_s": 0.01,
+            },
+        }
+    )
+
+
+def _counter(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def histogram_quantiles(name: str, labels: dict[str, str], qs=(0.5, 0.99)) -> dict:
+    """Estimate quantiles from a histogram's buckets like ``histogram_quantile``."""
+    buckets = []
+    for metric in REGISTRY.collect():
+        for sample in metric.samples:
+            if sample.name == f"{name}_bucket" and all(
+                sample.labels.get(k) == v for k, v in labels.items()
+            ):
+                buckets.append((float(sample.labels["le"]), sample.value))
+    buckets.sort()
+    total = buckets[-1][1] if buckets else 0
+    out: dict = {"count": int(total)}
+    for q in qs:
+        key = f"p{int(q * 100)}_ms"
+        if not total:
+            out[key] = None
+            continue
+        rank = q * total
+        prev_bound, prev_count = 0.0, 0.0
+        for bound, count in buckets:
+            if count >= rank:
+                if bound == float("inf"):
+                    value = prev_bound
+                else:
+                    span = count - prev_count
+                    frac = (rank - prev_count) / span if span else 1.0
+                    value = prev_bound + (bound - prev_bound) * frac
+                out[key] = round(value * 1000, 3)
+                break
+            prev_bound, prev_count = bound, count
+    return out
+
+
+async def _bench(args) -> dict:
+    data = SyntheticNewsdata(
+        args.cycles,
+        args.pages,
+        args.page_size,
+        args.dup_ratio,
+        {
+            "en": 1 - args.ru_share - args.other_share,
+            "ru": args.ru_share,
+            "de": args.other_share,
+        },
+    )
+    server = StandInServer(data)
+    runner, port = await server.start()
+    cfg = _config(args, port)
+    redis_client = None
+    if not args.redis_url:
+        from fakeredis.aioredis import FakeRedis
+
+        redis_client = FakeRedis()
+    bot = FakeBot(args.sink_latency)
+    stop = asyncio.Event()
+
+    def handled() -> float:
+        # items shed by the buffer never reach normalization
+        return _counter("newsbot_items_total", stage="normalize", direction="out") + _counter(
+            "newsbot_items_dropped_total", reason="shed"
+        )
+
+    handled_before = handled()
+
+    async def watch() -> None:
+        await server.exhausted.wait()
+        while handled() - handled_before < server.served:
+            await asyncio.sleep(0.01)
+        stop.set()
+
+    started = time.perf_counter()
+    watcher = asyncio.create_task(watch())
+    try:
+        await run(cfg, redis_client=redis_client, bot=bot, stop=stop)
+    finally:
+        watcher.cancel()
+        await runner.cleanup()
+    elapsed = time.perf_counter() - started
+
+    stages = {
+        stage: histogram_quantiles("newsbot_stage_seconds", {"stage": stage})
+        for stage in ("normalize", "prepare", "dedup", "score", "publish")
+    }
+    stages["loop_lag"] = histogram_quantiles("newsbot_event_loop_lag_seconds", {})
+    stages["provider_request"] = histogram_quantiles(
+        "newsbot_provider_request_seconds", {"provider": "newsdata"}
+    )
+    stages["provider_poll"] = histogram_quantiles(
+        "newsbot_provider_poll_seconds", {"provider": "newsdata"}
+    )
+    stages["telegram_wait"] = histogram_quantiles("newsbot_publish_seconds", {"phase": "wait"})
+    dropped = {
+        reason: _counter("newsbot_items_dropped_total", reason=reason)
+        for reason in ("duplicate", "inflight", "below_threshold", "near_duplicate", "shed")
+    }
+    return {
+        "items": server.served,
+        "elapsed_s": round(elapsed, 3),
+        "items_per_s": round(server.served / elapsed, 1),
+        "published": _counter("newsbot_items_total", stage="publish", direction="out"),
+        "telegram_messages": bot.messages,
+        "dropped": dropped,
+        "stages": stages,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--cycles", type=int, default=20)
+    ap.add_argument("--pages", type=int, default=5)
+    ap.add_argument("--page-size", type=int, default=50)
+    ap.add_argument("--dup-ratio", type=float, default=0.3)
+    ap.add_argument("--ru-share", type=float, default=0.2)
+    ap.add_argument("--other-share", type=float, default=0.05, help="languages that get filtered")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--queue-size", type=int, default=100)
+    ap.add_argument(
+        "--buffer-items", type=int, default=1_000_000, help="0 = blocking queue, no shedding"
+    )
+    ap.add_argument("--cache-size", type=int, default=20_000)
+    ap.add_argument("--redis-url", default=None, help="use a real Redis instead of fakeredis")
+    ap.add_argument("--sink-latency", type=float, default=0.0, help="seconds per Telegram call")
+    ap.add_argument("--telegram-rate", type=int, default=1_000_000, help="messages per minute")
+    ap.add_argument("--digest-threshold", type=int, default=0)
+    ap.add_argument("--cpu-executor", choices=("none", "thread", "process"), default="none")
+    ap.add_argument("--cpu-workers", type=int, default=0, help="pool size (default: CPUs)")
+    ap.add_argument("--tracemalloc", action="store_true", help="report peak Python heap (slower)")
+    ap.add_argument("--out", type=Path, default=None, help="JSON output path")
+    args = ap.parse_args()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    result = asyncio.run(_bench(args))
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["memory"] = {"max_rss_mb": round(max_rss_kb / 1024, 1)}
+    if args.tracemalloc:
+        result["memory"]["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    commit = _commit()
+    params = {k: v for k, v in vars(args).items() if k != "out"}
+    result = {"benchmark": "pipeline", "commit": commit, "params": params, **result}
+
+    out = args.out or Path("benchmarks/results") / f"pipeline-{commit or 'local'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, default=str))
+    print(json.dumps(result, indent=2, default=str))
+    print(f"saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
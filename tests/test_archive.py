@@ -0,0 +1,171 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.core.archive import COLUMNS, ArchiveSink, schema
+from app.core.models import NormalizedItem
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def copy_records_to_table(self, table, records, columns):
+        assert columns == COLUMNS
+        if self.pool.delay:
+            await asyncio.sleep(self.pool.delay)
+        if self.pool.failures:
+            self.pool.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.pool.copies.append((table, list(records)))
+
+    async def execute(self, statement):
+        self.pool.statements.append(statement)
+
+
+class _Acquire:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        return FakeConnection(self.pool)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    """Stand-in for :class:`asyncpg.Pool` recording COPY calls."""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.copies = []
+        self.statements = []
+
+    def acquire(self):
+        return _Acquire(self)
+
+
+def _items(n, start=0):
+    return [
+        NormalizedItem(
+            external_id=str(i),
+            source="src",
+            title=f"BTC story {i}",
+            url=f"https://example.com/{i}",
+            published_at=datetime(2024, 5, 1, tzinfo=timezone.utc),
+            tickers=["BTC"],
+            keywords={"etf": 1.0},
+        )
+        for i in range(start, start + n)
+    ]
+
+
+def test_schema_indexes_published_at_source_and_tickers():
+    ddl = "\n".join(schema("news_items"))
+    assert "news_items (published_at)" in ddl
+    assert "news_items (source, published_at)" in ddl
+    assert "USING gin (tickers)" in ddl
+
+
+def test_flush_is_size_triggered():
+    pool = FakePool()
+
+    async def routine():
+        sink = ArchiveSink(pool, batch_size=3, flush_interval_s=60)
+        sink.start()
+        sink.submit(_items(7), [1.0] * 7)
+        await asyncio.sleep(0.01)
+        flushed = [len(records) for _, records in pool.copies]
+        await sink.close()
+        return flushed, sink.written
+
+    flushed, written = asyncio.run(routine())
+    # two full batches go out at once, the remainder waits for the timer or close
+    assert flushed == [3, 3]
+    assert written == 7
+    record = pool.copies[0][1][0]
+    assert record[COLUMNS.index("tickers")] == ["BTC"]
+    assert record[COLUMNS.index("keywords")] == '{"etf":1.0}'
+    assert record[COLUMNS.index("score")] == 1.0
+
+
+def test_flush_is_time_triggered():
+    pool = FakePool()
+
+    async def routine():
+        sink = ArchiveSink(pool, batch_size=100, flush_interval_s=0.02)
+        sink.start()
+        sink.submit(_items(2))
+        await asyncio.sleep(0.1)
+        copied = sum(len(r) for _, r in pool.copies)
+        await sink.close()
+        return copied
+
+    assert asyncio.run(routine()) == 2
+
+
+def test_slow_database_never_blocks_submit_and_drops_oldest():
+    pool = FakePool(delay=0.05)
+
+    async def routine():
+        sink = ArchiveSink(pool, batch_size=2, flush_interval_s=60, max_pending=4)
+        sink.start()
+        sink.submit(_items(2))
+        await asyncio.sleep(0)  # writer takes the first batch and stalls
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i in range(3):
+            sink.submit(_items(2, start=10 + 2 * i))
+        elapsed = loop.time() - started
+        await sink.close()
+        return elapsed, sink
+
+    elapsed, sink = asyncio.run(routine())
+    assert elapsed < 0.01
+    assert sink.dropped == 2
+    ids = [r[0] for _, records in pool.copies for r in records]
+    assert ids == ["0", "1", "12", "13", "14", "15"]
+
+
+def test_failed_copy_is_retried():
+    pool = FakePool(failures=1)
+
+    async def routine():
+        sink = ArchiveSink(pool, batch_size=2, flush_interval_s=60, retry_delay_s=0.01)
+        sink.start()
+        sink.submit(_items(2))
+        await asyncio.sleep(0.05)
+        await sink.close()
+        return sink
+
+    sink = asyncio.run(routine())
+    assert [r[0] for r in pool.copies[0][1]] == ["0", "1"]
+    assert sink.written == 2 and sink.dropped == 0
+
+
+def test_open_archive_closes_pool_when_schema_fails(monkeypatch):
+    import asyncpg
+    import pytest
+
+    from app.core.config import ArchiveSettings
+    from app.services.ingestor import _open_archive
+
+    class BrokenPool(FakePool):
+        closed = False
+
+        def acquire(self):
+            raise ConnectionError("permission denied for schema")
+
+        async def close(self):
+            self.closed = True
+
+    pool = BrokenPool()
+
+    async def create_pool(dsn, **kwargs):
+        return pool
+
+    monkeypatch.setattr(asyncpg, "create_pool", create_pool)
+    with pytest.raises(ConnectionError):
+        asyncio.run(_open_archive(ArchiveSettings(dsn="postgresql://unused")))
+    assert pool.closed
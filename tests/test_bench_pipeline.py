@@ -0,0 +1,35 @@
+"""Smoke test for the end-to-end pipeline benchmark.
+
+Runs the harness for a couple of tiny cycles in a fresh interpreter, so a
+shutdown hang or a broken option shows up here rather than as a benchmark
+that never reports.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_bench_pipeline_runs_to_completion(tmp_path):
+    out = tmp_path / "pipeline.json"
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_pipeline",
+            "--cycles", "3",
+            "--pages", "2",
+            "--page-size", "10",
+            "--workers", "2",
+            "--out", str(out),
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        timeout=60,
+    )
+    result = json.loads(out.read_text())
+    assert result["items"] == 60
+    assert result["published"] > 0
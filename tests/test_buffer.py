@@ -0,0 +1,59 @@
+import asyncio
+
+from app.core.buffer import PriorityBuffer
+
+
+def _rank(raw):
+    return raw["score"]
+
+
+def test_overflow_evicts_lowest_then_oldest():
+    buf = PriorityBuffer(3, _rank, batch_size=10)
+    buf.put_nowait(("a", [{"id": 1, "score": 1.0}, {"id": 2, "score": 5.0}]))
+    evicted = buf.put_nowait(("a", [{"id": 3, "score": 1.0}, {"id": 4, "score": 3.0}]))
+    assert evicted == 1 and buf.dropped == 1
+
+    provider, raws = asyncio.run(buf.get())
+    assert provider == "a"
+    assert [r["id"] for r in raws] == [2, 4, 3]
+
+
+def test_get_returns_best_provider_first_in_batches():
+    buf = PriorityBuffer(10, _rank, batch_size=2)
+    buf.put_nowait(("a", [{"id": i, "score": 1.0} for i in range(3)]))
+    buf.put_nowait(("b", [{"id": 9, "score": 2.0}]))
+
+    async def routine():
+        return [await buf.get() for _ in range(3)]
+
+    batches = asyncio.run(routine())
+    assert [(p, [r["id"] for r in raws]) for p, raws in batches] == [
+        ("b", [9]),
+        ("a", [0, 1]),
+        ("a", [2]),
+    ]
+    assert len(buf) == 0
+
+
+def test_put_never_blocks_and_join_waits_for_consumers():
+    async def routine():
+        buf = PriorityBuffer(2, _rank)
+        handled = []
+
+        async def consume():
+            while True:
+                provider, raws = await buf.get()
+                await asyncio.sleep(0.01)
+                handled.extend(r["id"] for r in raws)
+                buf.task_done()
+
+        consumer = asyncio.create_task(consume())
+        for i in range(5):
+            await buf.put(("a", [{"id": i, "score": float(i)}]))
+        await asyncio.wait_for(buf.join(), 1)
+        consumer.cancel()
+        return handled, buf.dropped
+
+    handled, dropped = asyncio.run(routine())
+    assert len(handled) + dropped == 5
+    assert 4 in handled
@@ -0,0 +1,112 @@
+import asyncio
+
+import orjson
+
+from app.core import capture as capture_mod
+from app.core.capture import INDEX_ENTRY, CaptureLog, CaptureReader
+
+
+def _page(n):
+    return orjson.dumps({"status": "success", "results": [{"article_id": str(n)}] * 5})
+
+
+def test_capture_round_trip_and_time_range(tmp_path):
+    async def routine():
+        log = CaptureLog(tmp_path, max_segment_age_s=100)
+        log.start()
+        for n in range(10):
+            log.record("newsdata", _page(n), captured_at=1000.0 + n * 30)
+        log.record("other", _page(99), captured_at=1005.0)
+        await log.close()
+
+    asyncio.run(routine())
+    reader = CaptureReader(tmp_path)
+    assert reader.providers() == ["newsdata", "other"]
+    # 30s apart with 100s segments: rotation after every fourth page
+    assert len(list((tmp_path / "newsdata").glob("*.seg"))) == 3
+
+    everything = list(reader.read("newsdata"))
+    assert [ts for ts, _ in everything] == [1000.0 + n * 30 for n in range(10)]
+    assert everything[3][1] == _page(3)
+
+    window = list(reader.read("newsdata", since=1100.0, until=1200.0))
+    assert [ts for ts, _ in window] == [1120.0, 1150.0, 1180.0]
+
+
+def test_capture_rotates_by_size(tmp_path):
+    async def routine():
+        log = CaptureLog(tmp_path, max_segment_bytes=1)
+        log.start()
+        for n in range(3):
+            log.record("newsdata", _page(n), captured_at=1000.0 + n)
+        await log.close()
+
+    asyncio.run(routine())
+    segments = sorted((tmp_path / "newsdata").glob("*.seg"))
+    assert len(segments) == 3
+    index = segments[0].with_suffix(".idx").read_bytes()
+    assert len(index) == INDEX_ENTRY.size
+
+
+def test_record_never_waits_and_counts_overflow(tmp_path):
+    async def routine():
+        log = CaptureLog(tmp_path, queue_size=2)
+        for n in range(5):
+            log.record("newsdata", _page(n))
+        assert len(log) == 2
+        log.start()
+        await log.close()
+        return log.dropped
+
+    assert asyncio.run(routine()) == 3
+    assert len(list(CaptureReader(tmp_path).read("newsdata"))) == 2
+
+
+def test_dump_writes_one_page_per_line(tmp_path, capsysbinary):
+    async def routine():
+        log = CaptureLog(tmp_path)
+        log.start()
+        log.record("newsdata", b'{\n "results": []\n}', captured_at=1.0)
+        await log.close()
+
+    asyncio.run(routine())
+    capture_mod.main([str(tmp_path)])
+    assert capsysbinary.readouterr().out == b'{"results":[]}\n'
+
+
+def test_provider_captures_every_fetched_page(tmp_path):
+    import aiohttp
+    from aiohttp import web
+
+    from app.providers.newsdata import NewsdataProvider
+
+    async def handler(request):
+        if request.query.get("page") == "2":
+            return web.json_response({"results": [{"link": "u2"}]})
+        return web.json_response({"results": [{"link": "u1"}], "nextPage": "2"})
+
+    async def routine():
+        app = web.Application()
+        app.router.add_get("/api/1/crypto", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        log = CaptureLog(tmp_path)
+        log.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                provider = NewsdataProvider(
+                    session,
+                    {"api_key": "k", "base_url": f"http://127.0.0.1:{port}/api/1"},
+                    capture=log,
+                )
+                await provider.poll()
+        finally:
+            await runner.cleanup()
+            await log.close()
+
+    asyncio.run(routine())
+    pages = [body for _, body in CaptureReader(tmp_path).read("newsdata")]
+    assert len(pages) == 2 and b'"nextPage": "2"' in pages[0]
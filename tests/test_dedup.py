@@ -26,3 +26,118 @@ def test_dedup_prevents_duplicates():
         assert await dedup.is_duplicate(fp)
 
     asyncio.run(routine())
+
+
+def test_dedup_batch_filter_and_mark():
+    fake = FakeRedis()
+    dedup.init(client=fake)
+
+    async def routine():
+        await dedup.mark_seen("a")
+        assert await dedup.filter_new(["a", "b", "c", "b"]) == [False, True, True, False]
+        await dedup.mark_seen_many(["b", "c"])
+        assert await dedup.filter_new(["a", "b", "c"]) == [False, False, False]
+        assert await dedup.check_and_mark(["c", "d", "d"]) == [False, True, False]
+        assert await dedup.is_duplicate("d")
+        assert await dedup.filter_new([]) == []
+
+    asyncio.run(routine())
+
+
+def test_local_cache_cuts_redis_calls_on_replay():
+    fake = FakeRedis()
+    calls = []
+    orig_zmscore = fake.zmscore
+
+    async def counting_zmscore(key, members):
+        calls.append(len(members))
+        return await orig_zmscore(key, members)
+
+    fake.zmscore = counting_zmscore
+    batch = [f"fp{i}" for i in range(50)]
+
+    async def replay():
+        await dedup.mark_seen_many(batch[:40])
+        for _ in range(5):
+            fresh = await dedup.filter_new(batch)
+            await dedup.mark_seen_many(fp for fp, new in zip(batch, fresh) if new)
+
+    dedup.init(client=fake)
+    asyncio.run(replay())
+    uncached = list(calls)
+    assert uncached == [50] * 5
+
+    calls.clear()
+    fake = FakeRedis()
+    fake.zmscore = counting_zmscore
+    dedup.init(client=fake, cache_size=1000, trust_local=True)
+    asyncio.run(fake.zadd(dedup._key(), {fp: dedup._now() for fp in batch[:40]}))
+    assert asyncio.run(dedup.warm()) == 40
+    asyncio.run(replay())
+    # warmed and sole writer: every lookup is answered in-process
+    assert calls == []
+    stats = dedup.cache_stats()
+    assert stats["hits"] == 40 + 4 * 50
+    assert stats["negatives"] == 10
+
+
+def test_local_cache_without_trusted_negatives():
+    fake = FakeRedis()
+    dedup.init(client=fake, cache_size=100, trust_local=False)
+
+    async def routine():
+        assert await dedup.filter_new(["a", "b"]) == [True, True]
+        await dedup.mark_seen_many(["a"])
+        assert await dedup.filter_new(["a", "b"]) == [False, True]
+        assert dedup.cache_stats()["misses"] == 3
+
+    asyncio.run(routine())
+
+
+def test_sliding_window_expires_and_prunes(monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(dedup, "_now", lambda: clock[0])
+
+    async def routine():
+        await dedup.mark_seen_many(["a", "b"])
+        clock[0] += 30
+        await dedup.mark_seen_many(["b", "c"])
+        # "b" keeps its first-seen time
+        assert await fake.zscore(dedup.KEY, "b") == 1_000_000.0
+        clock[0] += 45
+        assert await dedup.filter_new(["a", "b", "c", "d"]) == [False, False, False, True]
+        clock[0] += 20  # a/b are 95s old, c is 65s old
+        assert await dedup.filter_new(["a", "b", "c"]) == [True, True, False]
+        assert await dedup.check_and_mark(["a", "c"]) == [True, False]
+        members = {m.decode() for m, _ in await fake.zrange(dedup.KEY, 0, -1, withscores=True)}
+        assert members == {"a", "c"}
+        assert 0 < await fake.ttl(dedup.KEY) <= 90
+
+    for cache_size in (0, 100):
+        fake = FakeRedis()
+        clock[0] = 1_000_000.0
+        dedup.init(client=fake, cache_size=cache_size, window_s=90)
+        asyncio.run(dedup.warm())
+        asyncio.run(routine())
+
+
+def test_bloom_generations_rotate():
+    cache = dedup.LocalCache(capacity=100, trust_negatives=True, window_s=60)
+    cache.warmed = True
+    cache.rotate(0)
+    cache.add("a", 0)
+    cache.rotate(70)
+    cache.add("b", 70)
+    assert cache.lookup("a", cutoff=100) is None  # still in previous generation
+    cache.rotate(130)
+    assert cache.lookup("a", cutoff=100) is False
+    assert cache.lookup("b", cutoff=100) is None
+
+
+def test_local_cache_does_not_trust_negatives_by_default():
+    fake = FakeRedis()
+    dedup.init(client=fake, cache_size=100)
+    asyncio.run(dedup.warm())
+    # another instance sharing the set marked "a" behind this one's back
+    asyncio.run(fake.zadd(dedup._key(), {"a": dedup._now()}))
+    assert asyncio.run(dedup.filter_new(["a", "b"])) == [False, True]
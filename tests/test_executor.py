@@ -0,0 +1,104 @@
+import asyncio
+import pickle
+from datetime import datetime, timezone
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+from zoneinfo import ZoneInfo
+
+from app.core import dedup, metrics
+from app.core.config import Config
+from app.services.executor import CpuStage
+from app.services.ingestor import process_batch
+
+
+class FakePublisher:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, item, tz, score=0.0):
+        self.sent.append((item.title, score))
+
+
+def _cfg():
+    return Config.model_validate(
+        {
+            "telegram": {"bot_token": "t", "channel_id": "@chan"},
+            "providers": {"newsdata": {"api_key": "k"}},
+            "filters": {"languages": ["en"], "near_dup_window_h": 6},
+            "scoring": {"threshold": 0.1},
+            "runtime": {"redis_url": "redis://unused"},
+        }
+    )
+
+
+def _raws():
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "article_id": str(i),
+            "title": f"BTC rallies after ETF approval number {i} lifts the whole market",
+            "link": f"https://example.com/{i}",
+            "pubDate": now,
+            "language": "en",
+        }
+        for i in range(5)
+    ] + [
+        {
+            "article_id": "de",
+            "title": "Bitcoin steigt nach der ETF Zulassung deutlich an",
+            "link": "https://example.com/de",
+            "pubDate": now,
+            "language": "de",
+        }
+    ]
+
+
+def _publish(cfg, prepare=None):
+    dedup.init(client=FakeRedis())
+    pub = FakePublisher()
+    count = asyncio.run(
+        process_batch(_raws(), cfg, pub, ZoneInfo("UTC"), prepare=prepare)
+    )
+    return count, sorted(title for title, _ in pub.sent)
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_cpu_stage_publishes_like_the_inline_path(kind):
+    cfg = _cfg()
+    expected = _publish(cfg)
+    stage = CpuStage(cfg, kind, workers=2)
+    try:
+        assert _publish(cfg, lambda raws: stage.prepare("newsdata", raws)) == expected
+        prepared = asyncio.run(stage.prepare("newsdata", _raws()))
+    finally:
+        stage.close()
+    assert expected[0] == 5
+    # results cross the process boundary, so they must pickle
+    assert pickle.loads(pickle.dumps(prepared)).fps == prepared.fps
+    assert prepared.scores[-1] == 0.0 and prepared.near_dup[-1] is None
+    assert prepared.near_dup[0] is not None
+
+
+def test_loop_lag_is_recorded():
+    from prometheus_client import REGISTRY
+
+    def count():
+        return REGISTRY.get_sample_value("newsbot_event_loop_lag_seconds_count") or 0
+
+    async def routine():
+        watch = asyncio.create_task(metrics.watch_loop_lag(0.01))
+        await asyncio.sleep(0.02)
+        # a blocking call delays the watcher's wake-up
+        import time
+
+        time.sleep(0.05)
+        await asyncio.sleep(0.03)
+        watch.cancel()
+
+    before = count()
+    asyncio.run(routine())
+    assert count() - before >= 2
+    assert REGISTRY.get_sample_value(
+        "newsbot_event_loop_lag_seconds_bucket", {"le": "0.025"}
+    ) < count()
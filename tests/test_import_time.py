@@ -0,0 +1,41 @@
+"""Cold-start benchmark for the ingestor entry point.
+
+Runs in fresh interpreters so modules imported by other tests do not hide
+regressions.
+"""
+import statistics
+import subprocess
+import sys
+
+# only loaded once something is actually sent, fetched, scored or archived
+LAZY_MODULES = ("telegram", "aiohttp", "dateutil", "asyncpg", "numpy")
+# about twice the ~0.3-0.37s measured on a dev machine, so a regression
+# such as an eager heavy import fails it
+IMPORT_BUDGET_S = 0.75
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import app.services.ingestor
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(m for m in {mods!r} if m in sys.modules))
+"""
+
+
+def _probe():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(mods=LAZY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    return float(out[0]), [m for m in out[1].split(",") if m] if len(out) > 1 else []
+
+
+def test_ingestor_import_is_lazy_and_fast():
+    runs = [_probe() for _ in range(3)]
+    assert runs[0][1] == [], f"eagerly imported: {runs[0][1]}"
+    elapsed = statistics.median(t for t, _ in runs)
+    print(f"import app.services.ingestor: {elapsed * 1000:.0f} ms (median of 3)")
+    assert elapsed < IMPORT_BUDGET_S
@@ -15,7 +15,7 @@ class FakePublisher:
     def __init__(self):
         self.sent = []
 
-    async def send(self, item, tz):
+    async def send(self, item, tz, score=0.0):
         self.sent.append(item)
 
 def test_pipeline_dedup_once():
@@ -53,3 +53,303 @@ def test_pipeline_dedup_once():
     asyncio.run(process(raw))
     asyncio.run(process(raw))
     assert len(pub.sent) == 1
+
+
+def test_process_batch_single_dedup_round_trips():
+    from app.services.ingestor import process_batch
+
+    fake = FakeRedis()
+    dedup.init(client=fake)
+    cfg = SimpleNamespace(
+        filters=FiltersSettings(languages=["en"], exclude_domains=[]),
+        scoring=ScoringSettings(threshold=0.1),
+    )
+    now = datetime.now(timezone.utc).isoformat()
+    raws = [
+        {
+            "article_id": str(i),
+            "title": f"BTC rallies after ETF approval number {i}",
+            "link": f"https://example.com/{i % 3}",
+            "pubDate": now,
+            "language": "en",
+        }
+        for i in range(6)
+    ]
+    pub = FakePublisher()
+    calls = []
+    orig_zmscore = fake.zmscore
+
+    async def counting_zmscore(*args, **kwargs):
+        calls.append(args)
+        return await orig_zmscore(*args, **kwargs)
+
+    fake.zmscore = counting_zmscore
+
+    assert asyncio.run(process_batch(raws, cfg, pub, ZoneInfo("UTC"))) == 3
+    assert asyncio.run(process_batch(raws, cfg, pub, ZoneInfo("UTC"))) == 0
+    assert len(pub.sent) == 3
+    assert len(calls) == 2
+
+
+def test_process_batch_skips_near_duplicate_rewrites():
+    from app.core.neardup import NearDuplicateIndex
+    from app.services.ingestor import process_batch
+
+    dedup.init(client=FakeRedis())
+    cfg = SimpleNamespace(
+        filters=FiltersSettings(languages=["en"], exclude_domains=[]),
+        scoring=ScoringSettings(threshold=0.1),
+    )
+    now = datetime.now(timezone.utc).isoformat()
+    titles = [
+        "SEC approves first spot Bitcoin ETFs in landmark decision",
+        "Landmark: SEC approves first spot Bitcoin ETFs",
+        "Binance lists new token after community vote",
+    ]
+    raws = [
+        {"title": t, "link": f"https://site{i}.com/a", "pubDate": now, "language": "en"}
+        for i, t in enumerate(titles)
+    ]
+    pub = FakePublisher()
+    sent = asyncio.run(process_batch(raws, cfg, pub, ZoneInfo("UTC"), NearDuplicateIndex()))
+    assert sent == 2
+    assert [n.title for n in pub.sent] == [titles[0], titles[2]]
+
+
+def test_concurrent_workers_publish_each_item_once():
+    from app.services.ingestor import process_batch
+
+    dedup.init(client=FakeRedis())
+    cfg = SimpleNamespace(
+        filters=FiltersSettings(languages=["en"], exclude_domains=[]),
+        scoring=ScoringSettings(threshold=0.1),
+    )
+    now = datetime.now(timezone.utc).isoformat()
+    raws = [
+        {
+            "title": f"BTC rallies after ETF approval number {i}",
+            "link": f"https://example.com/{i}",
+            "pubDate": now,
+            "language": "en",
+        }
+        for i in range(5)
+    ]
+
+    class SlowPublisher(FakePublisher):
+        async def send(self, item, tz, score=0.0):
+            await asyncio.sleep(0.01)
+            await super().send(item, tz, score)
+
+    pub = SlowPublisher()
+    inflight: set[str] = set()
+
+    async def routine():
+        return await asyncio.gather(
+            *(process_batch(raws, cfg, pub, ZoneInfo("UTC"), inflight=inflight) for _ in range(3))
+        )
+
+    assert sum(asyncio.run(routine())) == 5
+    assert len(pub.sent) == 5
+    assert inflight == set()
+
+
+def test_run_pipeline_worker_pool_drains_on_stop():
+    from app.services.ingestor import run_pipeline
+
+    handled = []
+    active = [0, 0]
+
+    async def handle(batch):
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+        handled.append(batch)
+
+    async def routine():
+        stop = asyncio.Event()
+
+        async def batches():
+            for i in range(8):
+                yield [i]
+            stop.set()
+            await asyncio.sleep(3600)
+
+        await run_pipeline(batches(), handle, workers=4, queue_size=2, stop=stop)
+
+    asyncio.run(routine())
+    assert sorted(b[0] for b in handled) == list(range(8))
+    assert active[1] == 4
+
+
+def test_run_once_polls_publishes_and_exits():
+    from aiohttp import web
+
+    from app.core.config import Config
+    from app.services.ingestor import run
+
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    requests = []
+
+    async def handler(request):
+        requests.append(dict(request.query))
+        return web.json_response(
+            {
+                "results": [
+                    {
+                        "article_id": "1",
+                        "title": "BTC rallies after ETF approval lifts markets",
+                        "link": "https://example.com/once",
+                        "pubDate": now,
+                        "language": "en",
+                    }
+                ]
+            }
+        )
+
+    class FakeBot:
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, chat_id, text, parse_mode=None):
+            self.sent.append(text)
+
+    async def routine():
+        app = web.Application()
+        app.router.add_get("/api/1/crypto", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        cfg = Config.model_validate(
+            {
+                "telegram": {"bot_token": "t", "channel_id": "@chan"},
+                "providers": {
+                    "newsdata": {
+                        "api_key": "k",
+                        "base_url": f"http://127.0.0.1:{port}/api/1",
+                        "incremental": False,
+                    }
+                },
+                "filters": {"languages": ["en"]},
+                "scoring": {"threshold": 0.1},
+                "runtime": {"redis_url": "redis://unused", "tz": "UTC"},
+            }
+        )
+        bot = FakeBot()
+        try:
+            await asyncio.wait_for(run(cfg, redis_client=FakeRedis(), bot=bot, once=True), 10)
+        finally:
+            await runner.cleanup()
+        return bot
+
+    bot = asyncio.run(routine())
+    assert len(requests) == 1
+    assert len(bot.sent) == 1 and "ETF approval" in bot.sent[0]
+
+
+def test_run_releases_resources_when_startup_fails(monkeypatch, tmp_path):
+    import pytest
+
+    from app.core.config import Config
+    from app.services import ingestor
+
+    profilers = []
+    start_profiler = ingestor._start_profiler
+
+    def capture_profiler(settings):
+        profilers.append(start_profiler(settings))
+        return profilers[-1]
+
+    async def broken_archive(settings):
+        raise RuntimeError("archive unavailable")
+
+    monkeypatch.setattr(ingestor, "_start_profiler", capture_profiler)
+    monkeypatch.setattr(ingestor, "_open_archive", broken_archive)
+    cfg = Config.model_validate(
+        {
+            "telegram": {"bot_token": "t", "channel_id": "@chan"},
+            "providers": {"newsdata": {"api_key": "k"}},
+            "filters": {},
+            "scoring": {},
+            "runtime": {"redis_url": "redis://unused", "tz": "UTC", "loop_lag_interval_s": 0.01},
+            "profiler": {"dir": str(tmp_path), "signal": None, "start_on_launch": True},
+        }
+    )
+
+    async def routine():
+        with pytest.raises(RuntimeError):
+            await ingestor.run(cfg, redis_client=FakeRedis(), once=True)
+        await asyncio.sleep(0)
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(routine()) == set()
+    assert len(profilers) == 1 and not profilers[0].running
+
+
+def test_run_once_drains_past_drain_timeout():
+    from aiohttp import web
+
+    from app.core.config import Config
+    from app.services.ingestor import run
+
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    titles = ["BTC rallies after ETF approval", "ETH jumps as upgrade ships", "SOL ETF filing lifts price"]
+
+    async def handler(request):
+        return web.json_response(
+            {
+                "results": [
+                    {
+                        "article_id": str(i),
+                        "title": title,
+                        "link": f"https://example.com/drain/{i}",
+                        "pubDate": now,
+                        "language": "en",
+                    }
+                    for i, title in enumerate(titles)
+                ]
+            }
+        )
+
+    class SlowBot:
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, chat_id, text, parse_mode=None):
+            await asyncio.sleep(0.1)
+            self.sent.append(text)
+
+    async def routine():
+        app = web.Application()
+        app.router.add_get("/api/1/crypto", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        cfg = Config.model_validate(
+            {
+                "telegram": {"bot_token": "t", "channel_id": "@chan"},
+                "providers": {
+                    "newsdata": {
+                        "api_key": "k",
+                        "base_url": f"http://127.0.0.1:{port}/api/1",
+                        "incremental": False,
+                    }
+                },
+                "filters": {"languages": ["en"]},
+                "scoring": {"threshold": 0.1},
+                "runtime": {"redis_url": "redis://unused", "tz": "UTC", "drain_timeout_s": 0.01},
+            }
+        )
+        bot = SlowBot()
+        try:
+            await asyncio.wait_for(run(cfg, redis_client=FakeRedis(), bot=bot, once=True), 10)
+        finally:
+            await runner.cleanup()
+        return bot
+
+    bot = asyncio.run(routine())
+    assert len(bot.sent) == 3
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from fakeredis.aioredis import FakeRedis
+from zoneinfo import ZoneInfo
+
+from app.core import dedup
+from app.core.config import FiltersSettings, ScoringSettings
+from app.core.latency import FETCHED_AT, ItemTimeline, LatencyTracker, stamp_fetched
+from app.core.profiler import SamplingProfiler
+from app.services.ingestor import process_batch
+
+
+def _timeline(url, fetched, sent):
+    stage = fetched + 1
+    return ItemTimeline(url, fetched - 60, fetched, stage, stage, stage, stage, sent)
+
+
+def test_tracker_percentiles_slowest_and_report(caplog):
+    clock = [0.0]
+    tracker = LatencyTracker(window=100, report_interval_s=10, slowest=2, clock=lambda: clock[0])
+    tracker.record(_timeline(f"u{i}", 1000.0, 1000.0 + i) for i in range(1, 101))
+    pct = tracker.percentiles()
+    assert pct["fetched_to_sent"] == {"p50": 50.0, "p90": 90.0, "p99": 99.0}
+    assert pct["published_to_sent"]["p50"] == 110.0
+    assert [t.url for t in tracker.slowest()] == ["u100", "u99"]
+
+    tracker.record([_timeline("u101", 1000.0, 1200.0)])
+    assert len(tracker) == 100
+    with caplog.at_level(logging.INFO, logger="app.core.latency"):
+        clock[0] = 10
+        tracker.record([])
+    assert "slow item u101" in caplog.text
+
+
+def test_process_batch_records_stage_timestamps():
+    dedup.init(client=FakeRedis())
+    cfg = SimpleNamespace(
+        filters=FiltersSettings(languages=["en"], exclude_domains=[]),
+        scoring=ScoringSettings(threshold=0.1),
+    )
+    published = datetime.now(timezone.utc) - timedelta(minutes=5)
+    raws = [
+        {
+            "title": f"BTC rallies after ETF approval number {i}",
+            "link": f"https://example.com/{i}",
+            "pubDate": published,
+            "language": "en",
+        }
+        for i in range(3)
+    ]
+    # dropped by normalization; the other items keep their fetch times
+    raws.insert(1, dict(raws[0], link=""))
+    fetched_at = time.time() - 2
+    stamp_fetched(raws, fetched_at)
+    assert raws[0][FETCHED_AT] == fetched_at
+
+    class SlowPublisher:
+        async def send(self, item, tz, score=0.0):
+            await asyncio.sleep(0.05)
+
+    tracker = LatencyTracker(report_interval_s=0)
+    asyncio.run(process_batch(raws, cfg, SlowPublisher(), ZoneInfo("UTC"), latency=tracker))
+    assert len(tracker) == 3
+    assert all(t.fetched == fetched_at for t in tracker.timelines)
+    t = tracker.timelines[0]
+    assert t.fetched < t.normalized <= t.deduped <= t.scored <= t.enqueued < t.sent
+    spans = t.spans()
+    assert spans["publish_wait"] >= 0.05
+    assert 300 <= spans["published_to_sent"] < 310
+    assert 2 <= spans["fetched_to_sent"] < 5
+
+
+def _busy_hot_path(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def test_sampling_profiler_dumps_folded_stacks(tmp_path):
+    profiler = SamplingProfiler(tmp_path, interval_s=0.001)
+    profiler.toggle()
+    assert profiler.running
+    _busy_hot_path(0.2)
+    profiler.toggle()
+    assert not profiler.running
+    [path] = tmp_path.glob("profile-*.folded")
+    lines = path.read_text().splitlines()
+    assert profiler.samples > 10
+    hot = [line for line in lines if "_busy_hot_path" in line]
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in hot) > profiler.samples / 2
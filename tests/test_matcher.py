@@ -0,0 +1,33 @@
+from app.core.matcher import KeywordMatcher, default_matcher, tokenize
+
+
+def test_tokenize_word_boundaries():
+    assert tokenize("«BTC»—$eth, hard-fork_2 Ethé") == ["BTC", "$eth", "hard", "fork_2", "Ethé"]
+
+
+def test_matcher_tickers_aliases_cashtags_and_phrases():
+    matcher = KeywordMatcher(
+        tickers={"BTC": ["bitcoin"], "OP": ["optimism"], "SHIB": ["shiba inu"]},
+        keywords={"etf": 1.0, "spot etf": 1.5, "hard fork": 0.8},
+        case_sensitive=["OP"],
+    )
+    m = matcher.match("Spot ETF for Bitcoin; Shiba Inu hard-fork, an op-ed on $op and OP")
+    assert m.tickers == ["BTC", "OP", "SHIB"]
+    assert m.keywords == {"spot etf": 1.5, "etf": 1.0, "hard fork": 0.8}
+    assert matcher.match("an op-ed about ethics").tickers == []
+    assert matcher.match("Bitcoins everywhere").tickers == []
+
+
+def test_matcher_overlapping_phrases_via_failure_links():
+    matcher = KeywordMatcher(keywords={"sec approves spot etf": 3.0, "spot etf": 1.0})
+    assert matcher.match("SEC approves spot ETF").keywords == {
+        "sec approves spot etf": 3.0,
+        "spot etf": 1.0,
+    }
+    assert matcher.match("SEC approves spot bitcoin").keywords == {}
+
+
+def test_default_lexicon_loads():
+    m = default_matcher().match("Ethereum listing on Binance after Solana hack")
+    assert m.tickers == ["ETH", "SOL"]
+    assert {"listing", "hack"} <= set(m.keywords)
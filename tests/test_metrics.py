@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fakeredis.aioredis import FakeRedis
+from prometheus_client import REGISTRY
+from zoneinfo import ZoneInfo
+
+from app.core import dedup, metrics
+from app.core.config import FiltersSettings, ScoringSettings
+from app.services.ingestor import process_batch
+
+
+class FakePublisher:
+    async def send(self, item, tz, score=0.0):
+        pass
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_process_batch_records_stage_metrics():
+    dedup.init(client=FakeRedis())
+    cfg = SimpleNamespace(
+        filters=FiltersSettings(languages=["en"], exclude_domains=[]),
+        scoring=ScoringSettings(threshold=0.1),
+    )
+    now = datetime.now(timezone.utc).isoformat()
+    raws = [
+        {
+            "article_id": str(i),
+            "title": f"Bitcoin miners expand capacity in region {i}",
+            "link": f"https://example.com/{i}",
+            "pubDate": now,
+            "language": "en",
+        }
+        for i in range(3)
+    ]
+    before = {
+        "normalized": _sample("newsbot_items_total", stage="normalize", direction="out"),
+        "published": _sample("newsbot_items_total", stage="publish", direction="out"),
+        "duplicate": _sample("newsbot_items_dropped_total", reason="duplicate"),
+        "dedup_batches": _sample("newsbot_stage_seconds_count", stage="dedup"),
+    }
+
+    async def routine():
+        await process_batch(raws, cfg, FakePublisher(), ZoneInfo("UTC"))
+        await process_batch(raws, cfg, FakePublisher(), ZoneInfo("UTC"))
+
+    asyncio.run(routine())
+    assert _sample("newsbot_items_total", stage="normalize", direction="out") - before["normalized"] == 6
+    assert _sample("newsbot_items_total", stage="publish", direction="out") - before["published"] == 3
+    assert _sample("newsbot_items_dropped_total", reason="duplicate") - before["duplicate"] == 3
+    # one lookup and one write per batch
+    assert _sample("newsbot_stage_seconds_count", stage="dedup") - before["dedup_batches"] == 4
+
+
+def test_queue_depth_is_sampled_at_scrape_time():
+    depth = [0]
+    metrics.track_queue("test", lambda: depth[0])
+    depth[0] = 7
+    assert _sample("newsbot_queue_depth", queue="test") == 7
+
+
+def test_metrics_port_can_be_overridden_per_process(monkeypatch, tmp_path):
+    from app.services import ingestor
+
+    config = tmp_path / "config.yaml"
+    config.write_text(
+        "telegram: {bot_token: x, channel_id: '@chan'}\n"
+        "providers: {}\nfilters: {}\nscoring: {}\n"
+        "runtime: {redis_url: 'redis://unused', metrics_port: 9108}\n"
+    )
+    seen = []
+
+    async def fake_run(cfg, **kwargs):
+        seen.append(cfg.runtime)
+
+    monkeypatch.setattr(ingestor, "run", fake_run)
+    asyncio.run(ingestor.main(["--config", str(config), "--metrics-port", "9109"]))
+    asyncio.run(ingestor.main(["--config", str(config)]))
+    assert [r.metrics_port for r in seen] == [9109, 9108]
+    assert seen[0].metrics_host == "127.0.0.1"
@@ -0,0 +1,24 @@
+from app.core.neardup import NearDuplicateIndex
+
+
+def test_neardup_matches_rewrites_across_sources():
+    index = NearDuplicateIndex(window_s=3600)
+    index.add(
+        "a",
+        "SEC approves first spot Bitcoin ETFs in landmark decision",
+        "The U.S. Securities and Exchange Commission approved 11 spot bitcoin funds",
+        now=0,
+    )
+    assert index.query("Landmark: SEC Approves First Spot Bitcoin ETFs", now=10) == "a"
+    assert index.query("US SEC approves first spot bitcoin ETFs", now=10) == "a"
+    assert index.query("Ethereum developers schedule Dencun upgrade for March", now=10) is None
+    assert index.query("SEC delays decision on Ethereum ETF", now=10) is None
+
+
+def test_neardup_window_eviction_and_check_and_add():
+    index = NearDuplicateIndex(window_s=60)
+    assert index.check_and_add("a", "Hackers drain 100M from cross-chain bridge", now=0) is None
+    assert index.check_and_add("b", "Hackers drain $100M from cross-chain bridge", now=30) == "a"
+    assert len(index) == 1
+    assert index.query("Hackers drain 100M from cross-chain bridge", now=61) is None
+    assert len(index) == 0
@@ -1,4 +1,6 @@
 import asyncio
+from datetime import datetime, timezone
+
 import aiohttp
 from aiohttp import web
 
@@ -56,3 +58,212 @@ def test_newsdata_pagination():
     items = asyncio.run(inner())
     links = [i["link"] for i in items]
     assert links == ["u1", "u2"]
+
+
+def test_newsdata_incremental_polling_stops_on_old_page():
+    from datetime import timedelta
+
+    from fakeredis.aioredis import FakeRedis
+
+    from app.providers.cursor import Cursor
+
+    now = datetime.now(timezone.utc)
+
+    def article(article_id, age_min):
+        return {
+            "article_id": article_id,
+            "pubDate": (now - timedelta(minutes=age_min)).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    async def inner():
+        requests = []
+        pages = {
+            None: {"results": [article("a3", 1), article("a2", 10)], "nextPage": "2"},
+            "2": {"results": [article("a1", 30)], "nextPage": "3"},
+            "3": {"results": [article("a0", 60)]},
+        }
+
+        async def handler(request):
+            requests.append(dict(request.query))
+            return web.json_response(pages[request.query.get("page")])
+
+        app = web.Application()
+        app.router.add_get("/api/1/crypto", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        config = {
+            "api_key": "k",
+            "base_url": f"http://127.0.0.1:{port}/api/1",
+            "query": "timeframe=90m",
+            "cursor_overlap_s": 120,
+        }
+        redis_client = FakeRedis()
+        try:
+            async with aiohttp.ClientSession() as session:
+                first = NewsdataProvider(session, config, cursor=Cursor(redis_client, "newsdata"))
+                items1 = await first.poll()
+                stats1 = dict(first.cycle_stats)
+                # a new item appears on top; a fresh process resumes from Redis
+                pages[None]["results"].insert(0, article("a4", 0))
+                second = NewsdataProvider(session, config, cursor=Cursor(redis_client, "newsdata"))
+                items2 = await second.poll()
+                stats2 = dict(second.cycle_stats)
+        finally:
+            await runner.cleanup()
+        return requests, items1, stats1, items2, stats2
+
+    requests, items1, stats1, items2, stats2 = asyncio.run(inner())
+    assert [i["article_id"] for i in items1] == ["a3", "a2", "a1", "a0"]
+    assert stats1["requests"] == 3 and stats1["bytes"] > 0
+    # known items are left to dedup; page 2 predates the watermark, so
+    # pagination stops there
+    assert [i["article_id"] for i in items2] == ["a4", "a3", "a2", "a1"]
+    assert stats2["requests"] == 2
+    assert requests[0]["timeframe"] == "90m"
+    assert requests[3]["timeframe"] == "3m"
+
+
+def test_newsdata_incremental_polling_retries_failed_publish():
+    from types import SimpleNamespace
+
+    from fakeredis.aioredis import FakeRedis
+    from zoneinfo import ZoneInfo
+
+    from app.core import dedup
+    from app.core.config import FiltersSettings, ScoringSettings
+    from app.providers.cursor import Cursor
+    from app.services.ingestor import process_batch
+
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    class FlakyPublisher:
+        def __init__(self):
+            self.calls = 0
+            self.sent = []
+
+        async def send(self, item, tz, score=0.0):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("telegram down")
+            self.sent.append(item)
+
+    async def handler(request):
+        return web.json_response(
+            {
+                "results": [
+                    {
+                        "article_id": "a1",
+                        "title": "BTC rallies after ETF approval lifts markets",
+                        "link": "https://example.com/retry",
+                        "pubDate": now,
+                        "language": "en",
+                    }
+                ]
+            }
+        )
+
+    async def inner():
+        app = web.Application()
+        app.router.add_get("/api/1/crypto", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        config = {
+            "api_key": "k",
+            "base_url": f"http://127.0.0.1:{port}/api/1",
+            "query": "timeframe=90m",
+        }
+        redis_client = FakeRedis()
+        dedup.init(client=redis_client)
+        cfg = SimpleNamespace(
+            filters=FiltersSettings(languages=["en"], exclude_domains=[]),
+            scoring=ScoringSettings(threshold=0.1),
+        )
+        pub = FlakyPublisher()
+        published = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                provider = NewsdataProvider(
+                    session, config, cursor=Cursor(redis_client, "newsdata")
+                )
+                for _ in range(3):
+                    raws = await provider.poll()
+                    try:
+                        published.append(
+                            await process_batch(raws, cfg, pub, ZoneInfo("UTC"))
+                        )
+                    except RuntimeError:
+                        published.append(None)
+        finally:
+            await runner.cleanup()
+        return pub, published
+
+    pub, published = asyncio.run(inner())
+    # the failed send is retried on the next poll, then dedup drops it
+    assert published == [None, 1, 0]
+    assert len(pub.sent) == 1
+
+
+def test_newsdata_queries_fan_out_concurrently_and_merge():
+    import time
+
+    async def inner():
+        requests = []
+        results = {
+            "etf": [{"article_id": "a1"}, {"article_id": "shared"}],
+            "hack": [{"article_id": "shared"}, {"article_id": "a2"}],
+        }
+
+        async def handler(request):
+            q = request.query["q"]
+            requests.append((q, request.query["size"]))
+            await asyncio.sleep(0.2)
+            if q == "broken":
+                return web.json_response({}, status=500)
+            return web.json_response({"results": results[q]})
+
+        app = web.Application()
+        app.router.add_get("/api/1/crypto", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        config = {
+            "api_key": "k",
+            "base_url": f"http://127.0.0.1:{port}/api/1",
+            "query": "q=ignored&size=50",
+            "poll_interval_s": 30,
+            "max_inflight": 3,
+            "queries": [
+                {"name": "etf", "query": "q=etf"},
+                {"name": "hack", "params": {"q": "hack", "size": 10}, "poll_interval_s": 300},
+                {"name": "broken", "query": "q=broken"},
+            ],
+        }
+        try:
+            async with aiohttp.ClientSession() as session:
+                provider = NewsdataProvider(session, config)
+                started = time.perf_counter()
+                items = await provider.poll()
+                elapsed = time.perf_counter() - started
+                stats = dict(provider.cycle_stats)
+                # hack is not due again yet; the others follow every cycle
+                due = [q["name"] for q in provider._due(time.monotonic())]
+        finally:
+            await runner.cleanup()
+        return requests, items, elapsed, stats, due, provider.poll_interval
+
+    requests, items, elapsed, stats, due, interval = asyncio.run(inner())
+    assert sorted(requests) == [("broken", "50"), ("etf", "50"), ("hack", "10")]
+    assert [i["article_id"] for i in items] == ["a1", "shared", "a2"]
+    # bounded by the slowest query, not the sum of all three
+    assert elapsed < 0.5
+    assert stats["queries"] == 3 and stats["new"] == 3
+    assert due == ["etf", "broken"]
+    assert interval == 30
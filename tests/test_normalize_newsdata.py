@@ -23,3 +23,102 @@ def test_normalize_newsdata_basic():
     assert item.published_at.tzinfo == timezone.utc
     assert item.tickers == ["ETH"]
     assert item.source == "example.com"
+
+
+def test_parse_timestamp_formats():
+    from datetime import datetime, timedelta
+
+    from app.core.normalize import parse_timestamp
+
+    expected = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    assert parse_timestamp("2024-05-01 12:00:00") == expected
+    assert parse_timestamp("2024-05-01T12:00:00Z") == expected
+    assert parse_timestamp("2024-05-01T14:00:00+02:00") == expected
+    assert parse_timestamp("Wed, 01 May 2024 12:00:00 GMT") == expected
+    aware = parse_timestamp(datetime(2024, 5, 1, 14, tzinfo=timezone(timedelta(hours=2))))
+    assert aware == expected and aware.tzinfo == timezone.utc
+
+
+def test_normalize_accepts_parsed_datetime():
+    import asyncio
+    from datetime import datetime
+
+    from app.providers.newsdata import NewsdataProvider
+
+    provider = NewsdataProvider(None, {})
+    (parsed,) = asyncio.run(
+        provider._parse_items(
+            {"results": [{"link": "https://example.com/a", "title": "t", "pubDate": "2024-05-01 12:00:00"}]}
+        )
+    )
+    assert parsed["pubDate"] == datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+    item = normalize_newsdata(parsed)
+    assert item.published_at == parsed["pubDate"]
+
+
+def _sample_raws():
+    return [
+        {
+            "article_id": f"id{i}",
+            "title": f"<b>BTC</b> and eth rally #{i}" if i % 2 else f"Solana (SOL) update {i}",
+            "description": "Spot <i>ETF</i> flows lift LINK, op and xrp" if i % 3 else None,
+            "content": "fallback content about DOGE",
+            "link": f"https://example{i % 4}.com/a/{i}",
+            "pubDate": (
+                "2024-05-01 12:00:00",
+                "2024-05-01T12:00:00Z",
+                "Wed, 01 May 2024 12:00:00 +0200",
+                "May 1 2024 12:00 UTC",
+            )[i % 4],
+            "language": "en",
+            "creator": "Alice" if i % 2 else ["Bob", "Carol"],
+            "category": ["markets"],
+            "coin": "ETH" if i % 5 == 0 else None,
+            "source_id": None if i % 3 == 0 else "src",
+        }
+        for i in range(24)
+    ]
+
+
+def test_normalize_batch_matches_single_item_path():
+    from app.core.normalize import normalize_batch
+
+    raws = _sample_raws()
+    assert normalize_batch(raws) == [normalize_newsdata(r) for r in raws]
+    assert normalize_batch([]) == []
+
+
+def test_normalize_extracts_tickers_and_keywords():
+    item = normalize_newsdata(
+        {
+            "title": "Chainlink bridge hacked, $ETH drained",
+            "description": "An op-ed on the exploit",
+            "link": "https://example.com/a",
+            "pubDate": "2024-05-01 12:00:00",
+        }
+    )
+    assert item.tickers == ["ETH", "LINK"]
+    assert set(item.keywords) == {"hacked", "drained", "exploit"}
+
+
+def test_normalize_batch_skips_invalid_items():
+    from prometheus_client import REGISTRY
+
+    from app.core.normalize import normalize_batch
+
+    def dropped():
+        labels = {"reason": "invalid"}
+        return REGISTRY.get_sample_value("newsbot_items_dropped_total", labels) or 0.0
+
+    good = {
+        "article_id": "1",
+        "title": "BTC surges",
+        "link": "https://example.com/a",
+        "pubDate": "2024-05-01T12:00:00Z",
+    }
+    bad = dict(good, article_id="2", link="")
+    undated = dict(good, article_id="4", pubDate="sometime last week")
+    before = dropped()
+    items = normalize_batch([good, bad, dict(good, article_id="3"), undated])
+    assert [i.external_id for i in items] == ["1", "3"]
+    assert dropped() - before == 2
@@ -0,0 +1,84 @@
+import pytest
+
+from app.providers.policy import DAY_S, AdaptiveInterval, FixedInterval, build_policy
+
+
+def simulate(policy, clock, arrivals, until, overlap=2, page_size=50):
+    """Poll a simulated feed; return (poll times, latency per article).
+
+    Like a timeframe-narrowed incremental poll, every response holds the
+    articles since the last poll plus ``overlap`` already known ones.
+    """
+    polls, latencies = [], []
+    seen = 0
+    while clock[0] < until:
+        now = clock[0]
+        polls.append(now)
+        fresh = [t for t in arrivals[seen:] if t <= now]
+        seen += len(fresh)
+        latencies.extend(now - t for t in fresh)
+        fetched = len(fresh) + min(seen - len(fresh), overlap)
+        requests = 1 + fetched // page_size
+        clock[0] += policy.next_interval(fetched, len(fresh), requests)
+    return polls, latencies
+
+
+def test_adaptive_interval_tracks_news_velocity_deterministically():
+    # 6 quiet hours, then a burst with an article every 20s for an hour
+    start = 10 * DAY_S
+    burst = start + 6 * 3600
+    arrivals = [burst + i * 20 for i in range(180)]
+    until = burst + 2 * 3600
+
+    clock = [start]
+    adaptive = AdaptiveInterval(60, 10, 600, clock=lambda: clock[0])
+    polls, latencies = simulate(adaptive, clock, arrivals, until)
+    fixed_clock = [start]
+    fixed_polls, fixed_latencies = simulate(FixedInterval(60), fixed_clock, arrivals, until)
+
+    quiet = [b - a for a, b in zip(polls, polls[1:]) if b < burst]
+    during = [b - a for a, b in zip(polls, polls[1:]) if burst + 1800 < a < burst + 3600]
+    assert max(quiet) == 600
+    assert max(during) <= 30
+    # far fewer requests while nothing happens ...
+    assert sum(t < burst for t in polls) * 4 < sum(t < burst for t in fixed_polls)
+    # ... and, once the burst was noticed (within max_s), alerts arrive sooner;
+    # articles are 20s apart, so the first 30 fall into the first max_s
+    assert sum(latencies[30:]) * 2 < sum(fixed_latencies[30:])
+    # the same inputs always give the same schedule
+    clock[0] = start
+    again = AdaptiveInterval(60, 10, 600, clock=lambda: clock[0])
+    assert simulate(again, clock, arrivals, until)[0] == polls
+
+
+def test_daily_budget_spreads_requests_and_waits_for_next_day():
+    start = 3 * DAY_S + 12 * 3600
+    clock = [start]
+    policy = AdaptiveInterval(60, 5, 600, daily_budget=100, clock=lambda: clock[0])
+    # every poll is busy, so without a budget it would poll every 5s
+    requests = 0
+    while clock[0] < 4 * DAY_S:
+        requests += 1
+        clock[0] += policy.next_interval(10, 10, 1)
+    assert requests <= 100
+    assert clock[0] - 4 * DAY_S < 600
+
+    clock[0] = 5 * DAY_S - 60
+    policy.spent = 0
+    policy._day = None
+    policy.daily_budget = 1
+    assert policy.next_interval(10, 10, 1) == pytest.approx(60)
+
+
+def test_build_policy_by_name_and_path():
+    assert isinstance(build_policy({}, 45), FixedInterval)
+    adaptive = build_policy(
+        {"poll_policy": "adaptive", "min_poll_interval_s": 5, "daily_request_budget": 10}, 45
+    )
+    assert (adaptive.base, adaptive.min_s, adaptive.max_s) == (45, 5, 180)
+    assert adaptive.daily_budget == 10
+    assert isinstance(
+        build_policy({"poll_policy": "app.providers.policy:FixedInterval"}, 45), FixedInterval
+    )
+    with pytest.raises(KeyError):
+        build_policy({"poll_policy": "nope"}, 45)
@@ -0,0 +1,94 @@
+import asyncio
+
+from app.core.config import ProvidersSettings
+from app.providers import registry
+from app.providers.base import BaseProvider
+from app.providers.newsdata import NewsdataProvider
+from app.providers.scheduler import ProviderScheduler
+
+
+class FakeProvider(BaseProvider):
+    def __init__(self, config, name, hang=False):
+        super().__init__(None, config, name=name)
+        self.hang = hang
+        self.polls = 0
+
+    def _build_request(self):
+        return {}
+
+    async def _parse_items(self, data):
+        return []
+
+    async def poll(self):
+        self.polls += 1
+        if self.hang:
+            await asyncio.sleep(3600)
+        return [{"n": self.polls}]
+
+
+def test_registry_builds_enabled_providers():
+    registry.register("fake")(FakeProvider)
+    settings = ProvidersSettings.model_validate(
+        {
+            "newsdata": {"api_key": "k"},
+            "ru_news": {"type": "newsdata", "poll_interval_s": 90, "endpoint": "latest"},
+            "off": {"type": "newsdata", "enabled": False},
+        }
+    )
+    providers = registry.build_providers(None, settings.enabled())
+    assert [p.name for p in providers] == ["newsdata", "ru_news"]
+    assert all(isinstance(p, NewsdataProvider) for p in providers)
+    assert providers[1].poll_interval == 90
+    assert providers[1]._build_request()["url"].endswith("/latest")
+
+
+def test_scheduler_isolates_hanging_provider():
+    fast = FakeProvider({"poll_interval_s": 0, "jitter_s": 0}, "fast")
+    slow = FakeProvider(
+        {"poll_interval_s": 0, "cycle_timeout_s": 0.05, "backoff_base_s": 0.01}, "slow", hang=True
+    )
+    scheduler = ProviderScheduler([slow, fast], jitter=0)
+
+    async def routine():
+        got = []
+        gen = scheduler.batches()
+        async for provider, items in gen:
+            got.append((provider.name, items[0]["n"]))
+            if len(got) == 5:
+                break
+        await gen.aclose()
+        return got
+
+    got = asyncio.run(asyncio.wait_for(routine(), 2))
+    assert got == [("fast", n) for n in range(1, 6)]
+
+
+def test_scheduler_staggers_start_times():
+    providers = [FakeProvider({"poll_interval_s": 60}, f"p{i}") for i in range(3)]
+    delays = ProviderScheduler(providers, jitter=0).start_delays()
+    assert delays == [0.0, 20.0, 40.0]
+
+
+def test_scheduler_shutdown_is_bounded():
+    class StubbornProvider(FakeProvider):
+        async def poll(self):
+            self.polls += 1
+            if self.polls > 1:
+                # ignores the first cancel, like a poll lost in a cancel race
+                try:
+                    await asyncio.sleep(3600)
+                except asyncio.CancelledError:
+                    await asyncio.sleep(3600)
+            return [{"n": self.polls}]
+
+    stubborn = StubbornProvider({"poll_interval_s": 0, "jitter_s": 0}, "stubborn")
+    scheduler = ProviderScheduler([stubborn], jitter=0, shutdown_timeout=0.1)
+
+    async def routine():
+        gen = scheduler.batches()
+        async for _ in gen:
+            break
+        await asyncio.sleep(0.01)
+        await gen.aclose()
+
+    asyncio.run(asyncio.wait_for(routine(), 2))
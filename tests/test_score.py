@@ -2,7 +2,7 @@ from types import SimpleNamespace
 from datetime import datetime, timezone
 
 from app.core.models import NormalizedItem
-from app.core.score import score_item
+from app.core.score import pre_score, score_item
 from app.core.config import FiltersSettings, ScoringSettings
 
 
@@ -45,3 +45,76 @@ def test_score_item_filters_short_title():
     )
     score = score_item(item, datetime.now(timezone.utc), Cfg)
     assert score == 0.0
+
+
+def test_score_item_adds_keyword_weights():
+    now = datetime.now(timezone.utc)
+    base = dict(
+        external_id="3",
+        source="newsdata",
+        title="Exchange hacked as attackers drain hot wallets",
+        url="https://example.com/c",
+        published_at=now,
+        language="en",
+    )
+    plain = score_item(NormalizedItem(**base), now, Cfg)
+    hacked = score_item(NormalizedItem(**base, keywords={"hacked": 1.5}), now, Cfg)
+    assert hacked - plain == Cfg.scoring.w_keyword * 1.5
+
+
+def test_domain_filter_matches_fnmatch_semantics():
+    from fnmatch import fnmatch
+
+    from app.core.domains import DomainFilter
+
+    patterns = ["spam.com", "*.ads.net", "medium.com/@*", "*tracker*", "x?.io"]
+    compiled = DomainFilter(patterns)
+    for domain in [
+        "spam.com", "a.spam.com", "ads.net", "cdn.ads.net", ".ads.net", "mytracker.org",
+        "x1.io", "x12.io", "medium.com", "example.com:8080",
+    ]:
+        assert compiled.matches(domain) == any(fnmatch(domain, p) for p in patterns)
+
+
+def test_score_batch_matches_score_item_exactly():
+    import random
+    from datetime import timedelta
+
+    from app.core.score import score_batch
+
+    rng = random.Random(5)
+    now = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+    cfg = SimpleNamespace(
+        filters=FiltersSettings(languages=["en"], exclude_domains=["*.spam.com", "bad.org"]),
+        scoring=Cfg.scoring,
+    )
+    items = [
+        NormalizedItem(
+            external_id=str(i),
+            source="s",
+            title="Bitcoin breaks above resistance" if i % 7 else "short",
+            url=f"https://{rng.choice(['ok.com', 'x.spam.com', 'bad.org', 'news.io'])}/{i}",
+            published_at=now - timedelta(microseconds=rng.randrange(10**11)),
+            language=rng.choice(["en", "en", "de", None]),
+            tickers=["BTC"] * rng.randrange(3),
+            keywords={"etf": 1.0, "hack": 1.5} if i % 3 == 0 else {},
+        )
+        for i in range(500)
+    ]
+    assert score_batch(items, now, cfg) == [score_item(item, now, cfg) for item in items]
+    assert score_batch([], now, cfg) == []
+
+
+def test_pre_score_ranks_raw_payloads_like_score_item():
+    now = datetime.now(timezone.utc)
+    raw = {
+        "title": "Bitcoin breaks above $30k for the first time in months",
+        "pubDate": now,
+        "language": "en",
+        "coin": ["btc"],
+    }
+    stale = dict(raw, pubDate=now.replace(year=now.year - 1))
+    assert pre_score(raw, now, Cfg) == 1.0 + 1.5 + 0.4
+    assert pre_score(stale, now, Cfg) < pre_score(raw, now, Cfg)
+    assert pre_score(dict(raw, language="de"), now, Cfg) == 0.0
+    assert pre_score(dict(raw, title="short"), now, Cfg) == 0.0
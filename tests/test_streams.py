@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fakeredis.aioredis import FakeRedis
+from zoneinfo import ZoneInfo
+
+from app.core import dedup
+from app.core.config import FiltersSettings, ScoringSettings, StreamsSettings
+from app.services.ingestor import process_batch
+from app.services.streams import StreamConsumer, StreamWriter
+
+
+class FakePublisher:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, item, tz, score=0.0):
+        await asyncio.sleep(0.01)
+        self.sent.append(item)
+
+
+def _raws(n):
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "article_id": str(i),
+            "title": f"BTC rallies after ETF approval number {i}",
+            "link": f"https://example.com/{i}",
+            "pubDate": now,
+            "language": "en",
+        }
+        for i in range(n)
+    ]
+
+
+async def _first(consumer):
+    await consumer.ensure_group()
+    async for batch in consumer.batches():
+        return [batch]
+
+
+def test_writer_and_consumer_round_trip_with_ack():
+    client = FakeRedis(decode_responses=True)
+
+    async def routine():
+        await StreamWriter(client, "s").add(("newsdata", _raws(3)))
+        consumer = StreamConsumer(client, "s", "g", "c1", block_ms=10)
+        await consumer.ensure_group()
+        await consumer.ensure_group()  # existing group is fine
+        [(ids, provider, raws)] = await _first(consumer)
+        await consumer.ack(ids)
+        pending = await client.xpending("s", "g")
+        return provider, raws, pending["pending"]
+
+    provider, raws, pending = asyncio.run(routine())
+    assert provider == "newsdata"
+    assert [r["article_id"] for r in raws] == ["0", "1", "2"]
+    assert pending == 0
+
+
+def test_unacked_entries_are_reclaimed_by_another_consumer():
+    client = FakeRedis(decode_responses=True)
+
+    async def routine():
+        await StreamWriter(client, "s").add(("newsdata", _raws(2)))
+        dead = StreamConsumer(client, "s", "g", "dead", block_ms=10)
+        await _first(dead)  # read but never acknowledged
+        alive = StreamConsumer(client, "s", "g", "alive", block_ms=10, claim_idle_ms=0)
+        [(ids, _, raws)] = await _first(alive)
+        await alive.ack(ids)
+        return raws, alive.reclaimed, (await client.xpending("s", "g"))["pending"]
+
+    raws, reclaimed, pending = asyncio.run(routine())
+    assert len(raws) == 2 and reclaimed == 2
+    assert pending == 0
+
+
+def test_workers_sharing_redis_publish_each_item_once():
+    dedup.init(client=FakeRedis(decode_responses=True), cache_size=100, trust_local=False)
+    cfg = SimpleNamespace(
+        filters=FiltersSettings(languages=["en"], exclude_domains=[]),
+        scoring=ScoringSettings(threshold=0.1),
+        streams=StreamsSettings(),
+    )
+    raws = _raws(5)
+    pub = FakePublisher()
+
+    async def routine():
+        # separate inflight sets: only the Redis claims keep them apart
+        return await asyncio.gather(
+            *(
+                process_batch(raws, cfg, pub, ZoneInfo("UTC"), inflight=set(), claim=True)
+                for _ in range(3)
+            )
+        )
+
+    assert sum(asyncio.run(routine())) == 5
+    assert len(pub.sent) == 5
+    assert asyncio.run(dedup.client().keys("dedup:claim:*")) == []
+
+
+def test_run_with_streams_polls_through_the_stream():
+    from aiohttp import web
+
+    from app.core.config import Config
+    from app.services.ingestor import run
+
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    async def handler(request):
+        return web.json_response(
+            {
+                "results": [
+                    {
+                        "article_id": "1",
+                        "title": "BTC rallies after ETF approval lifts markets",
+                        "link": "https://example.com/stream",
+                        "pubDate": now,
+                        "language": "en",
+                    }
+                ]
+            }
+        )
+
+    class FakeBot:
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, chat_id, text, parse_mode=None):
+            self.sent.append(text)
+            stop.set()
+
+    stop = None
+
+    async def routine():
+        nonlocal stop
+        stop = asyncio.Event()
+        app = web.Application()
+        app.router.add_get("/api/1/crypto", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        cfg = Config.model_validate(
+            {
+                "telegram": {"bot_token": "t", "channel_id": "@chan"},
+                "providers": {
+                    "newsdata": {
+                        "api_key": "k",
+                        "base_url": f"http://127.0.0.1:{port}/api/1",
+                        "incremental": False,
+                    }
+                },
+                "filters": {"languages": ["en"]},
+                "scoring": {"threshold": 0.1},
+                "runtime": {"redis_url": "redis://unused", "tz": "UTC", "metrics_port": 0},
+                "streams": {"enabled": True, "block_ms": 50},
+            }
+        )
+        client = FakeRedis(decode_responses=True)
+        bot = FakeBot()
+        try:
+            await asyncio.wait_for(run(cfg, redis_client=client, bot=bot, stop=stop), 10)
+        finally:
+            await runner.cleanup()
+        return bot, (await client.xpending("ingest:raw", "ingest"))["pending"]
+
+    bot, pending = asyncio.run(routine())
+    assert len(bot.sent) == 1 and "ETF approval" in bot.sent[0]
+    assert pending == 0
+
+
+def test_consumer_dead_letters_entries_that_keep_failing():
+    client = FakeRedis(decode_responses=True)
+
+    async def routine():
+        await StreamWriter(client, "s").add(("newsdata", _raws(2)))
+        consumer = StreamConsumer(
+            client, "s", "g", "c1", block_ms=10, claim_idle_ms=0, max_deliveries=2
+        )
+        await consumer.ensure_group()
+        first = await consumer.read()
+        await consumer.ack([first[1][0]])
+        # the other entry fails on every delivery and is never acked
+        retried = await consumer.claim_stale()
+        dead = await consumer.claim_stale()
+        pending = (await client.xpending("s", "g"))["pending"]
+        return first, retried, dead, pending, await client.xrange("s:dead")
+
+    first, retried, dead, pending, dead_entries = asyncio.run(routine())
+    assert [e[0] for e in retried] == [first[0][0]]
+    assert dead == [] and pending == 0
+    assert len(dead_entries) == 1
+    fields = dead_entries[0][1]
+    assert fields["id"] == first[0][0] and fields["deliveries"] == "2"
+    assert fields["provider"] == "newsdata"
@@ -0,0 +1,243 @@
+import asyncio
+from datetime import datetime, timezone
+
+from telegram.error import RetryAfter
+from zoneinfo import ZoneInfo
+
+from app.core.telegram import (
+    NewsItem,
+    TelegramPublisher,
+    TokenBucket,
+    format_digest,
+    format_message,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+        await asyncio.sleep(0)
+
+
+class FakeBot:
+    def __init__(self, clock, fail_with=None):
+        self.clock = clock
+        self.fail_with = list(fail_with or [])
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        if self.fail_with:
+            raise self.fail_with.pop(0)
+        self.sent.append((self.clock.now, chat_id, text))
+
+
+def _item(title, tickers=(), minute=0):
+    return NewsItem(
+        title=title,
+        summary="",
+        url="https://example.com",
+        source="src",
+        tickers=list(tickers),
+        published_at=datetime(2024, 5, 1, 12, minute, tzinfo=timezone.utc),
+    )
+
+
+def _publisher(clock, bot, rate=6, burst=1, **kwargs):
+    return TelegramPublisher(
+        "t", "@chan", rate, burst, bot=bot, clock=clock, sleep=clock.sleep, **kwargs
+    )
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate_per_min=6, burst=2, now=0)
+    bucket.take(0)
+    bucket.take(0)
+    assert bucket.delay(0) == 10
+    assert bucket.delay(5) == 5
+    assert bucket.delay(10) == 0
+    bucket.pause(until=40)
+    assert bucket.delay(10) == 30
+
+
+def test_publisher_rate_limits_and_orders_by_score():
+    clock = FakeClock()
+    bot = FakeBot(clock)
+    pub = _publisher(clock, bot)
+    tz = ZoneInfo("UTC")
+
+    async def routine():
+        await asyncio.gather(*(pub.send(_item(f"s{s}"), tz, score=s) for s in (1, 5, 3, 4)))
+
+    asyncio.run(routine())
+    assert [(t, text.split("</b>")[0][-2:]) for t, _, text in bot.sent] == [
+        (0.0, "s5"),
+        (10.0, "s4"),
+        (20.0, "s3"),
+        (30.0, "s1"),
+    ]
+    stats = pub.stats()
+    assert stats["sent"] == 4 and stats["queue_depth"] == 0
+    assert stats["wait_max_s"] == 30.0 and stats["wait_avg_s"] == 15.0
+
+
+def test_publisher_honors_retry_after():
+    clock = FakeClock()
+    bot = FakeBot(clock, fail_with=[RetryAfter(30)])
+    pub = _publisher(clock, bot, rate=60, burst=5)
+
+    asyncio.run(pub.send(_item("flood"), ZoneInfo("UTC"), score=1))
+    assert [t for t, _, _ in bot.sent] == [30.0]
+    assert pub.stats()["retries"] == 1
+
+
+def test_publisher_propagates_other_errors():
+    clock = FakeClock()
+    bot = FakeBot(clock, fail_with=[ValueError("bad chat")])
+    pub = _publisher(clock, bot)
+
+    async def routine():
+        try:
+            await pub.send(_item("x"), ZoneInfo("UTC"))
+        except ValueError:
+            return True
+        return False
+
+    assert asyncio.run(routine())
+
+
+def test_publisher_survives_waiter_cancelled_mid_send():
+    clock = FakeClock()
+
+    class SlowBot(FakeBot):
+        async def send_message(self, chat_id, text, parse_mode=None):
+            in_flight.set()
+            await release.wait()
+            await super().send_message(chat_id, text, parse_mode)
+
+    bot = SlowBot(clock)
+    pub = _publisher(clock, bot, rate=60, burst=5)
+    tz = ZoneInfo("UTC")
+    in_flight = release = None
+
+    async def routine():
+        nonlocal in_flight, release
+        in_flight, release = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(pub.send(_item("first"), tz))
+        await in_flight.wait()
+        first.cancel()
+        second = asyncio.create_task(pub.send(_item("second"), tz))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.wait_for(second, 1)
+        return first.cancelled()
+
+    assert asyncio.run(routine())
+    assert len(bot.sent) == 2 and "second" in bot.sent[1][2]
+
+
+def test_format_digest_groups_by_ticker_and_respects_limit():
+    tz = ZoneInfo("UTC")
+    items = [_item("ETF approved", ["BTC"]), _item("Upgrade live", ["ETH"]), _item("Miners sell", ["BTC"])]
+    text, count = format_digest(items, tz)
+    assert count == 3
+    assert text.index("<b>BTC</b>") < text.index("ETF approved") < text.index("Miners sell")
+    assert text.index("Miners sell") < text.index("<b>ETH</b>")
+
+    many = [_item(f"story {i} " + "x" * 150, ["BTC"]) for i in range(100)]
+    text, count = format_digest(many, tz)
+    assert 1 < count < 100
+    assert len(text) <= 4096
+    assert f"story {count - 1} " in text and f"story {count} " not in text
+
+
+def test_format_truncates_text_not_markup():
+    import re
+
+    tz = ZoneInfo("UTC")
+    text, count = format_digest([_item("&" * 200, ["BTC"])], tz, max_len=300)
+    assert count == 1 and len(text) <= 300
+    assert text.count("<a ") == text.count("</a>") == 1
+    assert not re.search(r"&(?!amp;|quot;|#x27;)", text)
+
+    item = _item("Title")
+    item.summary = "<" * 600
+    body = format_message(item, tz).split("\n")[1]
+    assert body == "&lt;" * 500
+
+
+def test_format_digest_groups_by_time_window():
+    tz = ZoneInfo("UTC")
+    items = [_item("late", minute=40), _item("early", minute=5), _item("early too", minute=14)]
+    text, count = format_digest(items, tz, group_by="time", window_min=15)
+    assert count == 3
+    assert text.index("<b>12:00</b>") < text.index("early too") < text.index("<b>12:30</b>")
+
+
+
+def test_format_digest_time_buckets_keep_days_apart():
+    tz = ZoneInfo("UTC")
+    before = _item("before midnight")
+    before.published_at = datetime(2024, 5, 1, 23, 50, tzinfo=timezone.utc)
+    after = _item("after midnight")
+    after.published_at = datetime(2024, 5, 2, 0, 5, tzinfo=timezone.utc)
+    next_day = _item("next evening")
+    next_day.published_at = datetime(2024, 5, 2, 23, 55, tzinfo=timezone.utc)
+    text, count = format_digest([after, next_day, before], tz, group_by="time")
+    assert count == 3
+    assert text.index("<b>2024-05-01 23:45</b>") < text.index("before midnight")
+    assert text.index("before midnight") < text.index("<b>2024-05-02 00:00</b>")
+    assert text.index("after midnight") < text.index("<b>2024-05-02 23:45</b>")
+
+
+def test_format_digest_fits_an_oversized_link():
+    import re
+
+    tz = ZoneInfo("UTC")
+    item = _item("Title", ["BTC"])
+    item.url = "https://example.com/" + "a" * 500
+    text, count = format_digest([item], tz, max_len=300)
+    assert count == 1 and len(text) <= 300
+    assert "<a " not in text and "Title" in text
+
+    item.source = "&" * 500
+    text, count = format_digest([item], tz, max_len=300)
+    assert count == 1 and len(text) <= 300
+    assert text.count("<b>") == text.count("</b>")
+    assert not re.search(r"&(?!amp;)", text)
+
+def test_publisher_coalesces_backlog_into_digest():
+    clock = FakeClock()
+    bot = FakeBot(clock)
+    pub = _publisher(clock, bot, digest_threshold=3, digest_max_items=10)
+    tz = ZoneInfo("UTC")
+
+    async def routine():
+        await asyncio.gather(
+            *(pub.send(_item(f"alert {i}", ["BTC"]), tz, score=i) for i in range(8))
+        )
+
+    asyncio.run(routine())
+    assert len(bot.sent) == 1
+    assert bot.sent[0][2].startswith("<b>📰 Digest: 8 alerts</b>")
+    stats = pub.stats()
+    assert stats["sent"] == 8 and stats["messages"] == 1 and stats["digests"] == 1
+
+
+def test_publisher_sends_individually_below_digest_threshold():
+    clock = FakeClock()
+    bot = FakeBot(clock)
+    pub = _publisher(clock, bot, digest_threshold=5)
+    tz = ZoneInfo("UTC")
+
+    async def routine():
+        await asyncio.gather(*(pub.send(_item(f"alert {i}"), tz, score=i) for i in range(3)))
+
+    asyncio.run(routine())
+    assert [t for t, _, _ in bot.sent] == [0.0, 10.0, 20.0]
+    assert pub.stats()["digests"] == 0